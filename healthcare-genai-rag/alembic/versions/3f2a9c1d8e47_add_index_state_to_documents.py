@@ -0,0 +1,31 @@
+"""add index state to documents
+
+Revision ID: 3f2a9c1d8e47
+Revises: 7130e4d48cab
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from __future__ import annotations
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d8e47'
+down_revision: Union[str, Sequence[str], None] = '7130e4d48cab'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("chunks_indexed", sa.Integer(), nullable=True))
+    op.add_column("documents", sa.Column("embedding_model", sa.String(length=100), nullable=True))
+    op.add_column("documents", sa.Column("indexed_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "indexed_at")
+    op.drop_column("documents", "embedding_model")
+    op.drop_column("documents", "chunks_indexed")
@@ -0,0 +1,39 @@
+"""add document fields to documents
+
+Revision ID: 9b4e7d2a6c15
+Revises: 3f2a9c1d8e47
+Create Date: 2026-10-19 14:03:27.512930
+
+"""
+from __future__ import annotations
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e7d2a6c15'
+down_revision: Union[str, Sequence[str], None] = '3f2a9c1d8e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("documents", sa.Column("member_id", sa.String(length=100), nullable=True))
+    op.add_column("documents", sa.Column("patient_id", sa.String(length=100), nullable=True))
+    op.add_column("documents", sa.Column("decision", sa.String(length=32), nullable=True))
+    op.add_column("documents", sa.Column("document_date", sa.Date(), nullable=True))
+    op.create_index(op.f("ix_documents_member_id"), "documents", ["member_id"], unique=False)
+    op.create_index(op.f("ix_documents_patient_id"), "documents", ["patient_id"], unique=False)
+    op.create_index(op.f("ix_documents_document_date"), "documents", ["document_date"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_documents_document_date"), table_name="documents")
+    op.drop_index(op.f("ix_documents_patient_id"), table_name="documents")
+    op.drop_index(op.f("ix_documents_member_id"), table_name="documents")
+    op.drop_column("documents", "document_date")
+    op.drop_column("documents", "decision")
+    op.drop_column("documents", "patient_id")
+    op.drop_column("documents", "member_id")
@@ -0,0 +1,30 @@
+"""add chars to document_pages
+
+Revision ID: c5d81f3e0a92
+Revises: 9b4e7d2a6c15
+Create Date: 2026-10-19 16:41:08.227416
+
+"""
+from __future__ import annotations
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d81f3e0a92'
+down_revision: Union[str, Sequence[str], None] = '9b4e7d2a6c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("document_pages", sa.Column("chars", sa.Integer(), nullable=False, server_default="0"))
+    # One pass over the existing bodies; new pages store their length when /process inserts them.
+    op.execute("UPDATE document_pages SET chars = length(text)")
+    op.alter_column("document_pages", "chars", server_default=None)
+
+
+def downgrade() -> None:
+    op.drop_column("document_pages", "chars")
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import REGISTRY
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "medirag_http_requests_total",
+    "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_DURATION = REGISTRY.histogram(
+    "medirag_http_request_duration_seconds",
+    "HTTP request latency by route template, until the last body byte is sent (covers streaming responses).",
+    ("method", "route"),
+)
+
+
+class HTTPMetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/queue overhead). Labels use the matched
+    route template (e.g. /documents/{document_id}) so cardinality stays bounded; unmatched
+    paths are reported as "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            HTTP_REQUESTS.inc(method=method, route=template, status=str(status))
+            HTTP_DURATION.observe(time.perf_counter() - start, method=method, route=template)
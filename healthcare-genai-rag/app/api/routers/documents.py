@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import json
+import logging
+from collections.abc import Iterator
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from fastapi.responses import FileResponse
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
+from app.core.config import env_int
 from app.db.models import Document, DocumentPage
+from app.db.session import session_scope
 from app.schemas.documents import (
     DocumentCreateResponse,
     DocumentPagesReadResponse,
@@ -17,11 +22,18 @@ from app.schemas.documents import (
     DocumentReadResponse,
     DocumentIndexResponse,
 )
+from app.services.auto_index import document_index_lock, reindex_document
 from app.services.document_loader import extract_pdf_pages_text
-from app.services.vector_store import index_document_pages_to_weaviate
+from app.services.index_state import INDEX_ERROR_STATUS, mark_document_not_indexed
+from app.services.vector_store import delete_document_chunks
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+# Pages read per query by the NDJSON stream (one short-lived session per batch).
+PAGE_STREAM_BATCH = env_int("PAGE_STREAM_BATCH", 100)
+
 
 @router.post("", response_model=DocumentCreateResponse)
 def create_document(file: UploadFile = File(...), db: Session = Depends(get_db)) -> DocumentCreateResponse:
@@ -71,6 +83,9 @@ def get_document(document_id: str, db: Session = Depends(get_db)) -> DocumentRea
         status=doc.status,
         content_type=doc.content_type,
         created_at=doc.created_at,
+        chunks_indexed=doc.chunks_indexed,
+        embedding_model=doc.embedding_model,
+        indexed_at=doc.indexed_at,
     )
 
 
@@ -95,23 +110,35 @@ def process_document(document_id: str, db: Session = Depends(get_db)) -> Documen
         db.commit()
         raise HTTPException(status_code=422, detail=f"Failed to parse PDF: {e!s}") from e
 
-    # MVP: delete existing pages then insert fresh ones
-    db.query(DocumentPage).filter(DocumentPage.document_id == doc.id).delete(synchronize_session=False)
-
-    total_chars = 0
-    for i, text in enumerate(pages_text, start=1):
-        total_chars += len(text)
-        db.add(
-            DocumentPage(
-                document_id=doc.id,
-                page_number=i,
-                text=text,
+    # Under the index lock: an index run in flight cannot read half-replaced pages, nor finish after
+    # the chunk delete below and mark the new pages indexed with the old pages' chunks.
+    with document_index_lock(db, doc.id):
+        # MVP: delete existing pages then insert fresh ones
+        db.query(DocumentPage).filter(DocumentPage.document_id == doc.id).delete(synchronize_session=False)
+
+        total_chars = 0
+        for i, text in enumerate(pages_text, start=1):
+            total_chars += len(text)
+            db.add(
+                DocumentPage(
+                    document_id=doc.id,
+                    page_number=i,
+                    text=text,
+                    chars=len(text),
+                )
             )
-        )
 
-    doc.status = "parsed"
-    db.add(doc)
-    db.commit()
+        # Pages changed: the previous index no longer matches them. Chunks are dropped whatever the
+        # previous status: a failed index run may have left some that the auto-index check would adopt.
+        status = "parsed"
+        try:
+            delete_document_chunks(doc.id)
+        except Exception:
+            # Parsing succeeded; index_error keeps the old chunks from being adopted, and the next
+            # index run deletes them first.
+            logger.exception("Could not delete the chunks of reprocessed document %s", doc.id)
+            status = INDEX_ERROR_STATUS
+        mark_document_not_indexed(db, doc, status=status)
 
     return DocumentProcessResponse(
         document_id=doc.id,
@@ -137,22 +164,11 @@ def index_document(document_id: str, db: Session = Depends(get_db)) -> DocumentI
         raise HTTPException(status_code=409, detail="Document has no parsed pages. Run /process first.")
 
     try:
-        chunks_indexed = index_document_pages_to_weaviate(
-            document_id=document_id,
-            filename=doc.filename,
-            content_type=doc.content_type,
-            pages=pages,
-        )
+        chunks_indexed = reindex_document(db, doc, pages)
     except Exception as e:
-        doc.status = "index_error"
-        db.add(doc)
-        db.commit()
+        mark_document_not_indexed(db, doc, status=INDEX_ERROR_STATUS)
         raise HTTPException(status_code=502, detail=f"Indexing failed: {e!s}") from e
 
-    doc.status = "indexed"
-    db.add(doc)
-    db.commit()
-
     return DocumentIndexResponse(
         document_id=document_id,
         status=doc.status,
@@ -161,4 +177,113 @@ def index_document(document_id: str, db: Session = Depends(get_db)) -> DocumentI
     )
 
 
-# ... existing endpoints list_document_pages, get_document_page, file endpoints remain unchanged ...
\ No newline at end of file
+def _require_document(db: Session, document_id: str) -> Document:
+    doc = db.get(Document, document_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return doc
+
+
+def _page_batch(
+    db: Session, document_id: str, *, after_page: int, limit: int, include_text: bool
+) -> list[DocumentPageReadResponse]:
+    """
+    Keyset page over (document_id, page_number): pages after `after_page`, in order. The text column
+    is only read when `include_text`; `chars` is the length stored by /process.
+    """
+    columns = [DocumentPage.page_number, DocumentPage.chars]
+    if include_text:
+        columns.append(DocumentPage.text)
+    rows = db.execute(
+        select(*columns)
+        .where(DocumentPage.document_id == document_id, DocumentPage.page_number > after_page)
+        .order_by(DocumentPage.page_number.asc())
+        .limit(limit)
+    ).all()
+    return [
+        DocumentPageReadResponse(
+            document_id=document_id,
+            page_number=row[0],
+            chars=int(row[1] or 0),
+            text=row[2] if include_text else None,
+        )
+        for row in rows
+    ]
+
+
+@router.get("/{document_id}/pages", response_model=DocumentPagesReadResponse)
+def list_document_pages(
+    document_id: str,
+    after_page: int = Query(default=0, ge=0, description="Return pages after this page number"),
+    limit: int = Query(default=50, ge=1, le=500),
+    include_text: bool = True,
+    db: Session = Depends(get_db),
+) -> DocumentPagesReadResponse:
+    _require_document(db, document_id)
+
+    # One extra row tells whether another page follows.
+    pages = _page_batch(db, document_id, after_page=after_page, limit=limit + 1, include_text=include_text)
+    has_more = len(pages) > limit
+    pages = pages[:limit]
+
+    return DocumentPagesReadResponse(
+        document_id=document_id,
+        pages=pages,
+        pages_count=len(pages),
+        total_chars=sum(p.chars or 0 for p in pages),
+        next_after_page=pages[-1].page_number if has_more else None,
+        has_more=has_more,
+    )
+
+
+def _ndjson_pages(document_id: str, *, after_page: int, include_text: bool) -> Iterator[str]:
+    while True:
+        # A session per batch: no connection is held while the client reads.
+        with session_scope() as db:
+            batch = _page_batch(
+                db, document_id, after_page=after_page, limit=PAGE_STREAM_BATCH, include_text=include_text
+            )
+        for page in batch:
+            yield json.dumps(page.model_dump(exclude_none=True)) + "\n"
+        if len(batch) < PAGE_STREAM_BATCH:
+            return
+        after_page = batch[-1].page_number
+
+
+@router.get("/{document_id}/pages/stream")
+def stream_document_pages(
+    document_id: str,
+    after_page: int = Query(default=0, ge=0),
+    include_text: bool = True,
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Every page as newline-delimited JSON (one DocumentPageReadResponse per line), read in keyset
+    batches of PAGE_STREAM_BATCH.
+    """
+    _require_document(db, document_id)
+    # The stream outlives the request's session: it opens its own per batch.
+    return StreamingResponse(
+        _ndjson_pages(document_id, after_page=after_page, include_text=include_text),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/{document_id}/pages/{page_number}", response_model=DocumentPageReadResponse)
+def get_document_page(document_id: str, page_number: int, db: Session = Depends(get_db)) -> DocumentPageReadResponse:
+    _require_document(db, document_id)
+    pages = _page_batch(db, document_id, after_page=page_number - 1, limit=1, include_text=True)
+    if not pages or pages[0].page_number != page_number:
+        raise HTTPException(status_code=404, detail="Page not found")
+    return pages[0]
+
+
+@router.get("/{document_id}/file")
+def get_document_file(document_id: str, db: Session = Depends(get_db)) -> FileResponse:
+    """
+    The original upload. Supports HTTP Range requests (206 partial content) for partial downloads.
+    """
+    doc = _require_document(db, document_id)
+    if not doc.storage_path or not Path(doc.storage_path).exists():
+        raise HTTPException(status_code=404, detail="Stored file not found on disk")
+    return FileResponse(doc.storage_path, media_type=doc.content_type, filename=doc.filename)
\ No newline at end of file
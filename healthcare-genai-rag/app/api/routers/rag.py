@@ -1,14 +1,70 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+import json
+import math
+from collections.abc import Iterator
 
-from app.schemas.rag import RagExtractRequest, RagExtractResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.core.config import env_str
+from app.schemas.rag import CorpusSearchRequest, CorpusSearchResponse, RagExtractRequest, RagExtractResponse
 from app.services.agentic_workflow import RagAgentWorkflow
-from app.schemas.agentic_qa import AgenticQARequest, AgenticQAResponse
+from app.schemas.agentic_qa import AgenticQARequest, AgenticQAResponse, AgenticQAStreamEvent
+from app.services.admission import AdmissionRejected, AdmissionTicket, admission_controller
 from app.services.agentic_qa import AgenticQAService
+from app.services.corpus_search import search_corpus
+from app.services.resilience import CircuitOpenError, DeadlineExceeded, default_deadline
 
 router = APIRouter(prefix="/rag", tags=["rag"])
 
+# Tenant/client identity for rate limiting; falls back to the peer address.
+_CLIENT_ID_HEADER = env_str("ADMISSION_CLIENT_HEADER", "X-Client-Id")
+
+
+def _admit(request: Request, deadline: float | None = None) -> AdmissionTicket:
+    client_id = request.headers.get(_CLIENT_ID_HEADER) or (request.client.host if request.client else "anonymous")
+    try:
+        return admission_controller.admit(client_id, deadline=deadline)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": e.retry_after_header}) from e
+
+
+def _upstream_error(prefix: str, e: Exception) -> HTTPException:
+    if isinstance(e, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail=f"{prefix}: {e!s}",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after_s)))},
+        )
+    if isinstance(e, DeadlineExceeded):
+        return HTTPException(status_code=504, detail=f"{prefix}: {e!s}")
+    return HTTPException(status_code=502, detail=f"{prefix}: {e!s}")
+
+
+def _format_sse(event: str, data: object) -> str:
+    if hasattr(data, "model_dump"):
+        data = data.model_dump(mode="json")
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _sse_events(events: Iterator[AgenticQAStreamEvent], ticket: AdmissionTicket | None = None) -> Iterator[str]:
+    try:
+        for ev in events:
+            yield _format_sse(ev.event, ev.data)
+    except Exception as e:
+        yield _format_sse("error", {"detail": f"Agentic QA failed: {e!s}"})
+    finally:
+        # Runs on client disconnect too: stops the workflow before the next retrieval/LLM call.
+        close = getattr(events, "close", None)
+        if close is not None:
+            close()
+        if ticket is not None:
+            ticket.release()
+
 
 @router.get("/health")
 def health() -> dict:
@@ -16,18 +72,70 @@ def health() -> dict:
 
 
 @router.post("/extract", response_model=RagExtractResponse)
-def extract(req: RagExtractRequest) -> RagExtractResponse:
-    workflow = RagAgentWorkflow()
-    try:
-        return workflow.run(req)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"RAG extraction failed: {e!s}") from e
+def extract(req: RagExtractRequest, request: Request, db: Session = Depends(get_db)) -> RagExtractResponse:
+    # The budget starts at arrival, so time spent queued for admission counts against it.
+    deadline = default_deadline(req.deadline_ms)
+    with _admit(request, deadline):
+        workflow = RagAgentWorkflow(db=db, deadline=deadline)
+        try:
+            return workflow.run(req)
+        except Exception as e:
+            raise _upstream_error("RAG extraction failed", e) from e
+
+
+@router.post("/search", response_model=CorpusSearchResponse)
+def search(req: CorpusSearchRequest, request: Request, db: Session = Depends(get_db)) -> CorpusSearchResponse:
+    """
+    Cross-document search: member/patient/decision/date filters and an optional query, in one
+    vector-store call; results grouped per document and paginated.
+    """
+    with _admit(request):
+        try:
+            return search_corpus(req, db=db)
+        except Exception as e:
+            raise _upstream_error("Corpus search failed", e) from e
 
 
 @router.post("/answer", response_model=AgenticQAResponse)
-def answer(req: AgenticQARequest) -> AgenticQAResponse:
-    service = AgenticQAService()
+def answer(req: AgenticQARequest, request: Request, db: Session = Depends(get_db)) -> Response:
+    deadline = default_deadline(req.deadline_ms)
+    with _admit(request, deadline):
+        try:
+            service = AgenticQAService(db=db, deadline=deadline)
+            resp = service.answer(req)
+        except Exception as e:
+            raise _upstream_error("Agentic QA failed", e) from e
+    # Serialized once, here: the service already built a valid AgenticQAResponse, so FastAPI's
+    # response_model re-validation is skipped. Minimal responses also drop empty/default fields.
+    return Response(
+        content=resp.model_dump_json(exclude_defaults=req.verbosity == "minimal"),
+        media_type="application/json",
+    )
+
+
+@router.post("/answer/stream")
+def answer_stream(req: AgenticQARequest, request: Request) -> StreamingResponse:
+    """
+    Server-sent events variant of /rag/answer.
+    Emits `step` events as the workflow runs, `token` events while the LLM answers,
+    and a final `result` event with the same payload as /rag/answer.
+    """
+    # The admission slot is held until the stream ends (released by _sse_events).
+    deadline = default_deadline(req.deadline_ms)
+    ticket = _admit(request, deadline)
+
+    # No injected session here: the stream outlives the request dependencies,
+    # so the service opens (and closes) its own short-lived session.
     try:
-        return service.answer(req)
+        service = AgenticQAService(deadline=deadline)
     except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Agentic QA failed: {e!s}") from e
\ No newline at end of file
+        ticket.release()
+        raise HTTPException(status_code=502, detail=f"Agentic QA failed: {e!s}") from e
+
+    return StreamingResponse(
+        _sse_events(service.stream(req), ticket),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also covers a stream that never started (release is idempotent).
+        background=BackgroundTask(ticket.release),
+    )
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def env_str(name: str, default: str = "") -> str:
+    value = os.getenv(name)
+    return value.strip() if value and value.strip() else default
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError as e:
+        raise RuntimeError(f"{name} must be an integer, got {value!r}") from e
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError as e:
+        raise RuntimeError(f"{name} must be a number, got {value!r}") from e
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
@@ -0,0 +1,236 @@
+"""
+Minimal Prometheus-style metrics (text exposition format 0.0.4), no external dependency.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        try:
+            return tuple(str(labels[n]) for n in self.labelnames)
+        except KeyError:
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}") from None
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class _Sharded(_Metric):
+    """
+    Values live in one shard per thread, so the hot path (inc/observe) never takes a lock:
+    a thread only ever writes its own dict. Scrapes sum the shards; shards of finished
+    threads are kept so totals stay monotonic.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _snapshot_shards(self) -> list[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.copy() of a plain dict runs without releasing the GIL.
+        return [shard.copy() for shard in shards]
+
+
+class Counter(_Sharded):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        shard = self._shard()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def _totals(self) -> dict[LabelValues, float]:
+        totals: dict[LabelValues, float] = {}
+        for shard in self._snapshot_shards():
+            for key, v in shard.items():
+                totals[key] = totals.get(key, 0.0) + v
+        return totals
+
+    def value(self, **labels: str) -> float:
+        return self._totals().get(self._key(labels), 0.0)
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(self._totals().items())
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Gauge whose samples are read from a callback at scrape time.
+    """
+
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[LabelValues, float]],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+
+    def render(self) -> list[str]:
+        try:
+            samples = self._callback()
+        except Exception:
+            return []
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in sorted(samples.items())
+        ]
+
+
+class Histogram(_Sharded):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        # per label set: [bucket counts..., +Inf count, sum]
+        shard = self._shard()
+        cell = shard.get(key)
+        if cell is None:
+            cell = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def _totals(self) -> dict[LabelValues, list[float]]:
+        totals: dict[LabelValues, list[float]] = {}
+        for shard in self._snapshot_shards():
+            for key, cell in shard.items():
+                acc = totals.setdefault(key, [0] * len(cell))
+                for i, v in enumerate(list(cell)):
+                    acc[i] += v
+        return totals
+
+    def count(self, **labels: str) -> int:
+        cell = self._totals().get(self._key(labels))
+        return int(sum(cell[:-1])) if cell else 0
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, cell in sorted(self._totals().items()):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, math.inf), cell[:-1]):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(cell[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different definition")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[LabelValues, float]],
+        labelnames: tuple[str, ...] = (),
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, callback, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,178 @@
+"""
+Per-request instrumentation for the agentic workflows.
+
+A RequestTrace is activated for the blocking parts of a workflow; provider wrappers
+(app/services/providers.py) and caches call `record(...)`, which bumps the active trace and the
+process-wide Prometheus counters. Each workflow step then carries the monotonic time and counter
+deltas since the previous step.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from app.core.config import env_bool
+from app.core.metrics import REGISTRY
+
+STEP_DURATION = REGISTRY.histogram(
+    "medirag_workflow_step_duration_seconds",
+    "Time spent before each workflow step was recorded (i.e. the work that led to it).",
+    ("workflow", "step"),
+)
+USAGE_TOTAL = REGISTRY.counter(
+    "medirag_usage_total",
+    "Provider/cache usage: embedding_calls, embedded_texts, vector_queries, llm_calls, "
+    "prompt_tokens, completion_tokens, cache_hits, cache_misses.",
+    ("kind",),
+)
+
+_current_trace: ContextVar[RequestTrace | None] = ContextVar("medirag_request_trace", default=None)
+
+
+@dataclass(frozen=True)
+class StepTiming:
+    duration_ms: float
+    elapsed_ms: float
+    usage: dict[str, int]
+    start_ns: int
+    end_ns: int
+
+
+@dataclass
+class RequestTrace:
+    workflow: str
+    # Absolute time.monotonic() by which the request must finish (None = unbounded).
+    deadline: float | None = None
+    counters: Counter[str] = field(default_factory=Counter)
+    started_at: float = field(default_factory=time.perf_counter)
+    started_ns: int = field(default_factory=time.time_ns)
+    _last_at: float = 0.0
+    _last_counters: Counter[str] = field(default_factory=Counter)
+    # Plan steps run on worker threads and record into the same trace.
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._last_at = self.started_at
+
+    def add(self, kind: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[kind] += amount
+
+    def mark(self, step: str) -> StepTiming:
+        """
+        Closes the interval since the previous mark and attributes it to `step`.
+        """
+        now = time.perf_counter()
+        duration_s = now - self._last_at
+        with self._lock:
+            counters = Counter(self.counters)
+        usage = {k: v - self._last_counters.get(k, 0) for k, v in counters.items()}
+        usage = {k: v for k, v in usage.items() if v}
+
+        timing = StepTiming(
+            duration_ms=round(duration_s * 1000.0, 3),
+            elapsed_ms=round((now - self.started_at) * 1000.0, 3),
+            usage=usage,
+            start_ns=self.started_ns + int((self._last_at - self.started_at) * 1e9),
+            end_ns=self.started_ns + int((now - self.started_at) * 1e9),
+        )
+        self._last_at = now
+        self._last_counters = counters
+
+        STEP_DURATION.observe(duration_s, workflow=self.workflow, step=step)
+        return timing
+
+    def remaining_s(self) -> float | None:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    @contextmanager
+    def deadline_suspended(self) -> Iterator[None]:
+        previous, self.deadline = self.deadline, None
+        try:
+            yield
+        finally:
+            self.deadline = previous
+
+    def totals(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+
+@contextmanager
+def use_trace(trace: RequestTrace) -> Iterator[RequestTrace]:
+    """
+    Activates `trace` for provider calls made in this block. Must not span a `yield`
+    of a streaming generator (each resume may run in a different context).
+    """
+    previous = _current_trace.get()
+    _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.set(previous)
+
+
+def current_trace() -> RequestTrace | None:
+    return _current_trace.get()
+
+
+def record(kind: str, amount: int = 1) -> None:
+    if amount <= 0:
+        return
+    USAGE_TOTAL.inc(amount, kind=kind)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(kind, amount)
+
+
+def record_llm_usage(message: object) -> None:
+    """
+    Token usage from a LangChain AIMessage / AIMessageChunk (`usage_metadata`), when the provider reports it.
+    """
+    usage = getattr(message, "usage_metadata", None) or {}
+    record("prompt_tokens", int(usage.get("input_tokens") or 0))
+    record("completion_tokens", int(usage.get("output_tokens") or 0))
+
+
+def export_trace_to_otel(trace: RequestTrace, steps: list[tuple[str, StepTiming, dict]]) -> None:
+    """
+    Optional OpenTelemetry export (OTEL_TRACES_ENABLED=true): one span per workflow, one child span per step.
+    Uses the globally configured tracer provider; a no-op when opentelemetry is not installed.
+    """
+    if not env_bool("OTEL_TRACES_ENABLED", False):
+        return
+    try:
+        from opentelemetry import trace as otel_trace
+    except ImportError:
+        return
+
+    tracer = otel_trace.get_tracer("medirag")
+    end_ns = max((t.end_ns for _, t, _ in steps), default=time.time_ns())
+    root = tracer.start_span(f"workflow:{trace.workflow}", start_time=trace.started_ns)
+    try:
+        for kind, value in trace.totals().items():
+            root.set_attribute(f"medirag.usage.{kind}", value)
+        ctx = otel_trace.set_span_in_context(root)
+        for name, timing, meta in steps:
+            span = tracer.start_span(name, context=ctx, start_time=timing.start_ns)
+            for kind, value in timing.usage.items():
+                span.set_attribute(f"medirag.usage.{kind}", value)
+            for key, value in meta.items():
+                if isinstance(value, (str, bool, int, float)):
+                    span.set_attribute(f"medirag.{key}", value)
+                elif isinstance(value, dict):
+                    # e.g. retrieve:done step_ms={"main": 12.5, ...} -> medirag.step_ms.main
+                    for sub, v in value.items():
+                        if isinstance(v, (str, bool, int, float)):
+                            span.set_attribute(f"medirag.{key}.{sub}", v)
+            span.end(end_time=timing.end_ns)
+    finally:
+        root.end(end_time=end_ns)
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -21,6 +21,18 @@ class Document(Base):
     storage_path: Mapped[str] = mapped_column(String(500), nullable=False, default="")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # Vector index state (authoritative; see app/services/index_state.py)
+    chunks_indexed: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    embedding_model: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    indexed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    # Document-level fields extracted at index time (also on every chunk); cross-document search
+    # counts, filters and lists documents on them.
+    member_id: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+    patient_id: Mapped[str | None] = mapped_column(String(100), nullable=True, index=True)
+    decision: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    document_date: Mapped[date | None] = mapped_column(Date, nullable=True, index=True)
+
 
 class DocumentPage(Base):
     __tablename__ = "document_pages"
@@ -37,4 +49,8 @@ class DocumentPage(Base):
     )
     page_number: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
     text: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    # len(text), stored on insert: page listings read it without touching the (TOASTed) text.
+    chars: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=lambda ctx: len(ctx.get_current_parameters().get("text") or "")
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
\ No newline at end of file
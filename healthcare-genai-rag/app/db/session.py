@@ -1,17 +1,182 @@
 from __future__ import annotations
 
 import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-load_dotenv()
+from app.core.config import env_float, env_int
+from app.core.metrics import REGISTRY
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL não configurada. Verifique o arquivo .env")
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+class _PoolWaitStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
\ No newline at end of file
+    def record(self, waited_s: float, *, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += int(timed_out)
+            self.wait_seconds_total += waited_s
+            self.wait_seconds_max = max(self.wait_seconds_max, waited_s)
+
+
+pool_wait_stats = _PoolWaitStats()
+
+
+class _TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            pool_wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_wait_stats.record(time.perf_counter() - start, timed_out=False)
+        return conn
+
+
+def _engine_kwargs(url: str) -> dict:
+    kwargs: dict = {"pool_pre_ping": True}
+    if make_url(url).get_backend_name() == "sqlite":
+        return kwargs
+
+    # Defaults sized for one uvicorn worker (anyio threadpool = 40 threads); tune per deployment.
+    kwargs.update(
+        poolclass=_TimedQueuePool,
+        pool_size=env_int("DB_POOL_SIZE", 10),
+        max_overflow=env_int("DB_MAX_OVERFLOW", 20),
+        pool_timeout=env_float("DB_POOL_TIMEOUT_S", 10.0),
+        pool_recycle=env_int("DB_POOL_RECYCLE_S", 1800),
+    )
+    return kwargs
+
+
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+class _LazySessionmaker(sessionmaker):
+    """
+    sessionmaker that creates the engine on first use, so importing the app never connects.
+    """
+
+    def __call__(self, **local_kw) -> Session:
+        get_engine()
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autoflush=False, autocommit=False)
+
+
+def get_engine() -> Engine:
+    """
+    Creates the engine once (thread-safe). Called from the app lifespan at startup,
+    and lazily by SessionLocal() for scripts and tests.
+    """
+    global _engine
+    if _engine is not None:
+        return _engine
+
+    with _engine_lock:
+        if _engine is None:
+            load_dotenv()
+            database_url = os.getenv("DATABASE_URL")
+            if not database_url:
+                raise RuntimeError("DATABASE_URL não configurada. Verifique o arquivo .env")
+
+            _engine = create_engine(database_url, **_engine_kwargs(database_url))
+            SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def dispose_engine() -> None:
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
+@contextmanager
+def session_scope(db: Session | None = None) -> Iterator[Session]:
+    """
+    Yields `db` when the caller injected one (the caller owns and closes it),
+    otherwise a new session that is closed on exit.
+    """
+    if db is not None:
+        yield db
+        return
+
+    own = SessionLocal()
+    try:
+        yield own
+    finally:
+        own.close()
+
+
+def get_pool_metrics() -> dict[str, float | int | str]:
+    pool = get_engine().pool
+    metrics: dict[str, float | int | str] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    metrics.update(
+        checkouts=pool_wait_stats.checkouts,
+        checkout_timeouts=pool_wait_stats.timeouts,
+        checkout_wait_seconds_total=round(pool_wait_stats.wait_seconds_total, 6),
+        checkout_wait_seconds_max=round(pool_wait_stats.wait_seconds_max, 6),
+    )
+    return metrics
+
+
+def _pool_gauge_samples() -> dict[tuple[str, ...], float]:
+    # Never create the engine from a scrape.
+    if _engine is None or not isinstance(_engine.pool, QueuePool):
+        return {}
+    pool = _engine.pool
+    return {
+        ("checked_out",): pool.checkedout(),
+        ("checked_in",): pool.checkedin(),
+        ("overflow",): max(pool.overflow(), 0),
+        ("size",): pool.size(),
+    }
+
+
+REGISTRY.gauge(
+    "medirag_db_pool_connections",
+    "SQLAlchemy pool connections by state.",
+    _pool_gauge_samples,
+    ("state",),
+)
+REGISTRY.gauge(
+    "medirag_db_pool_checkout_wait_seconds_total",
+    "Total time spent waiting for a pooled connection.",
+    lambda: {(): pool_wait_stats.wait_seconds_total},
+)
+REGISTRY.gauge(
+    "medirag_db_pool_checkout_timeouts",
+    "Pool checkouts that timed out.",
+    lambda: {(): pool_wait_stats.timeouts},
+)
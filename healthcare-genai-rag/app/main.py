@@ -1,12 +1,83 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+
+from app.api.middleware import HTTPMetricsMiddleware
 from app.api.routers import documents, extract, rag
+from app.core.config import env_float
+from app.core.metrics import CONTENT_TYPE_LATEST, REGISTRY
+from app.db.session import dispose_engine, get_engine, get_pool_metrics
+from app.services.admission import reserve_worker_threads
+from app.services.document_chunks import TENANT_IDLE_S, offload_idle_tenants, tenancy_enabled
+from app.services.index_state import run_index_reconciliation
+from app.services.readiness import readiness_monitor
+
+logger = logging.getLogger(__name__)
+
+
+async def _index_reconciliation_loop(interval_s: float) -> None:
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            counts = await asyncio.to_thread(run_index_reconciliation)
+            logger.info("Index reconciliation finished: %s", counts)
+        except Exception:
+            logger.exception("Index reconciliation failed")
+
+
+async def _tenant_offload_loop(idle_s: float) -> None:
+    while True:
+        await asyncio.sleep(idle_s)
+        try:
+            moved = await asyncio.to_thread(offload_idle_tenants, idle_s)
+            if moved:
+                logger.info("Deactivated %d idle DocumentChunk tenants", moved)
+        except Exception:
+            logger.exception("Tenant offload failed")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Fail fast on a missing DATABASE_URL at startup (not at import time).
+    get_engine()
+    # Queued admission waiters hold worker threads: size the pool so they cannot starve admitted requests.
+    reserve_worker_threads()
+
+    tasks: list[asyncio.Task] = []
+
+    # Dependency probes for /ready run here, never in the request path.
+    tasks.append(asyncio.create_task(readiness_monitor.run_forever(env_float("READINESS_REFRESH_S", 10.0))))
+
+    # Optional: periodically re-check Postgres index state against the vector store (0 = disabled).
+    reconcile_interval_s = env_float("INDEX_RECONCILE_INTERVAL_S", 0.0)
+    if reconcile_interval_s > 0:
+        tasks.append(asyncio.create_task(_index_reconciliation_loop(reconcile_interval_s)))
+
+    # Optional: deactivate/offload DocumentChunk tenants left idle (VECTOR_TENANCY=document_bucket).
+    if tenancy_enabled() and TENANT_IDLE_S > 0:
+        tasks.append(asyncio.create_task(_tenant_offload_loop(TENANT_IDLE_S)))
+
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        dispose_engine()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Healthcare Document Intelligence with GenAI (MediRAG)")
+    app = FastAPI(title="Healthcare Document Intelligence with GenAI (MediRAG)", lifespan=lifespan)
+
+    app.add_middleware(HTTPMetricsMiddleware)
 
     app.include_router(documents.router)
     app.include_router(extract.router)
@@ -16,7 +87,26 @@ def create_app() -> FastAPI:
     def health() -> dict:
         return {"status": "ok"}
 
+    @app.get("/ready", tags=["health"])
+    async def ready() -> JSONResponse:
+        # async: answered on the event loop even when the threadpool is saturated.
+        # Cached results from the background probes (see app/services/readiness.py).
+        is_ready, checks = readiness_monitor.snapshot()
+        return JSONResponse(
+            {"status": "ready" if is_ready else "not_ready", "checks": checks},
+            status_code=200 if is_ready else 503,
+        )
+
+    @app.get("/health/db-pool", tags=["health"])
+    def db_pool() -> dict:
+        return get_pool_metrics()
+
+    @app.get("/metrics", tags=["health"], include_in_schema=False)
+    def metrics() -> Response:
+        # Prometheus text exposition format.
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
+
     return app
 
 
-app = create_app()
\ No newline at end of file
+app = create_app()
@@ -13,6 +13,16 @@ class AgenticQARequest(BaseModel):
     max_context_chars: int = Field(default=8000, ge=500, le=30000)
     retries: int = Field(default=1, ge=0, le=2)
     allow_insufficient: bool = Field(default=True)
+    # Total time budget; when it runs out the best answer so far is returned with a warning.
+    deadline_ms: int | None = Field(default=None, ge=100, le=600_000)
+    # Response size:
+    #   minimal:  answer, citations, verification ok/issues and warnings (no retrieved chunks, plan, steps
+    #             or claim spans; those models are not built at all)
+    #   standard: plus claim support, plan, workflow steps and the top 12 retrieved chunks
+    #   debug:    plus every retrieved chunk
+    verbosity: Literal["minimal", "standard", "debug"] = "standard"
+    # "ids": citations are returned as [page_number, chunk_index] pairs in `citation_ids`.
+    citation_mode: Literal["full", "ids"] = "full"
 
 
 class Citation(BaseModel):
@@ -28,11 +38,18 @@ class RetrievedChunk(BaseModel):
     chunk_index: int | None = None
     text: str = Field(min_length=1)
     similarity: float | None = Field(default=None, ge=0.0, le=1.0)
+    # Range of the chunk in the page text, (page_number, char_start) .. (end_page_number, char_end);
+    # None for chunks indexed before offsets were stored.
+    char_start: int | None = None
+    end_page_number: int | None = None
+    char_end: int | None = None
 
 
 class PlanStep(BaseModel):
     name: str
     query: str | None = None
+    # Names of steps that must finish before this one starts (steps without dependencies run concurrently).
+    depends_on: list[str] = Field(default_factory=list)
 
 
 class AgenticQAPlan(BaseModel):
@@ -40,14 +57,41 @@ class AgenticQAPlan(BaseModel):
     steps: list[PlanStep] = Field(default_factory=list)
 
 
+class SupportSpan(BaseModel):
+    """
+    A sentence of a cited chunk; `start`/`end` are character offsets into the chunk text (for highlighting).
+    """
+
+    page_number: int
+    chunk_index: int
+    start: int = Field(ge=0)
+    end: int = Field(ge=0)
+    text: str
+    score: float
+
+
+class ClaimSupport(BaseModel):
+    claim: str
+    supported: bool
+    # Share of the claim's content words found in its support spans.
+    coverage: float = Field(ge=0.0, le=1.0)
+    spans: list[SupportSpan] = Field(default_factory=list)
+
+
 class VerificationResult(BaseModel):
     ok: bool
     issues: list[str] = Field(default_factory=list)
+    claims: list[ClaimSupport] = Field(default_factory=list)
 
 
 class WorkflowStep(BaseModel):
     name: str
     meta: dict[str, object] = Field(default_factory=dict)
+    # Monotonic time since the previous step / since the workflow started.
+    duration_ms: float | None = None
+    elapsed_ms: float | None = None
+    # Provider/cache usage since the previous step (embedding_calls, llm_calls, prompt_tokens, ...).
+    usage: dict[str, int] = Field(default_factory=dict)
 
 
 class LLMStructuredCitation(BaseModel):
@@ -65,9 +109,16 @@ class AgenticQAResponse(BaseModel):
     question: str
     answer: str
     citations: list[Citation] = Field(default_factory=list)
+    # citation_mode="ids": (page_number, chunk_index) of each citation; `citations` is then empty.
+    citation_ids: list[tuple[int | None, int | None]] = Field(default_factory=list)
     verification: VerificationResult
     retrieved: list[RetrievedChunk] = Field(default_factory=list)
     plan: AgenticQAPlan | None = None
     steps: list[WorkflowStep] = Field(default_factory=list)
     warnings: list[str] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class AgenticQAStreamEvent(BaseModel):
+    event: Literal["step", "token", "result"]
+    data: object = None
@@ -22,6 +22,9 @@ class DocumentReadResponse(BaseModel):
     status: str
     content_type: str
     created_at: datetime
+    chunks_indexed: int | None = None
+    embedding_model: str | None = None
+    indexed_at: datetime | None = None
 
 class DocumentProcessResponse(BaseModel):
     document_id: str
@@ -41,10 +44,16 @@ class DocumentPageReadResponse(BaseModel):
     document_id: str
     page_number: int
     text: str | None = None
+    # Length of the page text (also reported when the text itself is excluded).
+    chars: int | None = None
 
 
 class DocumentPagesReadResponse(BaseModel):
     document_id: str
     pages: list[DocumentPageReadResponse]
+    # Pages / characters in this response (one keyset page).
     pages_count: int
-    total_chars: int
\ No newline at end of file
+    total_chars: int
+    # Pass as `after_page` for the next page; None on the last one.
+    next_after_page: int | None = None
+    has_more: bool = False
\ No newline at end of file
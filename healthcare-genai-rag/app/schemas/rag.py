@@ -1,16 +1,20 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from app.schemas.agentic_qa import WorkflowStep
+
 
 class RagExtractRequest(BaseModel):
     document_id: str = Field(min_length=1)
     query: str = Field(min_length=1, max_length=2000)
     top_k: int = Field(default=6, ge=1, le=20)
     max_evidence: int = Field(default=5, ge=1, le=20)
+    # Total time budget; when it runs out the best extraction so far is returned with a warning.
+    deadline_ms: int | None = Field(default=None, ge=100, le=600_000)
 
 
 class Medication(BaseModel):
@@ -50,6 +54,11 @@ class Evidence(BaseModel):
     chunk_index: int | None = None
     snippet: str = Field(min_length=1, max_length=2000)
     similarity: float | None = Field(default=None, ge=0.0, le=1.0)
+    # Range of the chunk in the page text, (page_number, char_start) .. (end_page_number, char_end);
+    # None for chunks indexed before offsets were stored.
+    char_start: int | None = None
+    end_page_number: int | None = None
+    char_end: int | None = None
 
 
 class RagExtractResponse(BaseModel):
@@ -58,4 +67,59 @@ class RagExtractResponse(BaseModel):
     extracted: PriorAuthExtraction
     evidence: list[Evidence] = Field(default_factory=list)
     warnings: list[str] = Field(default_factory=list)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    steps: list[WorkflowStep] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CorpusSearchRequest(BaseModel):
+    """
+    Search across every indexed document. Filters apply to the document-level fields extracted at
+    index time; `query` (optional) ranks the matching chunks by similarity.
+    """
+
+    query: str | None = Field(default=None, min_length=1, max_length=2000)
+    member_id: str | None = Field(default=None, min_length=1)
+    patient_id: str | None = Field(default=None, min_length=1)
+    decision: Literal["approved", "denied", "pending", "unknown"] | None = None
+    # Inclusive range on the document date (service date, else the letter date).
+    date_from: date | None = None
+    date_to: date | None = None
+    page: int = Field(default=1, ge=1, le=100)
+    page_size: int = Field(default=10, ge=1, le=50)
+    chunks_per_document: int = Field(default=3, ge=1, le=10)
+    # Chunk text for the returned page (one page-text query per returned document).
+    include_text: bool = False
+
+
+class CorpusChunkHit(BaseModel):
+    page_number: int | None = None
+    chunk_index: int | None = None
+    end_page_number: int | None = None
+    char_start: int | None = None
+    char_end: int | None = None
+    similarity: float | None = Field(default=None, ge=0.0, le=1.0)
+    text: str | None = None
+
+
+class CorpusDocumentHit(BaseModel):
+    document_id: str
+    filename: str = ""
+    member_id: str | None = None
+    patient_id: str | None = None
+    decision: str | None = None
+    document_date: date | None = None
+    best_similarity: float | None = Field(default=None, ge=0.0, le=1.0)
+    matched_chunks: int = 0
+    chunks: list[CorpusChunkHit] = Field(default_factory=list)
+
+
+class CorpusSearchResponse(BaseModel):
+    query: str | None = None
+    documents: list[CorpusDocumentHit] = Field(default_factory=list)
+    # Over every matching document (not only this page).
+    total_documents: int = 0
+    decision_counts: dict[str, int] = Field(default_factory=dict)
+    page: int = 1
+    page_size: int = 10
+    has_more: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,250 @@
+"""
+Admission control for the LLM-backed routes (/rag/extract, /rag/answer, /rag/answer/stream).
+
+Each request must pass, in order:
+  1. the client's token bucket (rate limit),
+  2. a bounded wait queue (rejected up front when the estimated wait exceeds the budget),
+  3. the client's concurrency semaphore, then the global one.
+Rejections raise AdmissionRejected with a Retry-After hint; the router maps it to HTTP 429.
+
+The routes are sync, so a queued request waits on one of anyio's worker threads. At startup
+reserve_worker_threads() sizes that pool for every queued waiter and every admitted request plus
+ADMISSION_THREAD_HEADROOM; otherwise waiters could take the threads the running requests need.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+
+from app.core.config import env_float, env_int
+from app.core.metrics import REGISTRY
+
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    "medirag_admission_rejections_total",
+    "Requests rejected by admission control (rate_limited, queue_full, deadline, queue_timeout).",
+    ("reason",),
+)
+ADMISSION_QUEUE_WAIT = REGISTRY.histogram(
+    "medirag_admission_queue_wait_seconds",
+    "Time admitted requests waited for a concurrency slot.",
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after_s: float) -> None:
+        super().__init__(f"Request rejected by admission control ({reason}); retry after {retry_after_s:.1f}s")
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after_s)))
+
+
+class TokenBucket:
+    """
+    `rate_per_s` tokens per second, up to `burst`. Not thread-safe (guarded by the controller lock).
+    """
+
+    def __init__(self, rate_per_s: float, burst: float) -> None:
+        self.rate_per_s = rate_per_s
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        # `now` may predate updated_at when it was read before the controller lock.
+        if now <= self.updated_at:
+            return
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate_per_s)
+        self.updated_at = now
+
+    def take(self, now: float) -> float:
+        """
+        Takes one token; returns 0, or the seconds until a token is available (nothing taken).
+        """
+        if self.rate_per_s <= 0:
+            return 0.0
+        self._refill(now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate_per_s
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+@dataclass
+class _ClientState:
+    semaphore: threading.BoundedSemaphore
+    bucket: TokenBucket
+    refs: int = 0  # requests holding or waiting on the semaphore
+
+
+@dataclass
+class AdmissionTicket:
+    controller: AdmissionController
+    client_state: _ClientState
+    admitted_at: float = field(default_factory=time.monotonic)
+    _released: bool = False
+
+    def release(self) -> None:
+        with self.controller._lock:
+            if self._released:
+                return
+            self._released = True
+        self.controller._release(self)
+
+    def __enter__(self) -> AdmissionTicket:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        max_concurrent: int | None = None,
+        max_concurrent_per_client: int | None = None,
+        max_queue: int | None = None,
+        max_queue_wait_s: float | None = None,
+        rate_per_s: float | None = None,
+        burst: float | None = None,
+    ) -> None:
+        self.max_concurrent = max_concurrent or env_int("ADMISSION_MAX_CONCURRENT", 16)
+        self.max_concurrent_per_client = max_concurrent_per_client or env_int("ADMISSION_MAX_CONCURRENT_PER_CLIENT", 4)
+        self.max_queue = max_queue if max_queue is not None else env_int("ADMISSION_MAX_QUEUE", 32)
+        self.max_queue_wait_s = (
+            max_queue_wait_s if max_queue_wait_s is not None else env_float("ADMISSION_MAX_QUEUE_WAIT_S", 10.0)
+        )
+        # 0 disables rate limiting.
+        self.rate_per_s = rate_per_s if rate_per_s is not None else env_float("RATE_LIMIT_PER_CLIENT_RPS", 5.0)
+        self.burst = burst if burst is not None else env_float("RATE_LIMIT_PER_CLIENT_BURST", 20.0)
+
+        self._global = threading.BoundedSemaphore(self.max_concurrent)
+        self._clients: dict[str, _ClientState] = {}
+        self._lock = threading.Lock()
+        self._last_prune = time.monotonic()
+
+        self.queued = 0
+        self.in_flight = 0
+        # EWMA of how long an admitted request holds its slot; drives the up-front wait estimate.
+        self.service_time_s = 1.0
+
+    def _client(self, client_id: str, now: float) -> _ClientState:
+        state = self._clients.get(client_id)
+        if state is None:
+            state = self._clients[client_id] = _ClientState(
+                semaphore=threading.BoundedSemaphore(self.max_concurrent_per_client),
+                bucket=TokenBucket(self.rate_per_s, self.burst),
+            )
+        if now - self._last_prune > 60.0:
+            self._last_prune = now
+            # Idle clients with a full bucket carry no state worth keeping.
+            for key in [k for k, s in self._clients.items() if s.refs == 0 and k != client_id and s.bucket.is_full(now)]:
+                del self._clients[key]
+        return state
+
+    def estimated_wait_s(self) -> float:
+        if self.in_flight < self.max_concurrent:
+            return 0.0
+        return self.service_time_s * (self.queued + 1) / self.max_concurrent
+
+    def _reject(self, reason: str, retry_after_s: float) -> AdmissionRejected:
+        ADMISSION_REJECTIONS.inc(reason=reason)
+        return AdmissionRejected(reason, retry_after_s)
+
+    def admit(self, client_id: str, *, deadline: float | None = None) -> AdmissionTicket:
+        """
+        Blocks until the request may run, or raises AdmissionRejected.
+        `deadline` (time.monotonic()) caps the queue wait to the request's own budget.
+        """
+        now = time.monotonic()
+        budget_s = self.max_queue_wait_s
+        if deadline is not None:
+            budget_s = min(budget_s, deadline - now)
+
+        with self._lock:
+            state = self._client(client_id, now)
+            wait_s = state.bucket.take(now)
+            if wait_s > 0:
+                raise self._reject("rate_limited", wait_s)
+
+            estimate_s = self.estimated_wait_s()
+            if self.queued >= self.max_queue:
+                raise self._reject("queue_full", max(estimate_s, 1.0))
+            if budget_s <= 0 or estimate_s > budget_s:
+                # Would not be served within its budget: reject now instead of timing out in the queue.
+                raise self._reject("deadline", max(estimate_s, 1.0))
+
+            self.queued += 1
+            state.refs += 1
+
+        acquired_client = acquired_global = False
+        try:
+            acquired_client = state.semaphore.acquire(timeout=budget_s)
+            if acquired_client:
+                remaining_s = max(0.0, budget_s - (time.monotonic() - now))
+                acquired_global = self._global.acquire(timeout=remaining_s)
+        finally:
+            with self._lock:
+                self.queued -= 1
+                if acquired_global:
+                    self.in_flight += 1
+                else:
+                    state.refs -= 1
+            if acquired_client and not acquired_global:
+                state.semaphore.release()
+
+        if not acquired_global:
+            raise self._reject("queue_timeout", max(self.estimated_wait_s(), 1.0))
+
+        ADMISSION_QUEUE_WAIT.observe(time.monotonic() - now)
+        return AdmissionTicket(controller=self, client_state=state)
+
+    def _release(self, ticket: AdmissionTicket) -> None:
+        held_s = time.monotonic() - ticket.admitted_at
+        self._global.release()
+        ticket.client_state.semaphore.release()
+        with self._lock:
+            self.in_flight -= 1
+            ticket.client_state.refs -= 1
+            self.service_time_s = 0.8 * self.service_time_s + 0.2 * held_s
+
+
+admission_controller = AdmissionController()
+
+# Worker threads kept free for everything else: other sync routes, streaming response iterators.
+ADMISSION_THREAD_HEADROOM = env_int("ADMISSION_THREAD_HEADROOM", 8)
+
+
+def reserve_worker_threads(controller: AdmissionController | None = None) -> int:
+    """
+    Raises anyio's default thread limiter (40 by default) to max_concurrent + max_queue + headroom.
+    Never lowers it. Must run on the event loop (app lifespan). Returns the new thread count.
+    """
+    import anyio.to_thread
+
+    controller = controller or admission_controller
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    required = controller.max_concurrent + controller.max_queue + ADMISSION_THREAD_HEADROOM
+    limiter.total_tokens = max(limiter.total_tokens, required)
+    return int(limiter.total_tokens)
+
+REGISTRY.gauge(
+    "medirag_admission_queue_depth",
+    "Requests waiting for a concurrency slot.",
+    lambda: {(): admission_controller.queued},
+)
+REGISTRY.gauge(
+    "medirag_admission_in_flight",
+    "Admitted requests currently running.",
+    lambda: {(): admission_controller.in_flight},
+)
@@ -1,20 +1,22 @@
 from __future__ import annotations
 
-import json
 import os
+import re
+import time
+from collections.abc import Generator, Iterator
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.db.models import Document, DocumentPage
+from app.core.tracing import RequestTrace, StepTiming, export_trace_to_otel, record, use_trace
+from app.db.session import session_scope
 from app.schemas.agentic_qa import (
     AgenticQAPlan,
     AgenticQARequest,
     AgenticQAResponse,
+    AgenticQAStreamEvent,
     Citation,
     LLMStructuredAnswer,
     PlanStep,
@@ -22,12 +24,23 @@ from app.schemas.agentic_qa import (
     VerificationResult,
     WorkflowStep,
 )
-from app.services.rag_pipeline import is_document_indexed
-from app.services.retriever import retrieve_document_chunks
-from app.services.vector_store import index_document_pages_to_weaviate
+from app.services.auto_index import ensure_document_indexed
+from app.services.chunk_text import hydrate_chunk_texts
+from app.services.claim_support import score_claims
+from app.services.evidence_index import ChunkKey, EvidenceIndex, IndexedChunk
+from app.services.json_repair import parse_json_tolerant, record_parse_outcome
+from app.services.plan_executor import run_plan_steps
+from app.services.providers import llm_invoke, llm_invoke_structured, structured_output_enabled, timed_dependency
+from app.services.resilience import DeadlineExceeded, default_deadline, get_breaker, is_deadline_error
+from app.services.retriever import retrieve_plan_step
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 
 def _get_llm() -> ChatOpenAI:
+    from langchain_openai import ChatOpenAI
+
     load_dotenv()
     api_key = os.getenv("OPENAI_API_KEY")
     model = os.getenv("OPENAI_MODEL")
@@ -35,7 +48,8 @@ def _get_llm() -> ChatOpenAI:
         raise RuntimeError("OPENAI_API_KEY is not set")
     if not model:
         raise RuntimeError("OPENAI_MODEL is not set")
-    return ChatOpenAI(model=model, api_key=api_key, temperature=0)
+    # Retries/backoff are handled by app/services/resilience.py.
+    return ChatOpenAI(model=model, api_key=api_key, temperature=0, max_retries=0)
 
 
 def _dedupe(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
@@ -53,7 +67,8 @@ def _dedupe(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
 def _build_context(chunks: list[dict[str, Any]], max_context_chars: int) -> str:
     chunks = sorted(
         chunks,
-        key=lambda x: (x.get("similarity") is not None, x.get("similarity") or 0.0),
+        # Facet-filter hits have no similarity; they are exact field-label matches, so they go first.
+        key=lambda x: (bool(x.get("field_match")), x.get("similarity") is not None, x.get("similarity") or 0.0),
         reverse=True,
     )
 
@@ -80,22 +95,6 @@ def _build_context(chunks: list[dict[str, Any]], max_context_chars: int) -> str:
     return "\n".join(lines)
 
 
-def _extract_json_candidate(text: str) -> str | None:
-    if not text:
-        return None
-    s = text.strip()
-
-    if s.startswith("{") and s.endswith("}"):
-        return s
-
-    start = s.find("{")
-    end = s.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return s[start : end + 1].strip()
-
-    return None
-
-
 def _build_repair_prompt(raw: str) -> str:
     raw_short = (raw or "").strip()
     if len(raw_short) > 3000:
@@ -121,30 +120,35 @@ Invalid response to fix:
 
 
 def parse_llm_structured_answer_with_repair(llm: ChatOpenAI, raw: str) -> tuple[LLMStructuredAnswer, list[str]]:
+    """
+    Local repair first (json_repair: fences, truncation, trailing commas); one LLM repair call
+    only when that still does not give a valid LLMStructuredAnswer.
+    """
     warnings: list[str] = []
 
-    candidate = _extract_json_candidate(raw) or (raw or "")
     try:
-        payload = json.loads(candidate)
+        payload, repaired = parse_json_tolerant(raw)
         parsed = LLMStructuredAnswer.model_validate(payload)
+        record_parse_outcome("LLMStructuredAnswer", "local_repair" if repaired else "valid")
+        if repaired:
+            warnings.append("Model output was invalid; repaired locally without another model call.")
         return parsed, warnings
-    except Exception:
+    except ValueError:
         repair_prompt = _build_repair_prompt(raw)
-        repaired = llm.invoke(repair_prompt).content
+        repaired_raw = llm_invoke(llm, repair_prompt)
 
-        candidate2 = _extract_json_candidate(repaired) or (repaired or "")
-        payload2 = json.loads(candidate2)
-        parsed2 = LLMStructuredAnswer.model_validate(payload2)
+        try:
+            payload2, _ = parse_json_tolerant(repaired_raw)
+            parsed2 = LLMStructuredAnswer.model_validate(payload2)
+        except ValueError:
+            record_parse_outcome("LLMStructuredAnswer", "failed")
+            raise
+        record_parse_outcome("LLMStructuredAnswer", "llm_repair")
 
         warnings.append("Model output was invalid; auto-repaired to valid JSON.")
         return parsed2, warnings
 
 
-def _tokenize(s: str) -> set[str]:
-    cleaned = "".join(ch.lower() if ch.isalnum() else " " for ch in (s or ""))
-    return {t for t in cleaned.split() if len(t) >= 3}
-
-
 def _infer_decision(answer: str) -> str | None:
     a = (answer or "").lower()
     if "approved" in a:
@@ -156,6 +160,22 @@ def _infer_decision(answer: str) -> str | None:
     return None
 
 
+def _wants_decision(question: str, answer: str = "") -> bool:
+    q = (question or "").lower()
+    a = (answer or "").lower()
+    return any(k in q for k in ["decision", "approved", "denied", "pending"]) or any(
+        k in a for k in ["approved", "denied", "pending"]
+    )
+
+
+def _wants_rationale(question: str, answer: str = "") -> bool:
+    q = (question or "").lower()
+    a = (answer or "").lower()
+    return any(k in q for k in ["rationale", "reason", "why"]) or any(
+        k in a for k in ["rationale", "reason", "because"]
+    )
+
+
 def _verify_groundedness(
     *,
     answer: str,
@@ -163,12 +183,18 @@ def _verify_groundedness(
     citations: list[Citation],
     retrieved_chunks: list[dict[str, Any]],
     allow_insufficient: bool,
+    evidence: EvidenceIndex | None = None,
+    include_claims: bool = True,
 ) -> VerificationResult:
     """
     Groundedness verifier:
     1) basic checks (answer non-empty, citations present unless Insufficient evidence.)
     2) citations must exist in retrieved chunks
-    3) cheap content checks against cited text
+    3) cheap content checks against cited text: the decision word, and sentence-level support
+       of each claim when a rationale is involved (app/services/claim_support.py)
+    `evidence` is the attempt's index over `retrieved_chunks` (built here when omitted).
+    With include_claims=False the claims are scored only when the rationale check needs them,
+    and not returned.
     """
     issues: list[str] = []
     a = (answer or "").strip()
@@ -186,255 +212,441 @@ def _verify_groundedness(
     if not citations:
         issues.append("Missing citations for a non-empty answer.")
 
-    retrieved_map: dict[tuple[int, int], dict[str, Any]] = {}
-    for ch in retrieved_chunks:
-        pn = ch.get("page_number")
-        ci = ch.get("chunk_index")
-        if pn is None or ci is None:
-            continue
-        retrieved_map[(int(pn), int(ci))] = ch
+    if evidence is None:
+        evidence = EvidenceIndex(retrieved_chunks)
 
-    cited_texts: list[str] = []
+    cited: list[IndexedChunk] = []
     missing: list[str] = []
 
     for c in citations:
         if c.page_number is None or c.chunk_index is None:
             continue
-        key = (int(c.page_number), int(c.chunk_index))
-        hit = retrieved_map.get(key)
-        if not hit:
+        hit = evidence.get(c.page_number, c.chunk_index)
+        if hit is None:
             missing.append(f"(page={c.page_number}, chunk={c.chunk_index})")
             continue
-        cited_texts.append(hit.get("text") or "")
+        cited.append(hit)
 
     if missing:
         issues.append(f"Citations not present in retrieved context: {', '.join(missing)}")
 
-    cited_blob = "\n".join(cited_texts).lower()
-
     # Trigger groundedness checks if either the QUESTION or the ANSWER suggests it.
     answer_lc = a.lower()
 
-    wants_decision = (
-            any(k in q for k in ["decision", "approved", "denied", "pending"])
-            or any(k in answer_lc for k in ["approved", "denied", "pending"])
-    )
-
-    wants_rationale = (
-            any(k in q for k in ["rationale", "reason", "why"])
-            or any(k in answer_lc for k in ["rationale", "reason", "because"])
-    )
+    wants_decision = _wants_decision(q, answer_lc)
+    wants_rationale = _wants_rationale(q, answer_lc)
 
     if wants_decision:
         decision = _infer_decision(a)
-        if decision and decision not in cited_blob:
+        if decision and not any(decision in hit.text_lc for hit in cited):
             issues.append(f"Decision '{decision}' not found in cited evidence text.")
 
+    # Sentence-level support of each claim by the cited chunks (also returned for highlighting).
+    claims = score_claims(a, cited) if include_claims or wants_rationale else []
+
     if wants_rationale:
-        # Cheap overlap check (avoid being too strict)
-        answer_tokens = _tokenize(a)
-        weak_stop = {
-            "patient",
-            "meets",
-            "clinical",
-            "coverage",
-            "criteria",
-            "failed",
-            "standard",
-            "therapies",
-            "approved",
-            "denied",
-            "pending",
-            "decision",
-            "rationale",
-            "reason",
-        }
-        answer_tokens = {t for t in answer_tokens if t not in weak_stop}
+        unsupported = [c for c in claims if not c.supported]
+        if unsupported:
+            detail = "; ".join(f"'{c.claim}' ({c.coverage:.0%} of its key words)" for c in unsupported)
+            issues.append(f"Rationale does not appear to be supported by cited evidence: {detail}")
+
+    return VerificationResult(ok=not issues, issues=issues, claims=claims if include_claims else [])
+
 
-        cited_tokens = _tokenize(cited_blob)
-        hits = len(answer_tokens.intersection(cited_tokens))
+_FACET_QUERIES = {
+    "dates": "service date admission date authorization period date",
+    "ids": "patient name patient id member id subscriber id member group dob date of birth",
+    "decision": "decision approved denied pending in review rationale reason",
+}
 
-        # heuristic thresholds
-        if answer_tokens and hits < 1:
-            issues.append("Rationale does not appear to be supported by cited evidence (no keyword overlap).")
+_DATES_RE = re.compile(
+    r"\b(?:dates?|when|dob|birth|admission|admitted|service|dos|authori[sz]ation period|period|valid|expires?)\b",
+    re.IGNORECASE,
+)
+_IDS_RE = re.compile(
+    r"\b(?:ids?|identifiers?|member|subscriber|group|name|who|dob|birth)\b",
+    re.IGNORECASE,
+)
 
-    return VerificationResult(ok=not issues, issues=issues)
+
+@dataclass(frozen=True)
+class _LLMOutput:
+    raw: str
+    # Set when the provider enforced the schema (structured output); otherwise `raw` is parsed locally.
+    parsed: LLMStructuredAnswer | None = None
 
 
 @dataclass(frozen=True)
 class Planner:
+    """
+    Picks the facet retrievals a question needs with cheap keyword rules:
+      - no facet recognised: the question plus every facet (multi_query, as broad as possible),
+      - one facet: the question alone (single_query); its own wording already targets that facet,
+      - several facets: the question plus each of them.
+    """
+
+    def _facets(self, question: str) -> list[str]:
+        wanted = {
+            "dates": bool(_DATES_RE.search(question or "")),
+            "ids": bool(_IDS_RE.search(question or "")),
+            "decision": _wants_decision(question) or _wants_rationale(question),
+        }
+        return [name for name in _FACET_QUERIES if wanted[name]]
+
     def plan(self, question: str) -> AgenticQAPlan:
-        steps = [
-            PlanStep(name="main", query=question),
-            PlanStep(name="dates", query="service date admission date authorization period date"),
-            PlanStep(name="ids", query="patient name patient id member id subscriber id member group dob date of birth"),
-            PlanStep(name="decision", query="decision approved denied pending in review rationale reason"),
-        ]
+        facets = self._facets(question)
+        if len(facets) == 1:
+            return AgenticQAPlan(strategy="single_query", steps=[PlanStep(name="main", query=question)])
+
+        steps = [PlanStep(name="main", query=question)]
+        steps.extend(PlanStep(name=name, query=_FACET_QUERIES[name]) for name in facets or _FACET_QUERIES)
         return AgenticQAPlan(strategy="multi_query", steps=steps)
 
 
 class AgenticQAService:
-    def __init__(self) -> None:
-        self.llm = _get_llm()
+    def __init__(
+        self,
+        llm: ChatOpenAI | None = None,
+        db: Session | None = None,
+        deadline: float | None = None,
+    ) -> None:
+        self.llm = llm or _get_llm()
+        # Request-scoped session (FastAPI dependency); a short-lived one is opened when omitted.
+        self.db = db
+        # Absolute time.monotonic() deadline; when omitted it is derived from req.deadline_ms in _run().
+        self.deadline = deadline
         self.planner = Planner()
         self.steps: list[WorkflowStep] = []
+        self._emitted_steps = 0
+        self.trace = RequestTrace(workflow="agentic_qa")
+        self._timings: list[tuple[str, StepTiming, dict[str, Any]]] = []
+        self._evidence_cache: dict[ChunkKey, IndexedChunk] = {}
+        # False for non-streamed minimal responses: steps are traced but no WorkflowStep is built.
+        self._keep_steps = True
 
     def _step(self, name: str, **meta: Any) -> None:
-        self.steps.append(WorkflowStep(name=name, meta=meta))
-
-    def _auto_index_if_missing(self, db: Session, document_id: str) -> int:
-        if is_document_indexed(document_id):
-            return 0
-
-        doc = db.get(Document, document_id)
-        if doc is None:
-            raise RuntimeError("Document not found")
-
-        pages = (
-            db.query(DocumentPage)
-            .filter(DocumentPage.document_id == document_id)
-            .order_by(DocumentPage.page_number.asc())
-            .all()
-        )
-        if not pages:
-            raise RuntimeError("Document has no parsed pages. Run /documents/{document_id}/process first.")
-
-        return index_document_pages_to_weaviate(
-            document_id=document_id,
-            filename=doc.filename,
-            content_type=doc.content_type,
-            pages=pages,
+        timing = self.trace.mark(name)
+        self._timings.append((name, timing, meta))
+        if not self._keep_steps:
+            if name == "done":
+                export_trace_to_otel(self.trace, self._timings)
+            return
+        self.steps.append(
+            WorkflowStep(
+                name=name,
+                meta=meta,
+                duration_ms=timing.duration_ms,
+                elapsed_ms=timing.elapsed_ms,
+                usage=timing.usage,
+            )
         )
+        if name == "done":
+            export_trace_to_otel(self.trace, self._timings)
 
+    def _drain_steps(self) -> Iterator[AgenticQAStreamEvent]:
+        while self._emitted_steps < len(self.steps):
+            step = self.steps[self._emitted_steps]
+            self._emitted_steps += 1
+            yield AgenticQAStreamEvent(event="step", data=step)
 
+    def _auto_index_if_missing(self, db: Session, document_id: str) -> int:
+        return ensure_document_indexed(db, document_id)
 
     def answer(self, req: AgenticQARequest) -> AgenticQAResponse:
+        for event in self._run(req, stream_tokens=False):
+            if event.event == "result":
+                return event.data
+        raise RuntimeError("Agentic QA finished without a result")
+
+    def stream(self, req: AgenticQARequest) -> Iterator[AgenticQAStreamEvent]:
+        """
+        Same workflow as `answer`, but yields events as they happen:
+          - "step":   each WorkflowStep, as soon as it is recorded
+          - "token":  LLM output deltas for the current attempt
+          - "result": the final (verified or last failed) AgenticQAResponse
+        Closing the iterator early stops the workflow.
+        """
+        return self._run(req, stream_tokens=True)
+
+    def _invoke_llm(
+        self, prompt: str, *, attempt: int, stream_tokens: bool
+    ) -> Iterator[AgenticQAStreamEvent | _LLMOutput]:
+        """
+        Yields token events while streaming; the last item is always the _LLMOutput.
+        Non-streaming calls ask the provider for schema-enforced output (LLM_STRUCTURED_OUTPUT).
+        """
+        if not stream_tokens:
+            with use_trace(self.trace):
+                if structured_output_enabled():
+                    raw, parsed = llm_invoke_structured(self.llm, prompt, LLMStructuredAnswer)
+                else:
+                    raw, parsed = llm_invoke(self.llm, prompt), None
+            yield _LLMOutput(raw=raw, parsed=parsed)
+            return
+
+        parts: list[str] = []
+        usage: dict[str, int] = {}
+        # A stream cannot be retried once tokens went out, but it still honours the LLM circuit breaker.
+        remaining_s = self.trace.remaining_s()
+        if remaining_s is not None and remaining_s <= 0:
+            raise DeadlineExceeded("Request deadline exceeded before calling llm")
+        breaker = get_breaker("llm")
+        breaker.before_call()
+        stream_kwargs = {} if remaining_s is None else {"timeout": remaining_s}
+        # Covers the whole stream, including time the consumer spends between tokens.
+        with timed_dependency("llm_stream"):
+            try:
+                for chunk in self.llm.stream(prompt, **stream_kwargs):
+                    # Providers report usage on (usually the last) chunk when stream usage is enabled.
+                    for key, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+                        if isinstance(value, int):
+                            usage[key] = usage.get(key, 0) + value
+                    delta = chunk.content or ""
+                    if not delta:
+                        continue
+                    parts.append(delta)
+                    yield AgenticQAStreamEvent(event="token", data={"attempt": attempt, "text": delta})
+            except Exception as e:
+                breaker.on_failure(e)
+                raise
+            except GeneratorExit:
+                # Consumer went away mid-stream: the provider was answering.
+                breaker.on_success()
+                raise
+        breaker.on_success()
+
+        # The trace is only activated between yields (see use_trace).
+        with use_trace(self.trace):
+            record("llm_calls")
+            record("prompt_tokens", usage.get("input_tokens", 0))
+            record("completion_tokens", usage.get("output_tokens", 0))
+        yield _LLMOutput(raw="".join(parts))
+
+    def _run(self, req: AgenticQARequest, *, stream_tokens: bool) -> Iterator[AgenticQAStreamEvent]:
         warnings: list[str] = []
-        self._step("plan:start", document_id=req.document_id, top_k=req.top_k, retries=req.retries)
+        self.trace.deadline = self.deadline if self.deadline is not None else default_deadline(req.deadline_ms)
+        self._keep_steps = stream_tokens or req.verbosity != "minimal"
+        self._step(
+            "plan:start",
+            document_id=req.document_id,
+            top_k=req.top_k,
+            retries=req.retries,
+            deadline_ms=req.deadline_ms,
+        )
+        yield from self._drain_steps()
 
-        db = next(get_db())
-        chunks_indexed = 0
-        try:
+        with session_scope(self.db) as db:
             self._step("tool:auto_index_if_missing")
-            chunks_indexed = self._auto_index_if_missing(db, req.document_id)
+            yield from self._drain_steps()
+            # Indexing is shared work (later requests reuse it); never cut it half-way for one request's budget.
+            with use_trace(self.trace), self.trace.deadline_suspended():
+                chunks_indexed = self._auto_index_if_missing(db, req.document_id)
             self._step("tool:auto_index_if_missing:done", chunks_indexed=chunks_indexed)
-        finally:
-            db.close()
+            # End the transaction so the pooled connection is not held during retrieval and LLM calls.
+            db.commit()
 
         if chunks_indexed > 0:
             warnings.append(f"Auto-index executed: {chunks_indexed} chunks indexed for this document.")
 
         plan = self.planner.plan(req.question)
-        self._step("plan:done", strategy=plan.strategy, steps=len(plan.steps))
+        self._step(
+            "plan:done",
+            strategy=plan.strategy,
+            steps=len(plan.steps),
+            facets=",".join(s.name for s in plan.steps),
+        )
+        yield from self._drain_steps()
 
         attempt = 0
         top_k = req.top_k
         last_resp: AgenticQAResponse | None = None
+        last_attempt_s = 0.0
+        deadline_warning: str | None = None
 
         while attempt <= req.retries:
-            self._step("retrieve:start", attempt=attempt, top_k=top_k)
-
-            retrieved_raw: list[dict[str, Any]] = []
-            for step in plan.steps:
-                if not step.query:
-                    continue
-                retrieved_raw.extend(
-                    retrieve_document_chunks(document_id=req.document_id, query=step.query, top_k=top_k)
+            remaining_s = self.trace.remaining_s()
+            if attempt > 0 and remaining_s is not None and remaining_s < last_attempt_s:
+                deadline_warning = (
+                    f"Deadline budget left ({remaining_s * 1000:.0f} ms) cannot fit another attempt "
+                    f"(last took {last_attempt_s * 1000:.0f} ms); returning the best answer so far."
                 )
+                self._step("retry:skipped", reason="deadline", remaining_ms=round(max(remaining_s, 0.0) * 1000))
+                yield from self._drain_steps()
+                break
+
+            started = time.perf_counter()
+            try:
+                resp = yield from self._attempt(
+                    req, plan, attempt=attempt, top_k=top_k, stream_tokens=stream_tokens, warnings=warnings
+                )
+            except Exception as e:
+                if not is_deadline_error(e, self.trace.remaining_s()):
+                    raise
+                deadline_warning = f"Deadline reached during attempt {attempt}; returning the best answer so far."
+                self._step("deadline", attempt=attempt, error=type(e).__name__)
+                yield from self._drain_steps()
+                break
+            last_attempt_s = time.perf_counter() - started
 
-            retrieved_raw = _dedupe(retrieved_raw)
-            self._step("retrieve:done", attempt=attempt, chunks=len(retrieved_raw))
-
-            context = _build_context(retrieved_raw, max_context_chars=req.max_context_chars)
-
-            prompt = (
-                "Return JSON ONLY (no markdown, no commentary) with exactly these keys:\n"
-                '{ "answer": "string", "citations": [{"page_number": 1, "chunk_index": 1}] }\n\n'
-                "Rules:\n"
-                "- Use ONLY the provided context.\n"
-                '- If context is insufficient, set answer exactly to: "Insufficient evidence." and citations to [].\n'
-                "- Otherwise, citations must include the sources you used.\n"
-                "- Do not invent.\n\n"
-                f"Question:\n{req.question}\n\n"
-                f"Context:\n{context}\n"
-            )
-
-            self._step("llm:invoke", attempt=attempt, context_chars=len(context))
-            raw = self.llm.invoke(prompt).content
-
-            self._step("llm:parse", attempt=attempt)
-            structured, parse_warnings = parse_llm_structured_answer_with_repair(self.llm, raw)
-            warnings.extend(parse_warnings)
+            last_resp = resp
+            if resp.verification.ok:
+                self._step("done", attempt=attempt)
+                resp.steps = list(self.steps)
+                yield from self._drain_steps()
+                yield AgenticQAStreamEvent(event="result", data=resp)
+                return
 
-            sim_map: dict[tuple[int, int], float | None] = {}
-            for ch in retrieved_raw:
-                pn = ch.get("page_number")
-                ci = ch.get("chunk_index")
-                if pn is None or ci is None:
-                    continue
-                sim_map[(int(pn), int(ci))] = ch.get("similarity")
-
-            citations = [
-                Citation(
-                    document_id=req.document_id,
-                    page_number=c.page_number,
-                    chunk_index=c.chunk_index,
-                    similarity=sim_map.get((int(c.page_number), int(c.chunk_index))),
-                )
-                for c in structured.citations
-            ]
+            top_k = min(top_k * 2, 30)
+            self._step("retry", next_top_k=top_k)
+            yield from self._drain_steps()
+            attempt += 1
 
-            verification = _verify_groundedness(
-                answer=structured.answer,
-                question=req.question,
-                citations=citations,
-                retrieved_chunks=retrieved_raw,
-                allow_insufficient=req.allow_insufficient,
-            )
-            self._step("verify", attempt=attempt, ok=verification.ok, issues=len(verification.issues))
+        if deadline_warning:
+            warnings.append(deadline_warning)
+        self._step("done", attempt=attempt, result="deadline" if deadline_warning else "return_last_failed")
+        yield from self._drain_steps()
 
-            resp = AgenticQAResponse(
+        if last_resp is None:
+            issue = "Deadline exceeded before an answer was produced" if deadline_warning else "Unknown failure"
+            last_resp = AgenticQAResponse(
                 document_id=req.document_id,
                 question=req.question,
-                answer=structured.answer,
-                citations=citations,
-                verification=verification,
-                retrieved=[
-                    RetrievedChunk(
-                        document_id=it.get("document_id") or req.document_id,
-                        page_number=it.get("page_number"),
-                        chunk_index=it.get("chunk_index"),
-                        text=it.get("text") or "",
-                        similarity=it.get("similarity"),
-                    )
-                    for it in retrieved_raw[: min(len(retrieved_raw), 12)]
-                ],
-                plan=plan,
+                answer="Insufficient evidence.",
+                citations=[],
+                verification=VerificationResult(ok=False, issues=[issue]),
+                retrieved=[],
+                plan=plan if req.verbosity != "minimal" else None,
                 steps=self.steps,
                 warnings=warnings,
             )
+        elif deadline_warning:
+            last_resp.warnings.append(deadline_warning)
+        last_resp.steps = list(self.steps)
+        yield AgenticQAStreamEvent(event="result", data=last_resp)
+
+    def _attempt(
+        self,
+        req: AgenticQARequest,
+        plan: AgenticQAPlan,
+        *,
+        attempt: int,
+        top_k: int,
+        stream_tokens: bool,
+        warnings: list[str],
+    ) -> Generator[AgenticQAStreamEvent, None, AgenticQAResponse]:
+        """
+        One retrieve -> answer -> verify pass; yields step/token events and returns the response.
+        """
+        self._step("retrieve:start", attempt=attempt, top_k=top_k)
+        yield from self._drain_steps()
+
+        with use_trace(self.trace):
+            outcomes = run_plan_steps(plan.steps, lambda step: retrieve_plan_step(document_id=req.document_id, step=step, top_k=top_k))
+
+        retrieved_raw: list[dict[str, Any]] = []
+        # Plan order (not completion order), so the main query's hits keep their rank in _dedupe.
+        for outcome in outcomes:
+            if outcome.error is not None:
+                raise outcome.error
+            retrieved_raw.extend(outcome.result)
+
+        # The vector store returns references only; the text is sliced from the document's pages.
+        with session_scope(self.db) as db:
+            retrieved_raw = hydrate_chunk_texts(db, req.document_id, _dedupe(retrieved_raw))
+            db.commit()
+        self._step(
+            "retrieve:done",
+            attempt=attempt,
+            chunks=len(retrieved_raw),
+            step_ms={o.step.name: o.duration_ms for o in outcomes},
+        )
 
-            last_resp = resp
-            if verification.ok:
-                self._step("done", attempt=attempt)
-                return resp
+        context = _build_context(retrieved_raw, max_context_chars=req.max_context_chars)
+
+        prompt = (
+            "Return JSON ONLY (no markdown, no commentary) with exactly these keys:\n"
+            '{ "answer": "string", "citations": [{"page_number": 1, "chunk_index": 1}] }\n\n'
+            "Rules:\n"
+            "- Use ONLY the provided context.\n"
+            '- If context is insufficient, set answer exactly to: "Insufficient evidence." and citations to [].\n'
+            "- Otherwise, citations must include the sources you used.\n"
+            "- Do not invent.\n\n"
+            f"Question:\n{req.question}\n\n"
+            f"Context:\n{context}\n"
+        )
 
-            top_k = min(top_k * 2, 30)
-            self._step("retry", next_top_k=top_k)
-            attempt += 1
+        self._step("llm:invoke", attempt=attempt, context_chars=len(context), streaming=stream_tokens)
+        yield from self._drain_steps()
+
+        output = _LLMOutput(raw="")
+        for item in self._invoke_llm(prompt, attempt=attempt, stream_tokens=stream_tokens):
+            if isinstance(item, _LLMOutput):
+                output = item
+            else:
+                yield item
+
+        self._step("llm:parse", attempt=attempt, structured=output.parsed is not None)
+        if output.parsed is not None:
+            record_parse_outcome("LLMStructuredAnswer", "structured")
+            structured = output.parsed
+        else:
+            with use_trace(self.trace):
+                structured, parse_warnings = parse_llm_structured_answer_with_repair(self.llm, output.raw)
+            warnings.extend(parse_warnings)
+
+        # Built once per attempt; chunks seen in an earlier attempt reuse their normalized text/tokens.
+        evidence = EvidenceIndex(retrieved_raw, cache=self._evidence_cache)
+
+        citations = [
+            Citation(
+                document_id=req.document_id,
+                page_number=c.page_number,
+                chunk_index=c.chunk_index,
+                similarity=evidence.similarity(c.page_number, c.chunk_index),
+            )
+            for c in structured.citations
+        ]
 
-        self._step("done", attempt=attempt, result="return_last_failed")
-        return last_resp or AgenticQAResponse(
+        verification = _verify_groundedness(
+            answer=structured.answer,
+            question=req.question,
+            citations=citations,
+            retrieved_chunks=retrieved_raw,
+            allow_insufficient=req.allow_insufficient,
+            evidence=evidence,
+            include_claims=req.verbosity != "minimal",
+        )
+        self._step("verify", attempt=attempt, ok=verification.ok, issues=len(verification.issues))
+
+        # Only what the requested verbosity returns is turned into response models.
+        retrieved_limit = {"minimal": 0, "standard": 12, "debug": len(retrieved_raw)}[req.verbosity]
+        resp = AgenticQAResponse(
             document_id=req.document_id,
             question=req.question,
-            answer="Insufficient evidence.",
-            citations=[],
-            verification=VerificationResult(ok=False, issues=["Unknown failure"]),
-            retrieved=[],
-            plan=plan,
+            answer=structured.answer,
+            citations=citations if req.citation_mode == "full" else [],
+            citation_ids=(
+                [(c.page_number, c.chunk_index) for c in citations] if req.citation_mode == "ids" else []
+            ),
+            verification=verification,
+            retrieved=[
+                RetrievedChunk(
+                    document_id=it.get("document_id") or req.document_id,
+                    page_number=it.get("page_number"),
+                    chunk_index=it.get("chunk_index"),
+                    text=it.get("text") or "",
+                    similarity=it.get("similarity"),
+                    char_start=it.get("char_start"),
+                    end_page_number=it.get("end_page_number"),
+                    char_end=it.get("char_end"),
+                )
+                for it in retrieved_raw[:retrieved_limit]
+            ],
+            plan=plan if req.verbosity != "minimal" else None,
             steps=self.steps,
             warnings=warnings,
         )
+        return resp
 
 def verify_groundedness_for_test(
     *,
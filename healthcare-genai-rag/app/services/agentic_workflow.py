@@ -1,22 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 from typing import Any
 import re
 
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.db.models import Document, DocumentPage
+from app.core.tracing import RequestTrace, StepTiming, export_trace_to_otel, use_trace
+from app.db.session import session_scope
+from app.schemas.agentic_qa import WorkflowStep
 from app.schemas.rag import RagExtractRequest, RagExtractResponse
-from app.services.rag_pipeline import extract_structured_json, is_document_indexed
-from app.services.vector_store import index_document_pages_to_weaviate
-
-
-@dataclass(frozen=True)
-class WorkflowStep:
-    name: str
-    meta: dict[str, Any]
+from app.services.auto_index import ensure_document_indexed
+from app.services.rag_pipeline import extract_structured_json
+from app.services.resilience import default_deadline
 
 
 class RagAgentWorkflow:
@@ -25,7 +20,7 @@ class RagAgentWorkflow:
       - plan: decide which steps/tools to run
       - execute: run extraction
       - fallback: return safe response with warnings on failure
-      - trace: keep an internal step list (can be logged later)
+      - trace: per-step timings and provider usage, returned in `steps`
     """
 
     _UNSUPPORTED_QUERY_RE = re.compile(
@@ -33,11 +28,29 @@ class RagAgentWorkflow:
         re.IGNORECASE,
     )
 
-    def __init__(self) -> None:
+    def __init__(self, db: Session | None = None, deadline: float | None = None) -> None:
+        # Request-scoped session (FastAPI dependency); a short-lived one is opened when omitted.
+        self.db = db
         self.steps: list[WorkflowStep] = []
+        # Absolute time.monotonic() deadline; when omitted it is derived from req.deadline_ms in run().
+        self.deadline = deadline
+        self.trace = RequestTrace(workflow="rag_extract")
+        self._timings: list[tuple[str, StepTiming, dict[str, Any]]] = []
 
     def _step(self, name: str, **meta: Any) -> None:
-        self.steps.append(WorkflowStep(name=name, meta=meta))
+        timing = self.trace.mark(name)
+        self._timings.append((name, timing, meta))
+        self.steps.append(
+            WorkflowStep(
+                name=name,
+                meta=meta,
+                duration_ms=timing.duration_ms,
+                elapsed_ms=timing.elapsed_ms,
+                usage=timing.usage,
+            )
+        )
+        if name in {"done", "fallback"}:
+            export_trace_to_otel(self.trace, self._timings)
 
     def _unsupported_query_warning(self, query: str) -> str | None:
         q = (query or "").strip()
@@ -55,35 +68,20 @@ class RagAgentWorkflow:
         Agent tool: ensure Weaviate has chunks for this document.
         Returns number of chunks indexed (0 if already indexed).
         """
-        if is_document_indexed(document_id):
-            return 0
-
-        doc = db.get(Document, document_id)
-        if doc is None:
-            raise RuntimeError("Document not found")
-
-        pages = (
-            db.query(DocumentPage)
-            .filter(DocumentPage.document_id == document_id)
-            .order_by(DocumentPage.page_number.asc())
-            .all()
-        )
-        if not pages:
-            raise RuntimeError("Document has no parsed pages. Run /documents/{document_id}/process first.")
-
-        return index_document_pages_to_weaviate(
-            document_id=document_id,
-            filename=doc.filename,
-            content_type=doc.content_type,
-            pages=pages,
-        )
+        return ensure_document_indexed(db, document_id)
 
     def run(self, req: RagExtractRequest) -> RagExtractResponse:
+        self.trace.deadline = self.deadline if self.deadline is not None else default_deadline(req.deadline_ms)
+        with use_trace(self.trace):
+            return self._run(req)
+
+    def _run(self, req: RagExtractRequest) -> RagExtractResponse:
         self._step(
             "plan",
             document_id=req.document_id,
             top_k=req.top_k,
             max_evidence=req.max_evidence,
+            deadline_ms=req.deadline_ms,
         )
 
         unsupported_warning = self._unsupported_query_warning(req.query)
@@ -91,23 +89,26 @@ class RagAgentWorkflow:
             self._step("guardrail:unsupported_query", warning=unsupported_warning)
 
         # Agentic remediation: index-if-missing
-        db = next(get_db())
-        try:
+        with session_scope(self.db) as db:
             self._step("tool:auto_index_if_missing")
-            chunks_indexed = self._auto_index_if_missing(db, req.document_id)
+            # Indexing is shared work (later requests reuse it); never cut it half-way for one request's budget.
+            with self.trace.deadline_suspended():
+                chunks_indexed = self._auto_index_if_missing(db, req.document_id)
             self._step("tool:auto_index_if_missing:done", chunks_indexed=chunks_indexed)
-        finally:
-            db.close()
+            # End the transaction so the pooled connection is not held during retrieval and LLM calls.
+            db.commit()
 
         self._step("tool:extract_structured_json", query_len=len(req.query or ""))
 
         try:
-            resp = extract_structured_json(
-                document_id=req.document_id,
-                query=req.query,
-                top_k=req.top_k,
-                max_evidence=req.max_evidence,
-            )
+            with session_scope(self.db) as db:
+                resp = extract_structured_json(
+                    document_id=req.document_id,
+                    query=req.query,
+                    top_k=req.top_k,
+                    max_evidence=req.max_evidence,
+                    db=db,
+                )
 
             resp.warnings = list(resp.warnings or [])
 
@@ -118,6 +119,7 @@ class RagAgentWorkflow:
                 resp.warnings.append(unsupported_warning)
 
             self._step("done", warnings_count=len(resp.warnings or []))
+            resp.steps = list(self.steps)
             return resp
         except Exception as e:
             self._step("fallback", error=str(e))
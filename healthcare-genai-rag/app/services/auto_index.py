@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import env_float
+from app.db.models import Document, DocumentPage
+from app.services.index_state import (
+    INDEX_ERROR_STATUS,
+    INDEXING_STATUS,
+    adopt_existing_index,
+    is_document_index_current,
+    mark_document_indexed,
+    mark_document_not_indexed,
+    record_document_fields,
+)
+from app.services.vector_store import delete_document_chunks, index_document_pages_to_weaviate
+
+logger = logging.getLogger(__name__)
+
+_LOCK_TIMEOUT_S = env_float("AUTO_INDEX_LOCK_TIMEOUT_S", 300.0)
+
+# document_id -> [lock, number of threads holding or waiting on it]
+_local_locks: dict[str, list] = {}
+_local_locks_guard = threading.Lock()
+
+
+def _advisory_lock_key(document_id: str) -> int:
+    digest = hashlib.blake2b(document_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@contextmanager
+def _local_document_lock(document_id: str) -> Iterator[None]:
+    with _local_locks_guard:
+        entry = _local_locks.setdefault(document_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        if not entry[0].acquire(timeout=_LOCK_TIMEOUT_S):
+            raise TimeoutError(f"Timed out waiting for in-flight indexing of document {document_id}")
+        try:
+            yield
+        finally:
+            entry[0].release()
+    finally:
+        with _local_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                _local_locks.pop(document_id, None)
+
+
+@contextmanager
+def _advisory_document_lock(db: Session, document_id: str) -> Iterator[None]:
+    """
+    Cross-process lock on Postgres (session-level advisory lock on a dedicated connection,
+    released automatically if the worker dies). No-op on other dialects.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        yield
+        return
+
+    key = _advisory_lock_key(document_id)
+    with bind.connect() as conn:
+        conn.execute(text("SELECT set_config('lock_timeout', :t, false)"), {"t": f"{int(_LOCK_TIMEOUT_S * 1000)}ms"})
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+            conn.execute(text("SELECT set_config('lock_timeout', '0', false)"))
+
+
+@contextmanager
+def document_index_lock(db: Session, document_id: str) -> Iterator[None]:
+    """
+    Single-flight guard for indexing one document: threads in this process wait on a local lock,
+    other workers wait on the Postgres advisory lock.
+    """
+    with _local_document_lock(document_id):
+        with _advisory_document_lock(db, document_id):
+            yield
+
+
+def _load_pages(db: Session, document_id: str) -> list[DocumentPage]:
+    return (
+        db.query(DocumentPage)
+        .filter(DocumentPage.document_id == document_id)
+        .order_by(DocumentPage.page_number.asc())
+        .all()
+    )
+
+
+def ensure_document_indexed(db: Session, document_id: str) -> int:
+    """
+    Agent tool: ensure the vector store has chunks for this document.
+    Concurrent callers for the same document block on the in-flight job instead of indexing again.
+    Returns number of chunks indexed (0 if already indexed).
+    """
+    if is_document_index_current(db, document_id):
+        return 0
+
+    with document_index_lock(db, document_id):
+        # Whoever held the lock before us may have finished the job.
+        db.expire_all()
+        if is_document_index_current(db, document_id) or adopt_existing_index(db, document_id):
+            return 0
+
+        doc = db.get(Document, document_id)
+        if doc is None:
+            raise RuntimeError("Document not found")
+
+        pages = _load_pages(db, document_id)
+        if not pages:
+            raise RuntimeError("Document has no parsed pages. Run /documents/{document_id}/process first.")
+
+        if doc.status in {INDEXING_STATUS, INDEX_ERROR_STATUS}:
+            # A failed or interrupted run may have left chunks behind.
+            delete_document_chunks(document_id)
+        return _index_pages(db, doc, pages)
+
+
+def reindex_document(db: Session, doc: Document, pages: list[DocumentPage]) -> int:
+    """
+    Explicit (re)index, serialized with auto-indexing. Existing chunks are replaced, not duplicated;
+    they are deleted whatever the previous status (an `index_error` run may have left some behind).
+    """
+    with document_index_lock(db, doc.id):
+        delete_document_chunks(doc.id)
+        return _index_pages(db, doc, pages)
+
+
+def _index_pages(db: Session, doc: Document, pages: list[DocumentPage]) -> int:
+    """
+    One index run, under document_index_lock. The attempt is recorded first (`indexing`: a worker
+    that dies mid-run leaves it, so its chunks are never adopted). On failure the chunks written so
+    far are deleted and the document is marked `index_error` before the error propagates.
+    """
+    mark_document_not_indexed(db, doc, status=INDEXING_STATUS)
+    try:
+        chunks_indexed = index_document_pages_to_weaviate(
+            document_id=doc.id,
+            filename=doc.filename,
+            content_type=doc.content_type,
+            pages=pages,
+        )
+    except Exception:
+        try:
+            delete_document_chunks(doc.id)
+        except Exception:
+            # The status below keeps the leftovers from being adopted; the next run deletes them.
+            logger.exception("Could not delete the partial index of document %s", doc.id)
+        mark_document_not_indexed(db, doc, status=INDEX_ERROR_STATUS)
+        raise
+    record_document_fields(doc, pages)
+    mark_document_indexed(db, doc, chunks_indexed=chunks_indexed)
+    return chunks_indexed
@@ -0,0 +1,115 @@
+"""
+Chunk text served from Postgres instead of the vector store.
+
+Each DocumentChunk records where it sits in the page text ((page_number, char_start) ..
+(end_page_number, char_end) into DocumentPage.text; chunks may span pages), so retrieval asks the
+vector store for ids, offsets and scores only and the text is sliced here from the page rows: one
+query per document for the pages the hits fall on.
+
+Chunks indexed before offsets were stored (or whose page row is gone) get their text from the vector
+store instead, in one fetch for all of them.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.tracing import record
+from app.db.models import DocumentPage
+from app.services.chunker import slice_page_span
+from app.services.document_chunks import document_chunks
+from app.services.providers import fetch_objects
+from app.services.weaviate_client import get_weaviate_client
+
+# What retrieval asks the vector store for (no `text`).
+CHUNK_REF_PROPERTIES = [
+    "document_id",
+    "page_number",
+    "chunk_index",
+    "char_start",
+    "end_page_number",
+    "char_end",
+    "sentence_offsets",
+]
+
+
+def load_page_texts(db: Session, document_id: str, page_numbers: set[int]) -> dict[int, str]:
+    """
+    Page text by page number, in a single query.
+    """
+    if not page_numbers:
+        return {}
+    rows = db.execute(
+        select(DocumentPage.page_number, DocumentPage.text).where(
+            DocumentPage.document_id == document_id,
+            DocumentPage.page_number.in_(sorted(page_numbers)),
+        )
+    ).all()
+    return {int(pn): text or "" for pn, text in rows}
+
+
+def _fetch_chunk_texts(document_id: str, keys: set[tuple[int, int]]) -> dict[tuple[int, int], str]:
+    from weaviate.classes.query import Filter
+
+    pages = sorted({pn for pn, _ in keys})
+    client = get_weaviate_client()
+    try:
+        collection = document_chunks(client, document_id)
+        result = fetch_objects(
+            collection,
+            filters=Filter.by_property("document_id").equal(document_id)
+            & Filter.any_of([Filter.by_property("page_number").equal(pn) for pn in pages]),
+            return_properties=["page_number", "chunk_index", "text"],
+        )
+    finally:
+        client.close()
+
+    out: dict[tuple[int, int], str] = {}
+    for obj in result.objects:
+        props = obj.properties or {}
+        key = (int(props.get("page_number") or 0), int(props.get("chunk_index") or 0))
+        if key in keys:
+            out[key] = props.get("text") or ""
+    return out
+
+
+def hydrate_chunk_texts(db: Session | None, document_id: str, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Fills `text` on retrieval hits that do not carry it yet and drops hits left without text.
+    `db` may be None (no page rows available): every hit then takes the vector-store fallback.
+    """
+    missing = [it for it in items if not it.get("text")]
+    if not missing:
+        return items
+
+    sliceable = [it for it in missing if it.get("char_start") is not None and it.get("char_end") is not None]
+    if db is not None and sliceable:
+        wanted: set[int] = set()
+        for it in sliceable:
+            first = int(it["page_number"])
+            wanted.update(range(first, int(it.get("end_page_number") or first) + 1))
+        pages = load_page_texts(db, document_id, wanted)
+        for it in sliceable:
+            first = int(it["page_number"])
+            text = slice_page_span(
+                pages, first, int(it["char_start"]), int(it.get("end_page_number") or first), int(it["char_end"])
+            )
+            if text:
+                it["text"] = text
+
+    fallback = {
+        (int(it["page_number"]), int(it["chunk_index"]))
+        for it in missing
+        if not it.get("text") and it.get("page_number") is not None and it.get("chunk_index") is not None
+    }
+    if fallback:
+        record("chunk_text_fallbacks", len(fallback))
+        texts = _fetch_chunk_texts(document_id, fallback)
+        for it in missing:
+            if not it.get("text") and it.get("page_number") is not None and it.get("chunk_index") is not None:
+                it["text"] = texts.get((int(it["page_number"]), int(it["chunk_index"])), "")
+
+    return [it for it in items if it.get("text")]
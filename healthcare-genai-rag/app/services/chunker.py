@@ -0,0 +1,243 @@
+"""
+Form-aware chunker for parsed document pages.
+
+Prior-auth forms are sequences of short "Label: value" lines under section headings. The text is cut
+into line units (a heading or a value-less "Label:" line is glued to the line that follows it, so a
+label never ends a chunk without its value), units are grouped into blocks (a block starts at a
+heading, a "Label:" line, a blank line or a new page), and blocks are packed into chunks of at most
+CHUNK_MAX_TOKENS tokens:
+  - a chunk preferably ends at a block boundary once it holds CHUNK_MIN_TOKENS,
+  - a block too large for one chunk is split between lines, with CHUNK_OVERLAP_TOKENS of trailing
+    lines repeated at the start of the next chunk,
+  - a page break is only a block boundary: the tail of a page joins the start of the next one
+    instead of becoming a tiny chunk; the chunk records both ends (page_number, char_start) ..
+    (end_page_number, char_end).
+
+Tokens are counted with an approximate word/punctuation counter by default; CHUNK_TOKENIZER=tiktoken
+uses the cl100k_base encoding instead (downloaded on first use).
+
+The chunker holds configuration only: one instance (`get_chunker()`) serves every document.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.config import env_int, env_str
+
+_LINE_RE = re.compile(r"[^\r\n]+")
+_APPROX_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+# "Eligibility requirements:" / "Rationale:" (value on the next line(s)).
+_LABEL_ONLY_RE = re.compile(r"^[A-Za-z][\w &/()#.,'-]{0,60}:$")
+# Short title-like line without a value: "Clinical Information", "PRIOR AUTHORIZATION REQUEST (SAMPLE)".
+_HEADING_RE = re.compile(r"^[A-Z][\w &/()'-]{0,80}$")
+_HEADING_MAX_WORDS = 6
+
+
+def approx_token_count(text: str) -> int:
+    return len(_APPROX_TOKEN_RE.findall(text))
+
+
+@lru_cache(maxsize=1)
+def _tiktoken_counter() -> Callable[[str], int]:
+    import tiktoken
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def slice_page_span(
+    page_texts: dict[int, str], page_number: int, char_start: int, end_page_number: int, char_end: int
+) -> str | None:
+    """
+    Text of a chunk from its page range. Cross-page chunks are the page pieces, stripped and joined
+    by a newline. None when an end page is missing or the offsets do not fit it.
+    """
+    first = page_texts.get(page_number)
+    last = page_texts.get(end_page_number)
+    if first is None or last is None or not 0 <= char_start <= len(first) or not 0 <= char_end <= len(last):
+        return None
+    if end_page_number == page_number:
+        return first[char_start:char_end] if char_start < char_end else None
+    parts = [first[char_start:]]
+    parts.extend(page_texts.get(pn, "") for pn in range(page_number + 1, end_page_number))
+    parts.append(last[:char_end])
+    return "\n".join(p.strip() for p in parts if p.strip()) or None
+
+
+@dataclass(frozen=True)
+class Chunk:
+    page_number: int
+    # 1-based position among the chunks that start on `page_number`.
+    chunk_index: int
+    char_start: int
+    end_page_number: int
+    char_end: int
+    text: str
+    tokens: int
+
+
+@dataclass(frozen=True)
+class _Unit:
+    page_number: int
+    start: int
+    end: int
+    tokens: int
+    starts_block: bool
+
+
+def _is_heading(line: str) -> bool:
+    if _LABEL_ONLY_RE.match(line):
+        return True
+    return bool(_HEADING_RE.match(line)) and len(line.split()) <= _HEADING_MAX_WORDS and not line.endswith(".")
+
+
+@dataclass(frozen=True)
+class FormAwareChunker:
+    max_tokens: int = 256
+    min_tokens: int = 64
+    overlap_tokens: int = 32
+    tokenizer: str = "approx"
+
+    def count_tokens(self, text: str) -> int:
+        if self.tokenizer == "tiktoken":
+            return _tiktoken_counter()(text)
+        return approx_token_count(text)
+
+    def _units(self, page_number: int, text: str) -> list[_Unit]:
+        lines: list[tuple[int, int, bool]] = []  # (start, end, blank line before)
+        prev_end = 0
+        for m in _LINE_RE.finditer(text):
+            start, end = m.start(), m.end()
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if start == end:
+                continue
+            lines.append((start, end, text.count("\n", prev_end, start) >= 2))
+            prev_end = end
+
+        units: list[_Unit] = []
+        i = 0
+        while i < len(lines):
+            start, end, blank_before = lines[i]
+            heading = _is_heading(text[start:end])
+            # A heading/label takes the next line with it (unless a blank line separates them).
+            if heading and i + 1 < len(lines) and not lines[i + 1][2]:
+                end = lines[i + 1][1]
+                i += 1
+            starts_block = not units or heading or blank_before
+            units.extend(self._fit(page_number, text, start, end, starts_block))
+            i += 1
+        return units
+
+    def _fit(self, page_number: int, text: str, start: int, end: int, starts_block: bool) -> list[_Unit]:
+        """
+        One unit, or several (split between words) for a line longer than max_tokens.
+        """
+        tokens = self.count_tokens(text[start:end])
+        if tokens <= self.max_tokens:
+            return [_Unit(page_number, start, end, tokens, starts_block)]
+
+        out: list[_Unit] = []
+        piece_start = start
+        piece_end = start
+        piece_tokens = 0
+        for m in re.finditer(r"\S+", text[start:end]):
+            word_start, word_end = start + m.start(), start + m.end()
+            word_tokens = self.count_tokens(m.group())
+            if piece_tokens and piece_tokens + word_tokens > self.max_tokens:
+                out.append(_Unit(page_number, piece_start, piece_end, piece_tokens, starts_block and not out))
+                piece_start, piece_tokens = word_start, 0
+            piece_end = word_end
+            piece_tokens += word_tokens
+        out.append(_Unit(page_number, piece_start, piece_end, piece_tokens, starts_block and not out))
+        return out
+
+    def _pack(self, units: list[_Unit]) -> list[list[_Unit]]:
+        groups: list[list[_Unit]] = []
+        current: list[_Unit] = []
+        current_tokens = 0
+
+        for unit in units:
+            while current and current_tokens + unit.tokens > self.max_tokens:
+                # Latest block boundary that still leaves a big enough chunk.
+                cut = 0
+                prefix = 0
+                for j, u in enumerate(current):
+                    if j > 0 and u.starts_block and prefix >= self.min_tokens:
+                        cut = j
+                    prefix += u.tokens
+                if cut:
+                    groups.append(current[:cut])
+                    current = current[cut:]
+                    current_tokens = sum(u.tokens for u in current)
+                    continue
+
+                groups.append(current)
+                carried: list[_Unit] = []
+                if not unit.starts_block:
+                    # Mid-block split: repeat trailing lines for context.
+                    carried_tokens = 0
+                    for u in reversed(current):
+                        if carried_tokens + u.tokens > self.overlap_tokens or u is current[0]:
+                            break
+                        carried.insert(0, u)
+                        carried_tokens += u.tokens
+                    if carried_tokens + unit.tokens > self.max_tokens:
+                        carried = []
+                current = carried
+                current_tokens = sum(u.tokens for u in current)
+                break
+
+            current.append(unit)
+            current_tokens += unit.tokens
+
+        if current:
+            groups.append(current)
+        return groups
+
+    def chunk_pages(self, pages: Iterable[tuple[int, str]]) -> list[Chunk]:
+        """
+        Chunks of a document from its (page_number, text) pairs, in page order.
+        """
+        page_texts: dict[int, str] = {}
+        units: list[_Unit] = []
+        for page_number, text in sorted(pages, key=lambda p: p[0]):
+            page_texts[page_number] = text or ""
+            units.extend(self._units(page_number, text or ""))
+
+        chunks: list[Chunk] = []
+        per_page: dict[int, int] = {}
+        for group in self._pack(units):
+            first, last = group[0], group[-1]
+            text = slice_page_span(page_texts, first.page_number, first.start, last.page_number, last.end)
+            if not text:
+                continue
+            per_page[first.page_number] = per_page.get(first.page_number, 0) + 1
+            chunks.append(
+                Chunk(
+                    page_number=first.page_number,
+                    chunk_index=per_page[first.page_number],
+                    char_start=first.start,
+                    end_page_number=last.page_number,
+                    char_end=last.end,
+                    text=text,
+                    tokens=sum(u.tokens for u in group),
+                )
+            )
+        return chunks
+
+
+@lru_cache(maxsize=1)
+def get_chunker() -> FormAwareChunker:
+    return FormAwareChunker(
+        max_tokens=env_int("CHUNK_MAX_TOKENS", 256),
+        min_tokens=env_int("CHUNK_MIN_TOKENS", 64),
+        overlap_tokens=env_int("CHUNK_OVERLAP_TOKENS", 32),
+        tokenizer=env_str("CHUNK_TOKENIZER", "approx"),
+    )
@@ -0,0 +1,126 @@
+"""
+Sentence-level support for answer claims.
+
+The answer is split into claims (sentences/clauses) and every claim is scored against every
+sentence of the cited chunks with BM25 (binary term frequency). Each sentence is first reduced to
+the claim words it contains, one set intersection per sentence; the scores are then sums over those
+few words. At verifier sizes (a few claims, tens of sentences) this is about half the cost of
+building incidence matrices. A claim is supported when its best sentences (at most CLAIM_MAX_SPANS) cover at least
+CLAIM_MIN_COVERAGE of its content words; those sentences are returned as support spans.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import Counter
+
+from app.core.config import env_float, env_int
+from app.schemas.agentic_qa import ClaimSupport, SupportSpan
+from app.services.evidence_index import IndexedChunk, sentence_spans, tokenize
+
+_K1 = 1.2
+_B = 0.75
+
+# Generic prior-auth words that would make any rationale look "supported".
+WEAK_STOP = frozenset(
+    {
+        "patient",
+        "meets",
+        "clinical",
+        "coverage",
+        "criteria",
+        "failed",
+        "standard",
+        "therapies",
+        "approved",
+        "denied",
+        "pending",
+        "decision",
+        "rationale",
+        "reason",
+    }
+)
+# Function words (3+ letters; shorter tokens are already dropped by the tokenizer).
+_STOPWORDS = frozenset(
+    {
+        "the", "and", "for", "was", "were", "has", "had", "have", "with", "that", "this", "from",
+        "are", "but", "not", "because", "due", "after", "before", "been", "being", "which", "who",
+        "their", "they", "his", "her", "its", "into", "than", "then", "also", "all", "any", "per",
+        "will", "would", "should", "could", "may", "did", "does", "there", "these", "those",
+    }
+)
+
+
+def claim_tokens(claim: str) -> frozenset[str]:
+    return tokenize(claim) - WEAK_STOP - _STOPWORDS
+
+
+def score_claims(answer: str, cited: list[IndexedChunk]) -> list[ClaimSupport]:
+    """
+    One ClaimSupport per answer claim that has content words (claims made only of decision
+    words or generic terms are left to the decision check).
+    """
+    claims = [(answer[s:e], claim_tokens(answer[s:e])) for s, e in sentence_spans(answer)]
+    claims = [(text, tokens) for text, tokens in claims if tokens]
+    if not claims:
+        return []
+
+    # Candidate sentences of the cited chunks, as parallel lists (sentence splits/tokens are cached per chunk).
+    owners: list[IndexedChunk] = []
+    spans: list[tuple[int, int]] = []
+    sentence_tokens: list[frozenset[str]] = []
+    seen: set[tuple[int, int]] = set()
+    for chunk in cited:
+        if chunk.key in seen:
+            continue
+        seen.add(chunk.key)
+        owners.extend([chunk] * len(chunk.sentences))
+        spans.extend(chunk.sentences)
+        sentence_tokens.extend(chunk.sentence_tokens)
+
+    min_coverage = env_float("CLAIM_MIN_COVERAGE", 0.5)
+    if not spans:
+        return [ClaimSupport(claim=text, supported=False, coverage=0.0) for text, _ in claims]
+
+    # Per sentence, only the claim words it contains matter.
+    vocab = frozenset().union(*(tokens for _, tokens in claims))
+    matched = [vocab & tokens for tokens in sentence_tokens]
+    n = len(spans)
+    df = Counter(t for words in matched for t in words)
+    idf = {t: math.log1p((n - df[t] + 0.5) / (df[t] + 0.5)) for t in vocab}
+    avg_length = max(sum(map(len, sentence_tokens)) / n, 1.0)
+    # BM25 with binary term frequency, per sentence length.
+    norms = [(_K1 + 1.0) / (1.0 + _K1 * (1.0 - _B + _B * len(tokens) / avg_length)) for tokens in sentence_tokens]
+
+    max_spans = max(1, env_int("CLAIM_MAX_SPANS", 2))
+    out: list[ClaimSupport] = []
+    for text, tokens in claims:
+        scores = {
+            j: sum(idf[t] for t in shared) * norms[j]
+            for j, words in enumerate(matched)
+            if (shared := words & tokens)
+        }
+        # Best first; ties keep sentence order. Sentences sharing no word with the claim are never spans.
+        order = sorted(scores, key=lambda j: -scores[j])[:max_spans]
+        covered = frozenset().union(*(sentence_tokens[j] & tokens for j in order))
+        coverage = len(covered) / len(tokens)
+        out.append(
+            ClaimSupport(
+                claim=text,
+                supported=coverage >= min_coverage,
+                coverage=round(coverage, 3),
+                spans=[
+                    SupportSpan(
+                        page_number=owners[j].key[0],
+                        chunk_index=owners[j].key[1],
+                        start=spans[j][0],
+                        end=spans[j][1],
+                        text=owners[j].text[spans[j][0] : spans[j][1]],
+                        score=round(scores[j], 4),
+                    )
+                    for j in order
+                ],
+            )
+        )
+    return out
+
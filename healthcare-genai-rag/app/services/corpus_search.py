@@ -0,0 +1,242 @@
+"""
+Cross-document search over every indexed document (e.g. "all denials for member X in 2025").
+
+The document-level fields (member_id, patient_id, decision, document_date) are extracted at index
+time, recorded on the `documents` row (index_state.record_document_fields) and repeated on every
+chunk (vector_store). Totals and paging are per document, whatever the number of chunks:
+  - total_documents and decision_counts: one aggregate over the matching indexed documents in Postgres;
+  - with query text: ONE filtered ANN query grouped by document_id (Weaviate group_by), returning the
+    best page * page_size documents with their closest chunks_per_document chunks;
+  - without query text: the page of documents (newest first) is read from Postgres, then their
+    opening chunks in one filtered fetch.
+
+With VECTOR_TENANCY=document_bucket the vector-store call runs once per tenant holding a matching
+document (each made active through document_chunks.tenant_chunks) and the per-tenant groups are
+merged by distance: a search with broad filters touches up to VECTOR_TENANT_BUCKETS tenants.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import Document
+from app.schemas.rag import CorpusChunkHit, CorpusDocumentHit, CorpusSearchRequest, CorpusSearchResponse
+from app.services.chunk_text import CHUNK_REF_PROPERTIES, hydrate_chunk_texts
+from app.services.document_chunks import (
+    COLLECTION_NAME,
+    TENANT_BUCKETS,
+    tenancy_enabled,
+    tenant_chunks,
+    tenant_for_document,
+)
+from app.services.embeddings import get_embeddings
+from app.services.index_state import INDEXED_STATUS
+from app.services.providers import embed_query, fetch_objects, near_vector
+from app.services.resilience import call_timeout_s
+from app.services.retriever import distance_to_similarity
+from app.services.weaviate_client import get_weaviate_client
+
+
+def _midnight_utc(d: date) -> datetime:
+    return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+
+
+def _filters(req: CorpusSearchRequest) -> Any:
+    """
+    The request's filters on the chunk properties (the ANN query).
+    """
+    from weaviate.classes.query import Filter
+
+    parts = []
+    if req.member_id:
+        parts.append(Filter.by_property("member_id").equal(req.member_id))
+    if req.patient_id:
+        parts.append(Filter.by_property("patient_id").equal(req.patient_id))
+    if req.decision:
+        parts.append(Filter.by_property("decision").equal(req.decision))
+    # document_date is stored at midnight UTC: both bounds are inclusive days.
+    if req.date_from:
+        parts.append(Filter.by_property("document_date").greater_or_equal(_midnight_utc(req.date_from)))
+    if req.date_to:
+        parts.append(Filter.by_property("document_date").less_or_equal(_midnight_utc(req.date_to)))
+    return Filter.all_of(parts) if parts else None
+
+
+def _conditions(req: CorpusSearchRequest) -> list[Any]:
+    """
+    The same filters on the `documents` rows, restricted to indexed documents.
+    """
+    conditions = [Document.status == INDEXED_STATUS]
+    if req.member_id:
+        conditions.append(Document.member_id == req.member_id)
+    if req.patient_id:
+        conditions.append(Document.patient_id == req.patient_id)
+    if req.decision:
+        conditions.append(Document.decision == req.decision)
+    if req.date_from:
+        conditions.append(Document.document_date >= req.date_from)
+    if req.date_to:
+        conditions.append(Document.document_date <= req.date_to)
+    return conditions
+
+
+def _matching_ids(db: Session, conditions: list[Any]) -> Iterator[str]:
+    yield from db.scalars(select(Document.id).where(*conditions))
+
+
+def _collections(client: Any, document_ids: Iterable[str]) -> list[Any]:
+    """
+    DocumentChunk, or with tenancy one tenant-scoped collection per tenant holding one of
+    `document_ids` (read lazily: it stops once every bucket is seen).
+    """
+    if not tenancy_enabled():
+        return [client.collections.get(COLLECTION_NAME)]
+    tenants: set[str] = set()
+    for document_id in document_ids:
+        tenants.add(tenant_for_document(document_id))
+        if len(tenants) >= TENANT_BUCKETS:
+            break
+    return [tenant_chunks(client, tenant) for tenant in sorted(tenants)]
+
+
+def _chunk_ref(props: dict[str, Any], distance: float | None) -> dict[str, Any]:
+    return {**{k: props.get(k) for k in CHUNK_REF_PROPERTIES}, "similarity": distance_to_similarity(distance)}
+
+
+def _ranked_groups(req: CorpusSearchRequest, db: Session, conditions: list[Any], end: int) -> list[Any]:
+    """
+    The best `end` document groups (closest first) of the filtered ANN query.
+    """
+    from weaviate.classes.query import GroupBy
+
+    timeout_s = call_timeout_s()
+    vector = embed_query(get_embeddings(timeout_s=timeout_s), req.query)
+    group_by = GroupBy(prop="document_id", objects_per_group=req.chunks_per_document, number_of_groups=end)
+    filters = _filters(req)
+    client = get_weaviate_client(timeout_s=timeout_s)
+    try:
+        groups: list[Any] = []
+        for collection in _collections(client, _matching_ids(db, conditions)):
+            res = near_vector(
+                collection,
+                near_vector=vector,
+                filters=filters,
+                group_by=group_by,
+                return_metadata=["distance"],
+                return_properties=CHUNK_REF_PROPERTIES,
+            )
+            groups.extend(res.groups.values())
+    finally:
+        client.close()
+    groups.sort(key=lambda g: (g.min_distance, g.name))
+    return groups[:end]
+
+
+def _opening_chunks(docs: list[Document], chunks_per_document: int) -> dict[str, list[dict[str, Any]]]:
+    """
+    The first `chunks_per_document` chunks of each document (by chunk_ordinal), in one filtered
+    fetch (per tenant). Chunks indexed before chunk_ordinal was stored are not returned.
+    """
+    from weaviate.classes.query import Filter
+
+    refs: dict[str, list[dict[str, Any]]] = {doc.id: [] for doc in docs}
+    if not docs:
+        return refs
+    filters = Filter.all_of(
+        [
+            Filter.by_property("document_id").contains_any(list(refs)),
+            Filter.by_property("chunk_ordinal").less_than(chunks_per_document),
+        ]
+    )
+    client = get_weaviate_client(timeout_s=call_timeout_s())
+    try:
+        for collection in _collections(client, refs):
+            res = fetch_objects(
+                collection,
+                limit=len(refs) * chunks_per_document,
+                filters=filters,
+                return_properties=CHUNK_REF_PROPERTIES,
+            )
+            for obj in res.objects:
+                props = obj.properties or {}
+                refs[props["document_id"]].append(_chunk_ref(props, None))
+    finally:
+        client.close()
+    for items in refs.values():
+        items.sort(key=lambda it: (it.get("page_number") or 0, it.get("chunk_index") or 0))
+    return refs
+
+
+def _document_hit(doc: Document, items: list[dict[str, Any]], best_similarity: float | None) -> CorpusDocumentHit:
+    return CorpusDocumentHit(
+        document_id=doc.id,
+        filename=doc.filename,
+        member_id=doc.member_id,
+        patient_id=doc.patient_id,
+        decision=doc.decision,
+        document_date=doc.document_date,
+        best_similarity=best_similarity,
+        # The filters are document-level: every chunk of a matching document matches.
+        matched_chunks=doc.chunks_indexed if doc.chunks_indexed is not None else len(items),
+    )
+
+
+def search_corpus(req: CorpusSearchRequest, db: Session) -> CorpusSearchResponse:
+    end = req.page * req.page_size
+    conditions = _conditions(req)
+
+    decision_counts: Counter[str] = Counter()
+    for decision, count in db.execute(
+        select(Document.decision, func.count()).where(*conditions).group_by(Document.decision)
+    ):
+        decision_counts[decision or "unknown"] += count
+    total_documents = sum(decision_counts.values())
+
+    hits: list[tuple[CorpusDocumentHit, list[dict[str, Any]]]] = []
+    if req.query:
+        groups = _ranked_groups(req, db, conditions, end)[end - req.page_size :]
+        page_ids = [g.name for g in groups]
+        docs = {d.id: d for d in db.scalars(select(Document).where(Document.id.in_(page_ids), *conditions))}
+        for group in groups:
+            doc = docs.get(group.name)
+            if doc is None:
+                # Chunks left in the vector store for a document that is no longer indexed.
+                continue
+            items = [_chunk_ref(o.properties or {}, getattr(o.metadata, "distance", None)) for o in group.objects]
+            hits.append((_document_hit(doc, items, distance_to_similarity(group.min_distance)), items))
+    else:
+        # No similarity: newest documents first.
+        docs = list(
+            db.scalars(
+                select(Document)
+                .where(*conditions)
+                .order_by(Document.document_date.desc().nulls_last(), Document.id.desc())
+                .offset(end - req.page_size)
+                .limit(req.page_size)
+            )
+        )
+        refs = _opening_chunks(docs, req.chunks_per_document)
+        hits = [(_document_hit(doc, refs[doc.id], None), refs[doc.id]) for doc in docs]
+
+    for hit, items in hits:
+        if req.include_text:
+            items = hydrate_chunk_texts(db, hit.document_id, items)
+        hit.chunks = [CorpusChunkHit.model_validate(it) for it in items]
+    if req.include_text:
+        db.commit()
+
+    return CorpusSearchResponse(
+        query=req.query,
+        documents=[hit for hit, _items in hits],
+        total_documents=total_documents,
+        decision_counts=dict(decision_counts),
+        page=req.page,
+        page_size=req.page_size,
+        has_more=total_documents > end,
+    )
@@ -0,0 +1,191 @@
+"""
+The DocumentChunk collection, global or split into tenants.
+
+VECTOR_TENANCY=document_bucket creates DocumentChunk with multi-tenancy: a document's chunks live in
+tenant `chunks-<bucket>`, picked by a stable hash of the document id over VECTOR_TENANT_BUCKETS
+buckets. A document-scoped search walks its bucket's own small HNSW index instead of filtering the
+global one, so it does not slow down (or lose recall to the filter) as the corpus grows. Queries
+keep the document_id filter: a bucket holds many documents.
+
+Tenant lifecycle: `activate_document_tenant` runs before writing (creating the tenant on first use,
+reactivating or onloading it otherwise), and `offload_idle_tenants` moves buckets this process has
+not used for VECTOR_TENANT_IDLE_S to VECTOR_TENANT_IDLE_STATUS (`inactive`, or `offloaded` to cloud
+storage). Weaviate's auto_tenant_activation only wakes INACTIVE tenants, so the first read of a
+bucket in a process checks its status and activates/onloads it. That check is cached per process
+(`_active`); another worker may offload the bucket behind the cache, so a vector-store call that
+fails on a tenant that turns out not to be ACTIVE reactivates it and is retried once
+(`reactivate_tenant`, used by app.services.providers).
+
+VECTOR_TENANCY=none (default) keeps one collection; VECTOR_SHARDS sets its shard count at creation.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from typing import Any
+
+from app.core.config import env_float, env_int, env_str
+from app.services.weaviate_client import get_weaviate_client
+
+COLLECTION_NAME = "DocumentChunk"
+
+TENANCY = env_str("VECTOR_TENANCY", "none").lower()
+TENANT_BUCKETS = env_int("VECTOR_TENANT_BUCKETS", 64)
+TENANT_IDLE_S = env_float("VECTOR_TENANT_IDLE_S", 0.0)
+TENANT_IDLE_STATUS = env_str("VECTOR_TENANT_IDLE_STATUS", "inactive").lower()
+# Onloading an offloaded tenant is asynchronous in Weaviate: wait this long for it to become ACTIVE.
+TENANT_ONLOAD_TIMEOUT_S = env_float("VECTOR_TENANT_ONLOAD_TIMEOUT_S", 60.0)
+
+# Tenants this process used -> last use (monotonic clock).
+_last_used: dict[str, float] = {}
+# Tenants this process has seen ACTIVE (a hint: other workers may offload them).
+_active: set[str] = set()
+_lock = threading.Lock()
+
+# Pre-1.25 names of the activity statuses.
+_STATUS_ALIASES = {"HOT": "ACTIVE", "COLD": "INACTIVE", "FROZEN": "OFFLOADED"}
+
+
+def tenancy_enabled() -> bool:
+    if TENANCY not in {"none", "document_bucket"}:
+        raise RuntimeError(f"VECTOR_TENANCY must be none or document_bucket, got {TENANCY!r}")
+    return TENANCY == "document_bucket"
+
+
+def tenant_for_document(document_id: str) -> str:
+    bucket = zlib.crc32(document_id.encode("utf-8")) % max(1, TENANT_BUCKETS)
+    return f"chunks-{bucket:04d}"
+
+
+def _touch(tenant: str) -> None:
+    with _lock:
+        _last_used[tenant] = time.monotonic()
+
+
+def _status(tenants: Any, tenant: str) -> str | None:
+    current = tenants.get_by_name(tenant)
+    if current is None:
+        return None
+    status = str(getattr(current.activity_status, "value", current.activity_status)).upper()
+    return _STATUS_ALIASES.get(status, status)
+
+
+def _ensure_active(collection: Any, tenant: str, *, create: bool) -> bool:
+    """
+    Makes `tenant` ACTIVE: creates it (when `create`), or activates/onloads it and waits until it
+    is served. Returns True when its status had to change.
+    """
+    tenants = collection.tenants
+    status = _status(tenants, tenant)
+    changed = status != "ACTIVE"
+    if status is None:
+        if not create:
+            return False
+        tenants.create(tenant)
+    elif changed:
+        if status not in {"ONLOADING", "OFFLOADING"}:
+            tenants.activate(tenant)
+        deadline = time.monotonic() + TENANT_ONLOAD_TIMEOUT_S
+        while _status(tenants, tenant) != "ACTIVE":
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Tenant {tenant} of {COLLECTION_NAME} did not become active")
+            if status == "OFFLOADING":
+                # Activation is refused while offloading; ask again until it is accepted.
+                tenants.activate(tenant)
+            time.sleep(0.25)
+    with _lock:
+        _active.add(tenant)
+    return changed
+
+
+def document_chunks(client: Any, document_id: str) -> Any:
+    """
+    DocumentChunk scoped to the tenant holding `document_id` (the collection itself without tenancy).
+    The first use of a tenant in this process makes sure it is ACTIVE (onloading an offloaded one).
+    """
+    if not tenancy_enabled():
+        return client.collections.get(COLLECTION_NAME)
+    return tenant_chunks(client, tenant_for_document(document_id))
+
+
+def tenant_chunks(client: Any, tenant: str) -> Any:
+    """
+    DocumentChunk scoped to `tenant`, made ACTIVE on its first use in this process (as document_chunks).
+    """
+    collection = client.collections.get(COLLECTION_NAME)
+    _touch(tenant)
+    with _lock:
+        known_active = tenant in _active
+    if not known_active:
+        _ensure_active(collection, tenant, create=False)
+    return collection.with_tenant(tenant)
+
+
+def document_tenant_exists(client: Any, document_id: str) -> bool:
+    """
+    False when the document's bucket was never created (querying it would fail). Always True without tenancy.
+    """
+    if not tenancy_enabled():
+        return True
+    return bool(client.collections.get(COLLECTION_NAME).tenants.exists(tenant_for_document(document_id)))
+
+
+def activate_document_tenant(client: Any, document_id: str) -> None:
+    """
+    Creates, reactivates or onloads the document's tenant before writing. Always checks the status
+    (writes are rare, and the per-process `_active` hint may be stale).
+    """
+    if not tenancy_enabled():
+        return
+    tenant = tenant_for_document(document_id)
+    _touch(tenant)
+    _ensure_active(client.collections.get(COLLECTION_NAME), tenant, create=True)
+
+
+def reactivate_tenant(collection: Any) -> bool:
+    """
+    After a failed call on `collection`: if it is a tenant that is no longer ACTIVE (offloaded or
+    deactivated by another worker), activate it and return True so the caller retries once.
+    """
+    tenant = getattr(collection, "tenant", None)
+    if not tenant or not tenancy_enabled():
+        return False
+    with _lock:
+        _active.discard(tenant)
+    try:
+        return _ensure_active(collection, tenant, create=False)
+    except Exception:
+        return False
+
+
+def offload_idle_tenants(idle_s: float | None = None) -> int:
+    """
+    Deactivates (or offloads) the tenants this process has not used for `idle_s` seconds.
+    Returns the number of tenants moved.
+    """
+    if not tenancy_enabled():
+        return 0
+    idle_s = TENANT_IDLE_S if idle_s is None else idle_s
+    now = time.monotonic()
+    with _lock:
+        idle = sorted(t for t, used in _last_used.items() if now - used >= idle_s)
+    if not idle:
+        return 0
+
+    client = get_weaviate_client()
+    try:
+        tenants = client.collections.get(COLLECTION_NAME).tenants
+        if TENANT_IDLE_STATUS == "offloaded":
+            tenants.offload(idle)
+        else:
+            tenants.deactivate(idle)
+    finally:
+        client.close()
+
+    with _lock:
+        for tenant in idle:
+            _last_used.pop(tenant, None)
+            _active.discard(tenant)
+    return len(idle)
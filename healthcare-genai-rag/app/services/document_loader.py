@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-import pdfplumber
+from app.services.providers import timed_dependency
 
 
 def extract_pdf_pages_text(pdf_path: Path) -> list[str]:
@@ -12,11 +12,13 @@ def extract_pdf_pages_text(pdf_path: Path) -> list[str]:
     Returns a list where index 0 corresponds to page 1.
     For pages with no extractable text, an empty string is returned.
     """
+    import pdfplumber
+
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
     pages_text: list[str] = []
-    with pdfplumber.open(str(pdf_path)) as pdf:
+    with timed_dependency("pdf_parse"), pdfplumber.open(str(pdf_path)) as pdf:
         for page in pdf.pages:
             text = page.extract_text() or ""
             pages_text.append(text)
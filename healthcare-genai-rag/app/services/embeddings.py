@@ -1,12 +1,20 @@
 from __future__ import annotations
 
 import os
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings
 
+if TYPE_CHECKING:
+    from langchain_openai import OpenAIEmbeddings
+
+
+def get_embeddings(timeout_s: float | None = None) -> OpenAIEmbeddings:
+    """
+    `timeout_s` bounds each HTTP call (the caller's remaining deadline budget).
+    """
+    from langchain_openai import OpenAIEmbeddings
 
-def get_embeddings() -> OpenAIEmbeddings:
     load_dotenv()
 
     api_key = os.getenv("OPENAI_API_KEY")
@@ -20,4 +28,31 @@ def get_embeddings() -> OpenAIEmbeddings:
     return OpenAIEmbeddings(
         model=model,
         api_key=api_key,
-    )
\ No newline at end of file
+        dimensions=get_embeddings_dimensions(),
+        # Retries/backoff are handled by app/services/resilience.py.
+        max_retries=0,
+        request_timeout=timeout_s,
+    )
+
+
+def get_embeddings_dimensions() -> int | None:
+    """
+    OPENAI_EMBEDDINGS_DIMENSIONS: shortened embeddings (text-embedding-3-*), fewer dimensions per
+    stored vector. None (unset or 0) keeps the model's full size. Changing it requires re-indexing.
+    """
+    load_dotenv()
+    value = (os.getenv("OPENAI_EMBEDDINGS_DIMENSIONS") or "").strip()
+    try:
+        return (int(value) or None) if value else None
+    except ValueError as e:
+        raise RuntimeError(f"OPENAI_EMBEDDINGS_DIMENSIONS must be an integer, got {value!r}") from e
+
+
+def get_embeddings_model_name() -> str:
+    """
+    Recorded on indexed documents; "<model>@<dimensions>" for shortened embeddings.
+    """
+    load_dotenv()
+    model = os.getenv("OPENAI_EMBEDDINGS_MODEL") or ""
+    dimensions = get_embeddings_dimensions()
+    return f"{model}@{dimensions}" if model and dimensions else model
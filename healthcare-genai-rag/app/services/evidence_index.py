@@ -0,0 +1,154 @@
+"""
+Per-request index over retrieved chunks for the groundedness verifier.
+
+Each chunk is normalized at most once (lowercased text, token set, sentence token sets) and keyed by
+(page_number, chunk_index); the verifier then works with dict lookups and set operations instead of
+re-joining and re-tokenizing cited text on every attempt. Entries are shared across retries through `cache`.
+
+Sentence boundaries are computed at index time (`sentence_offsets`, stored on each DocumentChunk as
+flat [start, end, start, end, ...] character offsets); chunks indexed before that are split on first use.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Any
+
+# Same tokens as the previous char-by-char tokenizer: runs of letters/digits, lowercased, at least
+# 3 long. A shorter run cannot match from any of its positions, so the regex alone does the filter.
+_TOKEN_RE = re.compile(r"[^\W_]{3,}")
+
+# Sentence ends, clause separators and line breaks (form documents put one field per line).
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+|;\s+|\s+-\s+|\s*\n\s*")
+
+ChunkKey = tuple[int, int]
+
+
+def _tokens_lc(text_lc: str) -> frozenset[str]:
+    return frozenset(_TOKEN_RE.findall(text_lc))
+
+
+def tokenize(s: str) -> frozenset[str]:
+    return _tokens_lc((s or "").lower())
+
+
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    """
+    (start, end) character offsets of the sentences of `text`, surrounding whitespace excluded.
+    """
+    spans: list[tuple[int, int]] = []
+    pos = 0
+    text = text or ""
+    for m in [*_SENTENCE_BREAK_RE.finditer(text), None]:
+        end = m.start() if m is not None else len(text)
+        start = pos
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            spans.append((start, end))
+        if m is not None:
+            pos = m.end()
+    return spans
+
+
+def sentence_offsets(text: str) -> list[int]:
+    """
+    `sentence_spans` flattened for storage as an int array property.
+    """
+    return [offset for span in sentence_spans(text) for offset in span]
+
+
+class IndexedChunk:
+    """
+    A chunk's text with its normalized forms, computed on first use and then kept: the verifier
+    only needs them for cited chunks, and a retry reuses them through the index cache.
+    """
+
+    __slots__ = ("key", "text", "_offsets", "_text_lc", "_tokens", "_sentences", "_sentence_tokens")
+
+    def __init__(self, key: ChunkKey, text: str, offsets: list[int] | None = None) -> None:
+        self.key = key
+        self.text = text
+        self._offsets = offsets
+        self._text_lc: str | None = None
+        self._tokens: frozenset[str] | None = None
+        self._sentences: list[tuple[int, int]] | None = None
+        self._sentence_tokens: list[frozenset[str]] | None = None
+
+    @property
+    def text_lc(self) -> str:
+        if self._text_lc is None:
+            self._text_lc = self.text.lower()
+        return self._text_lc
+
+    @property
+    def tokens(self) -> frozenset[str]:
+        if self._tokens is None:
+            self._tokens = _tokens_lc(self.text_lc)
+        return self._tokens
+
+    @property
+    def sentences(self) -> list[tuple[int, int]]:
+        if self._sentences is None:
+            offsets = self._offsets
+            n = len(self.text)
+            if offsets and len(offsets) % 2 == 0 and all(0 <= o <= n for o in offsets):
+                self._sentences = list(zip(offsets[::2], offsets[1::2]))
+            else:
+                self._sentences = sentence_spans(self.text)
+        return self._sentences
+
+    @property
+    def sentence_tokens(self) -> list[frozenset[str]]:
+        if self._sentence_tokens is None:
+            lc = self.text_lc
+            self._sentence_tokens = [_tokens_lc(lc[start:end]) for start, end in self.sentences]
+        return self._sentence_tokens
+
+
+def _chunk_key(chunk: dict[str, Any]) -> ChunkKey | None:
+    pn = chunk.get("page_number")
+    ci = chunk.get("chunk_index")
+    if pn is None or ci is None:
+        return None
+    return int(pn), int(ci)
+
+
+class EvidenceIndex:
+    """
+    The chunks of one retrieval, by (page_number, chunk_index). With a `cache` shared across the
+    attempts of a request, a chunk retrieved again is not normalized again.
+    """
+
+    def __init__(self, chunks: Iterable[dict[str, Any]], cache: dict[ChunkKey, IndexedChunk] | None = None) -> None:
+        self._by_key: dict[ChunkKey, IndexedChunk] = {}
+        # Per retrieval: the same chunk scores differently against different queries.
+        self._similarity: dict[ChunkKey, float | None] = {}
+        for chunk in chunks:
+            key = _chunk_key(chunk)
+            if key is None:
+                continue
+            text = chunk.get("text") or ""
+            entry = cache.get(key) if cache is not None else None
+            if entry is None or entry.text != text:
+                entry = IndexedChunk(key, text, chunk.get("sentence_offsets"))
+                if cache is not None:
+                    cache[key] = entry
+            self._by_key[key] = entry
+            self._similarity[key] = chunk.get("similarity")
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def get(self, page_number: int | None, chunk_index: int | None) -> IndexedChunk | None:
+        if page_number is None or chunk_index is None:
+            return None
+        return self._by_key.get((int(page_number), int(chunk_index)))
+
+    def similarity(self, page_number: int | None, chunk_index: int | None) -> float | None:
+        if page_number is None or chunk_index is None:
+            return None
+        return self._similarity.get((int(page_number), int(chunk_index)))
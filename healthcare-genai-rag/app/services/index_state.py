@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable
+from datetime import date, datetime
+
+from sqlalchemy.orm import Session
+
+from app.core.config import env_float
+from app.core.tracing import record
+from app.db.models import Document, DocumentPage
+from app.db.session import SessionLocal
+from app.services.embeddings import get_embeddings_model_name
+from app.services.rag_pipeline import is_document_indexed
+from app.services.rag_rules import document_fields
+
+INDEXED_STATUS = "indexed"
+# An index run in progress (left behind if the worker died) and a failed one (or chunks that no
+# longer match the pages): chunks found for either may be a partial set.
+INDEXING_STATUS = "indexing"
+INDEX_ERROR_STATUS = "index_error"
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache with per-entry expiry (monotonic clock).
+    """
+
+    def __init__(self, ttl_s: float) -> None:
+        self.ttl_s = ttl_s
+        self._items: dict[str, tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> object | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if time.monotonic() >= expires_at:
+            with self._lock:
+                self._items.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: object) -> None:
+        if self.ttl_s <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_s, value)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+# Only positive results are cached: another worker may index the document at any time,
+# and a cached "not indexed" would make us index it twice.
+# Invalidation is local to this process: after a reprocess in another worker a cached "indexed"
+# stays stale until it expires, so the TTL is the cross-worker staleness bound. Keep it short;
+# it only has to absorb bursts (the miss path is one primary-key lookup).
+_indexed_cache = TTLCache(ttl_s=env_float("INDEX_STATE_CACHE_TTL_S", 5.0))
+
+
+def is_document_index_current(db: Session, document_id: str) -> bool:
+    """
+    Local lookup: TTL cache first, then `documents.status` in Postgres.
+    """
+    if _indexed_cache.get(document_id):
+        record("cache_hits")
+        return True
+    record("cache_misses")
+
+    doc = db.get(Document, document_id)
+    if doc is None or doc.status != INDEXED_STATUS:
+        return False
+
+    _indexed_cache.set(document_id, True)
+    return True
+
+
+def mark_document_indexed(db: Session, doc: Document, *, chunks_indexed: int | None) -> None:
+    doc.status = INDEXED_STATUS
+    doc.chunks_indexed = chunks_indexed
+    doc.embedding_model = get_embeddings_model_name() or None
+    doc.indexed_at = datetime.utcnow()
+    db.add(doc)
+    db.commit()
+    _indexed_cache.set(doc.id, True)
+
+
+def record_document_fields(doc: Document, pages: Iterable[object]) -> None:
+    """
+    Copies the document-level fields that indexing stores on every chunk (member_id, patient_id,
+    decision, document_date) to the row, for cross-document search. Committed by the caller.
+    """
+    fields = document_fields("\n".join(getattr(page, "text") or "" for page in pages))
+    doc.member_id = fields["member_id"]
+    doc.patient_id = fields["patient_id"]
+    doc.decision = fields["decision"]
+    doc.document_date = date.fromisoformat(fields["document_date"]) if fields["document_date"] else None
+
+
+def _backfill_document_fields(db: Session, doc: Document) -> bool:
+    """
+    Records the fields of a document indexed before they were stored in Postgres (`decision` is
+    always set once recorded). Returns True when they were missing.
+    """
+    if doc.decision is not None:
+        return False
+    pages = db.query(DocumentPage).filter(DocumentPage.document_id == doc.id).order_by(DocumentPage.page_number.asc())
+    record_document_fields(doc, pages.all())
+    return True
+
+
+def mark_document_not_indexed(db: Session, doc: Document, *, status: str) -> None:
+    doc.status = status
+    doc.chunks_indexed = None
+    doc.embedding_model = None
+    doc.indexed_at = None
+    db.add(doc)
+    db.commit()
+    _indexed_cache.invalidate(doc.id)
+
+
+def invalidate_index_state(document_id: str) -> None:
+    _indexed_cache.invalidate(document_id)
+
+
+def _may_adopt(doc: Document) -> bool:
+    """
+    Only documents with no recorded index attempt may adopt the chunks found in the vector store:
+    parsed rows never indexed since index state is tracked in Postgres. After a failed run the chunks
+    may be a partial set.
+    """
+    return doc.status == "parsed" and doc.indexed_at is None
+
+
+def adopt_existing_index(db: Session, document_id: str) -> bool:
+    """
+    Slow path for documents the DB does not know as indexed: probe the vector store once.
+    Chunks indexed before index state was tracked in Postgres are adopted instead of re-indexed.
+    """
+    doc = db.get(Document, document_id)
+    if doc is None or not _may_adopt(doc):
+        return False
+
+    if not is_document_indexed(document_id):
+        return False
+
+    _backfill_document_fields(db, doc)
+    mark_document_indexed(db, doc, chunks_indexed=doc.chunks_indexed)
+    return True
+
+
+def reconcile_index_state(db: Session) -> dict[str, int]:
+    """
+    Compares Postgres index state with the vector store:
+      - `indexed` documents with no chunks are demoted to `parsed`
+      - parsed documents with no recorded index attempt that already have chunks are marked `indexed`
+      - indexed documents without recorded document fields get them (cross-document search)
+    Returns counters for logging.
+    """
+    counts = {"checked": 0, "demoted": 0, "adopted": 0, "fields_backfilled": 0}
+
+    docs = db.query(Document).filter(Document.status.in_([INDEXED_STATUS, "parsed"])).all()
+
+    for doc in docs:
+        counts["checked"] += 1
+        in_vector_store = is_document_indexed(doc.id)
+
+        if doc.status == INDEXED_STATUS and not in_vector_store:
+            mark_document_not_indexed(db, doc, status="parsed")
+            counts["demoted"] += 1
+        elif _may_adopt(doc) and in_vector_store:
+            _backfill_document_fields(db, doc)
+            mark_document_indexed(db, doc, chunks_indexed=None)
+            counts["adopted"] += 1
+        elif doc.status == INDEXED_STATUS and _backfill_document_fields(db, doc):
+            db.commit()
+            counts["fields_backfilled"] += 1
+
+    return counts
+
+
+def run_index_reconciliation() -> dict[str, int]:
+    """
+    Job entry point (own session); used by the periodic task in app.main.
+    """
+    db = SessionLocal()
+    try:
+        return reconcile_index_state(db)
+    finally:
+        db.close()
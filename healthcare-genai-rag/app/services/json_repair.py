@@ -0,0 +1,125 @@
+"""
+Local, tolerant JSON recovery for LLM output, tried before any repair round-trip to the model:
+  - markdown fences and surrounding prose are dropped (first balanced {...} object, string-aware),
+  - output cut off mid-object gets its open string/brackets closed,
+  - trailing commas before } or ] are removed.
+
+Every parse is counted in medirag_llm_json_parse_total{schema,outcome}, which gives the repair rate.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+from app.core.metrics import REGISTRY
+
+PARSE_OUTCOMES = REGISTRY.counter(
+    "medirag_llm_json_parse_total",
+    "LLM JSON outputs by outcome: structured (provider-enforced schema), valid, "
+    "local_repair, llm_repair, failed.",
+    ("schema", "outcome"),
+)
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.IGNORECASE | re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def record_parse_outcome(schema: str, outcome: str) -> None:
+    PARSE_OUTCOMES.inc(schema=schema, outcome=outcome)
+
+
+def extract_json_object(text: str) -> str | None:
+    """
+    The first balanced JSON object in `text` (braces inside strings are ignored).
+    A truncated object is closed: open string first, then the open brackets in reverse order.
+    """
+    if not text:
+        return None
+    fenced = _FENCE_RE.search(text)
+    if fenced and "{" in fenced.group(1):
+        text = fenced.group(1)
+
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    stack: list[str] = []
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            if not stack or stack[-1] != ch:
+                return None
+            stack.pop()
+            if not stack:
+                return text[start : i + 1]
+
+    tail = text[start:].rstrip()
+    if in_string:
+        tail += '"'
+    return tail + "".join(reversed(stack))
+
+
+def strip_trailing_commas(text: str) -> str:
+    """
+    Drops commas directly followed (modulo whitespace) by } or ], outside strings.
+    """
+    out: list[str] = []
+    in_string = False
+    escaped = False
+    n = len(text)
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == ",":
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j < n and text[j] in "}]":
+                continue
+        out.append(ch)
+    return "".join(out)
+
+
+def parse_json_tolerant(raw: str) -> tuple[Any, bool]:
+    """
+    Returns (payload, repaired). `repaired` is False when the text only needed trimming
+    (whitespace, fences, surrounding prose). Raises ValueError when nothing parseable is left.
+    """
+    s = (raw or "").strip()
+    try:
+        return json.loads(s), False
+    except ValueError:
+        pass
+
+    candidate = extract_json_object(s)
+    if candidate is None:
+        raise ValueError("No JSON object found in model output")
+    # Closing a truncated object changes the text: that is a repair, not a trim.
+    closed = candidate not in s
+    try:
+        return json.loads(candidate), closed
+    except ValueError:
+        pass
+    return json.loads(strip_trailing_commas(candidate)), True
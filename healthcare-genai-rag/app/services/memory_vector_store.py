@@ -0,0 +1,523 @@
+"""
+In-process vector store implementing the subset of the Weaviate v4 client API used by the app
+(collections.get/exists, query.near_vector/fetch_objects, batch.dynamic, data.delete_many).
+near_vector supports `group_by` (weaviate.classes.query.GroupBy) and then returns `.groups` too.
+
+Selected with VECTOR_STORE_BACKEND=memory. Meant for local development, tests and the offline
+benchmarks in benchmarks/; data lives in the process and is lost on restart.
+
+MEMORY_VECTOR_QUANTIZATION=int8|binary searches compressed codes (int8: per-vector scaled scalar
+quantization; binary: one sign bit per dimension, Hamming distance) and rescores the best
+MEMORY_RESCORE_FACTOR * limit candidates with the float vectors, as Weaviate does for SQ/BQ.
+Returned distances are always the exact float cosine distances.
+
+Multi-tenancy: `collection.with_tenant(name)` keeps its own objects (and vector matrix);
+`collection.tenants` tracks activity status. Accessing an INACTIVE tenant reactivates it, as with
+Weaviate's auto_tenant_activation; an OFFLOADED one stays offloaded and every operation on it
+raises TenantNotActiveError until it is activated (onloaded).
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid as _uuid
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+
+from app.core.config import env_int, env_str
+
+# "none" | "int8" | "binary"; read per query (benchmarks switch it at runtime).
+QUANTIZATION = env_str("MEMORY_VECTOR_QUANTIZATION", "none").lower()
+# Candidates rescored with float vectors per result: limit * MEMORY_RESCORE_FACTOR.
+RESCORE_FACTOR = env_int("MEMORY_RESCORE_FACTOR", 4)
+
+# Set bits per byte value, for Hamming distances over packed sign bits.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+@dataclass
+class _StoredObject:
+    uuid: str
+    properties: dict[str, Any]
+    vector: np.ndarray
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+@dataclass(frozen=True)
+class _Codes:
+    """
+    Compressed copy of a collection's vectors. int8: `codes` (n, d) int8 and `scales` (n,) with
+    unit_row ~= codes * scale; binary: `codes` (n, ceil(d / 8)) uint8 packed sign bits.
+    """
+
+    mode: str
+    codes: np.ndarray
+    scales: np.ndarray | None = None
+
+    @classmethod
+    def build(cls, mode: str, matrix: np.ndarray) -> "_Codes":
+        unit = _unit_rows(matrix)
+        if mode == "binary":
+            return cls(mode, np.packbits(unit > 0, axis=1))
+        scales = np.abs(unit).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        return cls(mode, np.round(unit / scales[:, None]).astype(np.int8), scales.astype(np.float32))
+
+    def approx_distances(self, rows: np.ndarray, q: np.ndarray) -> np.ndarray:
+        """
+        Distance estimates (lower is closer) of `rows` to the unit query `q`.
+        """
+        codes = self.codes if len(rows) == len(self.codes) else self.codes[rows]
+        if self.mode == "binary":
+            return _POPCOUNT[codes ^ np.packbits(q > 0)].sum(axis=1)
+        scales = self.scales if len(rows) == len(self.codes) else self.scales[rows]
+        return 1.0 - (codes @ q) * scales
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+
+class TenantNotActiveError(RuntimeError):
+    pass
+
+
+@dataclass
+class _CollectionData:
+    objects: list[_StoredObject] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    _matrix: np.ndarray | None = None
+    _codes: dict[str, _Codes] = field(default_factory=dict)
+    # (collection, tenant) for a tenant's data: operations require the tenant to be ACTIVE.
+    tenant_of: tuple[str, str] | None = None
+
+    def require_active(self) -> None:
+        if self.tenant_of is None:
+            return
+        name, tenant = self.tenant_of
+        with _collections_lock:
+            status = _tenants.get(name, {}).get(tenant, "ACTIVE")
+        if status != "ACTIVE":
+            raise TenantNotActiveError(f"Tenant {tenant!r} of {name} is not active (status {status})")
+
+    def add(self, obj: _StoredObject) -> None:
+        with self.lock:
+            self.objects.append(obj)
+            self._matrix = None
+            self._codes.clear()
+
+    def remove_where(self, predicate) -> int:
+        with self.lock:
+            before = len(self.objects)
+            self.objects = [o for o in self.objects if not predicate(o.properties)]
+            self._matrix = None
+            self._codes.clear()
+            return before - len(self.objects)
+
+    def snapshot(self) -> tuple[list[_StoredObject], np.ndarray | None]:
+        with self.lock:
+            if self._matrix is None and self.objects:
+                self._matrix = np.vstack([o.vector for o in self.objects])
+            return list(self.objects), self._matrix
+
+    def codes(self, mode: str) -> _Codes | None:
+        """
+        Compressed vectors for `mode` ("int8" / "binary"), built on first use after a write.
+        """
+        if mode not in {"int8", "binary"}:
+            return None
+        _objects, matrix = self.snapshot()
+        if matrix is None:
+            return None
+        with self.lock:
+            codes = self._codes.get(mode)
+            if codes is None or codes.codes.shape[0] != matrix.shape[0]:
+                codes = self._codes[mode] = _Codes.build(mode, matrix)
+            return codes
+
+
+_collections: dict[str, _CollectionData] = {}
+_collections_lock = threading.Lock()
+# Tenant activity status ("ACTIVE" / "INACTIVE" / "OFFLOADED") per collection name.
+_tenants: dict[str, dict[str, str]] = {}
+
+# Operation counters (near_vector, fetch_objects, add_object, delete_many) for benchmarks.
+operation_counts: Counter[str] = Counter()
+_counts_lock = threading.Lock()
+
+
+def _count(op: str) -> None:
+    with _counts_lock:
+        operation_counts[op] += 1
+
+
+def _collection_data(name: str) -> _CollectionData:
+    with _collections_lock:
+        return _collections.setdefault(name, _CollectionData())
+
+
+def vector_index_nbytes(name: str) -> int:
+    """
+    Size of the vectors a search scans in collection `name`: the codes under QUANTIZATION, else
+    the float matrix (rescoring reads float rows only for the shortlist).
+    """
+    data = _collection_data(name)
+    codes = data.codes(QUANTIZATION)
+    if codes is not None:
+        return codes.nbytes
+    _objects, matrix = data.snapshot()
+    return int(matrix.nbytes) if matrix is not None else 0
+
+
+def reset_memory_store() -> None:
+    with _collections_lock:
+        _collections.clear()
+        _tenants.clear()
+    with _counts_lock:
+        operation_counts.clear()
+
+
+# -----------------------
+# Filters (weaviate.classes.query.Filter objects)
+# -----------------------
+def _comparable(stored: Any, value: Any) -> tuple[Any, Any]:
+    if isinstance(value, (datetime, date)) and isinstance(stored, str):
+        try:
+            parsed = datetime.fromisoformat(stored.replace("Z", "+00:00"))
+        except ValueError:
+            return stored, value.isoformat()
+        if isinstance(value, datetime):
+            if value.tzinfo is None and parsed.tzinfo is not None:
+                parsed = parsed.replace(tzinfo=None)
+            return parsed, value
+        return parsed.date(), value
+    return stored, value
+
+
+def _matches(flt: Any, props: dict[str, Any]) -> bool:
+    if flt is None:
+        return True
+
+    kind = type(flt).__name__
+    if kind == "_FilterAnd":
+        return all(_matches(f, props) for f in flt.filters)
+    if kind == "_FilterOr":
+        return any(_matches(f, props) for f in flt.filters)
+    if kind == "_FilterNot":
+        return not any(_matches(f, props) for f in flt.filters)
+
+    target = flt.target
+    if not isinstance(target, str):
+        raise NotImplementedError(f"Unsupported filter target: {target!r}")
+
+    op = flt.operator.value
+    stored = props.get(target)
+    value = flt.value
+
+    if op == "IsNull":
+        return (stored is None) == bool(value)
+    if stored is None:
+        return False
+    if op in {"ContainsAny", "ContainsAll", "ContainsNone"}:
+        have = set(stored) if isinstance(stored, (list, tuple, set)) else {stored}
+        want = set(value)
+        if op == "ContainsAny":
+            return bool(have & want)
+        if op == "ContainsAll":
+            return want <= have
+        return not (have & want)
+
+    left, right = _comparable(stored, value)
+    if op == "Equal":
+        return left == right
+    if op == "NotEqual":
+        return left != right
+    if op == "LessThan":
+        return left < right
+    if op == "LessThanEqual":
+        return left <= right
+    if op == "GreaterThan":
+        return left > right
+    if op == "GreaterThanEqual":
+        return left >= right
+    raise NotImplementedError(f"Unsupported filter operator: {op}")
+
+
+def _select(obj: _StoredObject, return_properties: list[str] | None) -> dict[str, Any]:
+    if not return_properties:
+        return dict(obj.properties)
+    return {k: obj.properties.get(k) for k in return_properties}
+
+
+def _result(objects: list[SimpleNamespace], groups: dict[str, SimpleNamespace] | None = None) -> SimpleNamespace:
+    return SimpleNamespace(objects=objects) if groups is None else SimpleNamespace(objects=objects, groups=groups)
+
+
+def _grouped(group_by: Any, ranked: list[tuple[_StoredObject, float]], return_properties: list[str] | None) -> SimpleNamespace:
+    """
+    GroupByReturn over `ranked` (closest first): the first `number_of_groups` values of
+    `group_by.prop`, each with its closest `objects_per_group` objects.
+    """
+    groups: dict[str, SimpleNamespace] = {}
+    out: list[SimpleNamespace] = []
+    for obj, distance in ranked:
+        name = str(obj.properties.get(group_by.prop))
+        group = groups.get(name)
+        if group is None:
+            if len(groups) >= group_by.number_of_groups:
+                continue
+            group = groups[name] = SimpleNamespace(
+                name=name, min_distance=distance, max_distance=distance, number_of_objects=0, objects=[]
+            )
+        if group.number_of_objects >= group_by.objects_per_group:
+            continue
+        hit = SimpleNamespace(
+            uuid=obj.uuid,
+            properties=_select(obj, return_properties),
+            metadata=SimpleNamespace(distance=distance),
+            belongs_to_group=name,
+        )
+        group.objects.append(hit)
+        group.number_of_objects += 1
+        group.max_distance = distance
+        out.append(hit)
+    return _result(out, groups)
+
+
+# -----------------------
+# Weaviate-like API
+# -----------------------
+class _Query:
+    def __init__(self, data: _CollectionData) -> None:
+        self._data = data
+
+    def fetch_objects(
+        self,
+        *,
+        limit: int | None = None,
+        filters: Any = None,
+        return_properties: list[str] | None = None,
+        **_: Any,
+    ) -> SimpleNamespace:
+        self._data.require_active()
+        _count("fetch_objects")
+        objects, _matrix = self._data.snapshot()
+        out: list[SimpleNamespace] = []
+        for obj in objects:
+            if not _matches(filters, obj.properties):
+                continue
+            out.append(
+                SimpleNamespace(
+                    uuid=obj.uuid,
+                    properties=_select(obj, return_properties),
+                    metadata=SimpleNamespace(distance=None),
+                )
+            )
+            if limit is not None and len(out) >= limit:
+                break
+        return _result(out)
+
+    def near_vector(
+        self,
+        *,
+        near_vector: list[float],
+        limit: int | None = None,
+        filters: Any = None,
+        return_metadata: Any = None,
+        return_properties: list[str] | None = None,
+        group_by: Any = None,
+        **_: Any,
+    ) -> SimpleNamespace:
+        self._data.require_active()
+        _count("near_vector")
+        objects, matrix = self._data.snapshot()
+        if not objects or matrix is None:
+            return _result([], None if group_by is None else {})
+
+        if filters is None:
+            candidates = np.arange(len(objects))
+        else:
+            mask = np.fromiter((_matches(filters, o.properties) for o in objects), dtype=bool, count=len(objects))
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return _result([], None if group_by is None else {})
+
+        q = np.asarray(near_vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        k = min(limit or len(candidates), len(candidates))
+
+        # Compressed search: keep the best limit * RESCORE_FACTOR candidates, rescore them below.
+        # A grouped search ranks every candidate (groups may need more than `limit` objects).
+        codes = self._data.codes(QUANTIZATION) if group_by is None else None
+        if codes is not None:
+            shortlist = min(len(candidates), k * max(1, RESCORE_FACTOR))
+            if shortlist < len(candidates):
+                approx = codes.approx_distances(candidates, q)
+                candidates = candidates[np.argpartition(approx, shortlist - 1)[:shortlist]]
+
+        # Cosine distance, as in Weaviate's default vector index config.
+        sub = matrix[candidates]
+        norms = np.linalg.norm(sub, axis=1)
+        norms[norms == 0] = 1.0
+        distances = 1.0 - (sub @ q) / norms
+
+        if group_by is not None:
+            order = np.argsort(distances, kind="stable")
+            return _grouped(group_by, [(objects[candidates[i]], float(distances[i])) for i in order], return_properties)
+
+        top = np.argpartition(distances, k - 1)[:k] if k < len(candidates) else np.arange(len(candidates))
+        top = top[np.argsort(distances[top], kind="stable")]
+
+        return _result(
+            [
+                SimpleNamespace(
+                    uuid=objects[candidates[i]].uuid,
+                    properties=_select(objects[candidates[i]], return_properties),
+                    metadata=SimpleNamespace(distance=float(distances[i])),
+                )
+                for i in top
+            ]
+        )
+
+
+class _Batch:
+    def __init__(self, data: _CollectionData) -> None:
+        self._data = data
+
+    @contextmanager
+    def dynamic(self) -> Iterator["_Batch"]:
+        yield self
+
+    def add_object(self, *, properties: dict[str, Any], vector: list[float], uuid: str | None = None) -> str:
+        self._data.require_active()
+        _count("add_object")
+        obj_id = uuid or str(_uuid.uuid4())
+        self._data.add(_StoredObject(uuid=obj_id, properties=dict(properties), vector=np.asarray(vector, dtype=np.float32)))
+        return obj_id
+
+
+class _Data:
+    def __init__(self, data: _CollectionData) -> None:
+        self._data = data
+
+    def delete_many(self, *, where: Any) -> SimpleNamespace:
+        self._data.require_active()
+        _count("delete_many")
+        deleted = self._data.remove_where(lambda props: _matches(where, props))
+        return SimpleNamespace(successful=deleted, failed=0, matches=deleted)
+
+
+def _tenant_names(tenants: Any) -> list[str]:
+    if isinstance(tenants, str) or hasattr(tenants, "name"):
+        tenants = [tenants]
+    return [t if isinstance(t, str) else t.name for t in tenants]
+
+
+class _Tenants:
+    def __init__(self, collection: str) -> None:
+        self._collection = collection
+
+    def _set(self, tenants: Any, status: str, *, create: bool = False) -> None:
+        with _collections_lock:
+            known = _tenants.setdefault(self._collection, {})
+            for name in _tenant_names(tenants):
+                if name not in known and not create:
+                    raise ValueError(f"Tenant {name!r} does not exist in {self._collection}")
+                known[name] = status
+
+    def create(self, tenants: Any) -> None:
+        _count("tenant_create")
+        self._set(tenants, "ACTIVE", create=True)
+
+    def exists(self, tenant: Any) -> bool:
+        (name,) = _tenant_names(tenant)
+        with _collections_lock:
+            return name in _tenants.get(self._collection, {})
+
+    def get(self) -> dict[str, SimpleNamespace]:
+        with _collections_lock:
+            known = dict(_tenants.get(self._collection, {}))
+        return {name: SimpleNamespace(name=name, activity_status=status) for name, status in known.items()}
+
+    def get_by_name(self, tenant: Any) -> SimpleNamespace | None:
+        (name,) = _tenant_names(tenant)
+        _count("tenant_get")
+        with _collections_lock:
+            status = _tenants.get(self._collection, {}).get(name)
+        return None if status is None else SimpleNamespace(name=name, activity_status=status)
+
+    def activate(self, tenant: Any) -> None:
+        _count("tenant_activate")
+        self._set(tenant, "ACTIVE")
+
+    def deactivate(self, tenant: Any) -> None:
+        _count("tenant_deactivate")
+        self._set(tenant, "INACTIVE")
+
+    def offload(self, tenant: Any) -> None:
+        _count("tenant_offload")
+        self._set(tenant, "OFFLOADED")
+
+
+class MemoryCollection:
+    def __init__(self, name: str, tenant: str | None = None) -> None:
+        self.name = name
+        self.tenant = tenant
+        data = _collection_data(name if tenant is None else f"{name}/{tenant}")
+        if tenant is not None:
+            data.tenant_of = (name, tenant)
+        self.query = _Query(data)
+        self.batch = _Batch(data)
+        self.data = _Data(data)
+        self.tenants = _Tenants(name)
+
+    def with_tenant(self, tenant: str) -> "MemoryCollection":
+        _collection_data(self.name)
+        with _collections_lock:
+            known = _tenants.setdefault(self.name, {})
+            if known.get(tenant) == "INACTIVE":
+                # auto_tenant_activation (never onloads an OFFLOADED tenant)
+                known[tenant] = "ACTIVE"
+                activated = True
+            else:
+                known.setdefault(tenant, "ACTIVE")
+                activated = False
+        if activated:
+            _count("tenant_auto_activate")
+        return MemoryCollection(self.name, tenant)
+
+
+class _Collections:
+    def get(self, name: str) -> MemoryCollection:
+        return MemoryCollection(name)
+
+    def exists(self, name: str) -> bool:
+        with _collections_lock:
+            return name in _collections
+
+    def create(self, name: str, **_: Any) -> MemoryCollection:
+        _collection_data(name)
+        return MemoryCollection(name)
+
+
+class MemoryVectorStoreClient:
+    def __init__(self) -> None:
+        self.collections = _Collections()
+
+    def is_ready(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
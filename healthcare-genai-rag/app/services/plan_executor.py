@@ -0,0 +1,126 @@
+"""
+Runs planner steps (per-facet retrievals) concurrently on a shared, bounded thread pool.
+
+Steps without `depends_on` start together; a step starts once every step it depends on has
+finished. Outcomes come back in plan order, so concatenating their results keeps the planner's
+rank order (the main query first) whatever order the steps finished in.
+Each step runs in a copy of the caller's context, so the active RequestTrace (usage counters,
+deadline) applies inside the worker threads.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.config import env_int
+from app.schemas.agentic_qa import PlanStep
+
+# Per-request bound on concurrently running steps (1 = serial, in plan order).
+MAX_PARALLEL_STEPS = max(1, env_int("PLAN_MAX_PARALLEL_STEPS", 4))
+
+
+@dataclass
+class StepOutcome:
+    step: PlanStep
+    result: Any = None
+    error: BaseException | None = None
+    duration_ms: float = 0.0
+    # Not run because a step it depends on failed (`error` is that step's error).
+    skipped: bool = False
+
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=env_int("PLAN_EXECUTOR_MAX_WORKERS", 32), thread_name_prefix="plan")
+        return _pool
+
+
+def _run_step(fn: Callable[[PlanStep], Any], outcome: StepOutcome) -> StepOutcome:
+    started = time.perf_counter()
+    try:
+        outcome.result = fn(outcome.step)
+    except Exception as e:
+        outcome.error = e
+    outcome.duration_ms = round((time.perf_counter() - started) * 1000.0, 3)
+    return outcome
+
+
+def _check_dependencies(steps: Sequence[PlanStep]) -> None:
+    names = [s.name for s in steps]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Plan step names must be unique: {names}")
+    for s in steps:
+        unknown = [d for d in s.depends_on if d not in names]
+        if unknown:
+            raise ValueError(f"Plan step '{s.name}' depends on unknown steps: {unknown}")
+
+
+def run_plan_steps(
+    steps: Sequence[PlanStep],
+    fn: Callable[[PlanStep], Any],
+    *,
+    max_parallel: int | None = None,
+) -> list[StepOutcome]:
+    """
+    Calls `fn(step)` for every step, at most `max_parallel` at a time, honouring `depends_on`.
+    Errors do not stop the other steps; they are returned on the outcome (dependents are skipped).
+    """
+    _check_dependencies(steps)
+    limit = max(1, max_parallel if max_parallel is not None else MAX_PARALLEL_STEPS)
+
+    outcomes = {s.name: StepOutcome(step=s) for s in steps}
+    pending = list(steps)
+    finished: set[str] = set()
+    running: dict[Future, str] = {}
+
+    def ready() -> list[PlanStep]:
+        out: list[PlanStep] = []
+        for s in pending:
+            failed = next((outcomes[d] for d in s.depends_on if d in finished and outcomes[d].error), None)
+            if failed is not None:
+                outcomes[s.name].error = failed.error
+                outcomes[s.name].skipped = True
+                out.append(s)
+            elif all(d in finished for d in s.depends_on):
+                out.append(s)
+        return out
+
+    while pending or running:
+        for s in ready():
+            if outcomes[s.name].skipped:
+                pending.remove(s)
+                finished.add(s.name)
+                continue
+            if len(running) >= limit:
+                break
+            pending.remove(s)
+            if limit == 1:
+                _run_step(fn, outcomes[s.name])
+                finished.add(s.name)
+                continue
+            # One context copy per task: a Context cannot be entered by two threads at once.
+            ctx = contextvars.copy_context()
+            running[_get_pool().submit(ctx.run, _run_step, fn, outcomes[s.name])] = s.name
+
+        if not running:
+            if pending and not ready():
+                raise ValueError(f"Plan steps have a dependency cycle: {[s.name for s in pending]}")
+            continue
+
+        done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+        for fut in done:
+            finished.add(running.pop(fut))
+
+    return [outcomes[s.name] for s in steps]
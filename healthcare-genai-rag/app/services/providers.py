@@ -0,0 +1,147 @@
+"""
+Thin wrappers around the external calls (embeddings, vector store, LLM, PDF parsing) that
+record latency per dependency and usage into the active RequestTrace and the process-wide
+metrics (app/core/tracing.py). Network calls go through app/services/resilience.py
+(retries, circuit breakers, hedging, deadline budget).
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from app.core.config import env_bool
+from app.core.metrics import REGISTRY
+from app.core.tracing import record, record_llm_usage
+from app.services.document_chunks import reactivate_tenant
+from app.services.resilience import (
+    EMBED_HEDGE_DELAY_S,
+    CircuitOpenError,
+    DeadlineExceeded,
+    call_timeout_s,
+    call_with_resilience,
+    is_transient,
+)
+
+M = TypeVar("M", bound=BaseModel)
+
+DEPENDENCY_DURATION = REGISTRY.histogram(
+    "medirag_dependency_duration_seconds",
+    "Latency of external calls (embed_query, embed_documents, near_vector, fetch_objects, llm_invoke, "
+    "llm_stream, pdf_parse), including failed calls.",
+    ("dependency",),
+)
+DEPENDENCY_ERRORS = REGISTRY.counter(
+    "medirag_dependency_errors_total",
+    "External calls that raised.",
+    ("dependency",),
+)
+
+
+@contextmanager
+def timed_dependency(dependency: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DEPENDENCY_ERRORS.inc(dependency=dependency)
+        raise
+    finally:
+        DEPENDENCY_DURATION.observe(time.perf_counter() - start, dependency=dependency)
+
+
+def embed_query(embeddings: Any, text: str) -> list[float]:
+    with timed_dependency("embed_query"):
+        vector = call_with_resilience(
+            "embeddings", lambda: embeddings.embed_query(text), hedge_delay_s=EMBED_HEDGE_DELAY_S
+        )
+    record("embedding_calls")
+    record("embedded_texts")
+    return vector
+
+
+def embed_documents(embeddings: Any, texts: list[str]) -> list[list[float]]:
+    with timed_dependency("embed_documents"):
+        vectors = call_with_resilience("embeddings", lambda: embeddings.embed_documents(texts))
+    record("embedding_calls")
+    record("embedded_texts", len(texts))
+    return vectors
+
+
+def _vector_store_call(dependency: str, collection: Any, call: Callable[[], Any]) -> Any:
+    with timed_dependency(dependency):
+        try:
+            result = call_with_resilience("vector_store", call)
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
+        except Exception as e:
+            # A tenant offloaded by another worker: reactivate it and retry once.
+            if is_transient(e) or not reactivate_tenant(collection):
+                raise
+            result = call_with_resilience("vector_store", call)
+    record("vector_queries")
+    return result
+
+
+def near_vector(collection: Any, **kwargs: Any) -> Any:
+    return _vector_store_call("near_vector", collection, lambda: collection.query.near_vector(**kwargs))
+
+
+def fetch_objects(collection: Any, **kwargs: Any) -> Any:
+    return _vector_store_call("fetch_objects", collection, lambda: collection.query.fetch_objects(**kwargs))
+
+
+def llm_invoke(llm: Any, prompt: str) -> str:
+    """
+    Returns the message content; token usage is taken from `usage_metadata` when reported.
+    The remaining request budget is passed to the client as the call timeout.
+    """
+
+    def call() -> Any:
+        timeout_s = call_timeout_s()
+        return llm.invoke(prompt) if timeout_s is None else llm.invoke(prompt, timeout=timeout_s)
+
+    with timed_dependency("llm_invoke"):
+        message = call_with_resilience("llm", call)
+    record("llm_calls")
+    record_llm_usage(message)
+    return message.content
+
+
+def structured_output_enabled() -> bool:
+    return env_bool("LLM_STRUCTURED_OUTPUT", True)
+
+
+def llm_invoke_structured(llm: Any, prompt: str, schema: type[M]) -> tuple[str, M | None]:
+    """
+    Provider-enforced structured output: the request carries `response_format=schema` (the binding
+    `llm.with_structured_output(schema, method="json_schema")` makes) and the validated object comes
+    back in `additional_kwargs["parsed"]`. Invoked directly rather than through the
+    with_structured_output chain, whose include_raw branch drops the per-call `timeout` and the
+    message's token usage. Returns (raw content, parsed object or None).
+    """
+
+    def call() -> Any:
+        timeout_s = call_timeout_s()
+        kwargs: dict[str, Any] = {"response_format": schema}
+        if timeout_s is not None:
+            kwargs["timeout"] = timeout_s
+        return llm.invoke(prompt, **kwargs)
+
+    with timed_dependency("llm_invoke"):
+        message = call_with_resilience("llm", call)
+    record("llm_calls")
+    record_llm_usage(message)
+
+    parsed = (getattr(message, "additional_kwargs", None) or {}).get("parsed")
+    if isinstance(parsed, dict):
+        try:
+            parsed = schema.model_validate(parsed)
+        except ValueError:
+            parsed = None
+    content = message.content if isinstance(message.content, str) else ""
+    return content, parsed if isinstance(parsed, schema) else None
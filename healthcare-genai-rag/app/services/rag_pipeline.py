@@ -1,46 +1,37 @@
 from __future__ import annotations
 
-import json
 import os
 import re
 from datetime import date
-
-from app.schemas.rag import Evidence, PriorAuthExtraction, RagExtractResponse
+from typing import TYPE_CHECKING
 
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from weaviate.classes.query import Filter
+from sqlalchemy.orm import Session
 
+from app.schemas.agentic_qa import PlanStep
 from app.schemas.rag import Evidence, PriorAuthExtraction, RagExtractResponse
-from app.services.embeddings import get_embeddings
+from app.services.chunk_text import hydrate_chunk_texts
+from app.services.document_chunks import document_chunks, document_tenant_exists
+from app.services.evidence_index import IndexedChunk
+from app.services.plan_executor import run_plan_steps
+from app.services.json_repair import parse_json_tolerant, record_parse_outcome
+from app.services.providers import (
+    fetch_objects,
+    llm_invoke,
+    llm_invoke_structured,
+    structured_output_enabled,
+)
+from app.services.resilience import DeadlineExceeded, is_deadline_error, remaining_budget_s
+from app.services.retriever import retrieve_plan_step
 from app.services.weaviate_client import get_weaviate_client
 
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
 
 # -----------------------
 # JSON hardening (cheap)
 # -----------------------
-def _extract_json_candidate(text: str) -> str | None:
-    """
-    Best-effort extraction of a JSON object from a messy LLM response.
-    Cheap and deterministic.
-    """
-    if not text:
-        return None
-    s = text.strip()
-
-    # If response is already pure JSON
-    if s.startswith("{") and s.endswith("}"):
-        return s
-
-    # Try to find the first {...} block
-    start = s.find("{")
-    end = s.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return s[start : end + 1].strip()
-
-    return None
-
-
 def _build_repair_prompt(schema_prompt: str, raw: str) -> str:
     """
     Ask the model to output valid JSON only.
@@ -65,22 +56,28 @@ Invalid response to fix:
 def parse_llm_json_with_repair(llm: object, *, schema_prompt: str, raw: str) -> tuple[dict, list[str]]:
     """
     Unit-test friendly helper:
-    - tries to parse JSON from `raw`
-    - if invalid, makes ONE repair call: llm.invoke(repair_prompt).content
+    - tries to parse JSON from `raw`, repairing it locally (json_repair) when possible
+    - if still invalid, makes ONE repair call: llm.invoke(repair_prompt).content
     - returns (payload, warnings)
     """
     warnings: list[str] = []
 
-    candidate = _extract_json_candidate(raw) or (raw or "")
     try:
-        payload = json.loads(candidate)
+        payload, repaired = parse_json_tolerant(raw)
+        record_parse_outcome("json", "local_repair" if repaired else "valid")
+        if repaired:
+            warnings.append("Model output was invalid JSON; repaired locally.")
         return payload, warnings
-    except Exception:
+    except ValueError:
         repair_prompt = _build_repair_prompt(schema_prompt=schema_prompt, raw=raw)
-        repaired = getattr(llm, "invoke")(repair_prompt).content
+        repaired_raw = llm_invoke(llm, repair_prompt)
 
-        candidate = _extract_json_candidate(repaired) or (repaired or "")
-        payload = json.loads(candidate)
+        try:
+            payload, _ = parse_json_tolerant(repaired_raw)
+        except ValueError:
+            record_parse_outcome("json", "failed")
+            raise
+        record_parse_outcome("json", "llm_repair")
 
         warnings.append("Model output was invalid JSON; auto-repaired successfully.")
         return payload, warnings
@@ -94,10 +91,15 @@ def is_document_indexed(document_id: str) -> bool:
     Returns True if Weaviate has at least one DocumentChunk for the document_id.
     Used by the agentic workflow for auto-remediation (index-if-missing).
     """
+    from weaviate.classes.query import Filter
+
     client = get_weaviate_client()
     try:
-        collection = client.collections.get("DocumentChunk")
-        res = collection.query.fetch_objects(
+        if not document_tenant_exists(client, document_id):
+            return False
+        collection = document_chunks(client, document_id)
+        res = fetch_objects(
+            collection,
             limit=1,
             filters=Filter.by_property("document_id").equal(document_id),
             return_properties=["document_id"],
@@ -170,6 +172,8 @@ _MEMBER_GROUP_RE = re.compile(r"\b(?:member group|group id|group number|member g
 # LLM
 # -----------------------
 def _get_llm() -> ChatOpenAI:
+    from langchain_openai import ChatOpenAI
+
     load_dotenv()
     api_key = os.getenv("OPENAI_API_KEY")
     model = os.getenv("OPENAI_MODEL")
@@ -177,7 +181,8 @@ def _get_llm() -> ChatOpenAI:
         raise RuntimeError("OPENAI_API_KEY is not set")
     if not model:
         raise RuntimeError("OPENAI_MODEL is not set")
-    return ChatOpenAI(model=model, api_key=api_key, temperature=0)
+    # Retries/backoff are handled by app/services/resilience.py.
+    return ChatOpenAI(model=model, api_key=api_key, temperature=0, max_retries=0)
 
 
 def _build_prompt(query: str, context: str) -> str:
@@ -221,15 +226,6 @@ Context (use only this as evidence):
 # -----------------------
 # Normalization helpers
 # -----------------------
-def _distance_to_similarity(distance: float | None) -> float | None:
-    if distance is None:
-        return None
-    d = float(distance)
-    if d < 0:
-        return None
-    return 1.0 / (1.0 + d)
-
-
 def _normalize_decision(value: str) -> str:
     v = (value or "").strip().lower()
     if not v:
@@ -453,46 +449,12 @@ def _dedupe_chunks(chunks: list[dict]) -> list[dict]:
     return out
 
 
-def _query_weaviate(document_id: str, query: str, limit: int) -> list[dict]:
-    embeddings = get_embeddings()
-    client = get_weaviate_client()
-    try:
-        collection = client.collections.get("DocumentChunk")
-        query_vector = embeddings.embed_query(query)
-
-        result = collection.query.near_vector(
-            near_vector=query_vector,
-            limit=limit,
-            filters=Filter.by_property("document_id").equal(document_id),
-            return_metadata=["distance"],
-            return_properties=["document_id", "page_number", "chunk_index", "text"],
-        )
-
-        items: list[dict] = []
-        for obj in result.objects:
-            props = obj.properties or {}
-            distance = getattr(obj.metadata, "distance", None)
-            text = props.get("text") or ""
-            items.append(
-                {
-                    "document_id": props.get("document_id"),
-                    "page_number": props.get("page_number"),
-                    "chunk_index": props.get("chunk_index"),
-                    "text": text,
-                    "distance": distance,
-                    "similarity": _distance_to_similarity(distance),
-                    "boost": _score_chunk_text(text),
-                }
-            )
-        return items
-    finally:
-        client.close()
-
-
 def _build_context(chunks: list[dict], max_context_chars: int) -> tuple[str, list[dict]]:
     chunks = sorted(
         chunks,
+        # Facet-filter hits have no similarity; they are exact field-label matches, so they go first.
         key=lambda x: (
+            bool(x.get("field_match")),
             x.get("similarity") is not None,
             x.get("similarity") or 0.0,
             x.get("boost") or 0,
@@ -526,14 +488,13 @@ def _build_context(chunks: list[dict], max_context_chars: int) -> tuple[str, lis
     return "\n".join(lines), used
 
 
-def _pick_rationale_sentence(text: str, max_len: int = 240) -> str:
+def _pick_rationale_sentence(text: str, max_len: int = 240, sentence_offsets: list[int] | None = None) -> str:
     if not text:
         return ""
-    cleaned = " ".join(text.replace("\n", " ").split()).strip()
-    if not cleaned:
-        return ""
-    parts = re.split(r"(?<=[\.\!\?])\s+|;\s+|\s+-\s+", cleaned)
-    candidates = [p.strip() for p in parts if p.strip() and _RATIONALE_HINTS.search(p)]
+    # Sentence spans stored at index time; chunks indexed before that are split here.
+    chunk = IndexedChunk((0, 0), text, sentence_offsets)
+    parts = [" ".join(text[start:end].split()) for start, end in chunk.sentences]
+    candidates = [p for p in parts if p and _RATIONALE_HINTS.search(p)]
     if not candidates:
         return ""
     candidates.sort(key=len)
@@ -619,38 +580,81 @@ def extract_structured_json(
     top_k: int = 12,
     max_evidence: int = 5,
     max_context_chars: int = 8000,
+    db: Session | None = None,
 ) -> RagExtractResponse:
-    chunks_main = _query_weaviate(document_id=document_id, query=query, limit=top_k)
-    chunks_dates = _query_weaviate(
-        document_id=document_id,
-        query="service date date of service dos admission date authorization period date",
-        limit=max(8, top_k // 2),
-    )
-    chunks_ids = _query_weaviate(
-        document_id=document_id,
-        query="patient name patient id member id subscriber id member group group id group number dob date of birth",
-        limit=max(8, top_k // 2),
-    )
-    chunks_decision = _query_weaviate(
-        document_id=document_id,
-        query="decision approved denied pending in review rationale reason",
-        limit=max(8, top_k // 2),
-    )
+    """
+    `db` serves chunk text from DocumentPage rows; without it the text is fetched from the vector store.
+    """
+    facet_limit = max(4, top_k // 2)
+    facets = [
+        PlanStep(name="main", query=query),
+        PlanStep(name="dates", query="service date date of service dos admission date authorization period date"),
+        PlanStep(
+            name="ids",
+            query="patient name patient id member id subscriber id member group group id group number dob date of birth",
+        ),
+        PlanStep(name="decision", query="decision approved denied pending in review rationale reason"),
+    ]
+    limits = {"main": top_k}
 
-    merged = _dedupe_chunks(chunks_main + chunks_dates + chunks_ids + chunks_decision)
-    context, used_chunks = _build_context(merged, max_context_chars=max_context_chars)
+    warnings: list[str] = []
 
-    llm = _get_llm()
-    prompt = _build_prompt(query=query, context=context)
-    raw = llm.invoke(prompt).content
+    outcomes = run_plan_steps(
+        facets,
+        lambda step: retrieve_plan_step(document_id=document_id, step=step, top_k=limits.get(step.name, facet_limit)),
+    )
+    retrieved: list[dict] = []
+    deadline_hit = False
+    # Plan order keeps the main query's chunks first for _dedupe_chunks.
+    for outcome in outcomes:
+        if isinstance(outcome.error, DeadlineExceeded):
+            deadline_hit = True
+        elif outcome.error is not None:
+            raise outcome.error
+        else:
+            retrieved.extend(outcome.result)
+    if deadline_hit:
+        warnings.append("Deadline reached during retrieval; using the chunks retrieved so far.")
+
+    merged = hydrate_chunk_texts(db, document_id, _dedupe_chunks(retrieved))
+    if db is not None:
+        # End the page read's transaction before the LLM call.
+        db.commit()
+    for it in merged:
+        it["boost"] = _score_chunk_text(it["text"])
+    context, used_chunks = _build_context(merged, max_context_chars=max_context_chars)
 
-    warnings: list[str] = []
+    raw: str | None = None
+    parsed: PriorAuthExtraction | None = None
+    try:
+        llm = _get_llm()
+        prompt = _build_prompt(query=query, context=context)
+        if structured_output_enabled():
+            raw, parsed = llm_invoke_structured(llm, prompt, PriorAuthExtraction)
+        else:
+            raw = llm_invoke(llm, prompt)
+    except Exception as e:
+        if not is_deadline_error(e, remaining_budget_s()):
+            raise
+        # Best-so-far: the rule-based extractors below still run on the retrieved context.
+        warnings.append("Deadline reached before the LLM answered; returning rule-based extraction only.")
 
     try:
-        payload = json.loads(raw)
+        if parsed is not None:
+            record_parse_outcome("PriorAuthExtraction", "structured")
+            payload = parsed.model_dump()
+        elif raw is None:
+            payload = {}
+        else:
+            payload, repaired = parse_json_tolerant(raw)
+            record_parse_outcome("PriorAuthExtraction", "local_repair" if repaired else "valid")
+            if repaired:
+                warnings.append("Model output was invalid JSON; repaired locally.")
         payload = _normalize_payload_before_validation(payload)
         extraction = PriorAuthExtraction.model_validate(payload)
     except Exception as e:
+        if raw is not None:
+            record_parse_outcome("PriorAuthExtraction", "failed")
         extraction = _postprocess_extraction(PriorAuthExtraction())
         warnings.append(f"Model output invalid; returning empty extraction: {e!s}")
         return RagExtractResponse(
@@ -694,7 +698,9 @@ def extract_structured_json(
     if rat:
         extraction.rationale = rat
     elif used_chunks:
-        picked = _pick_rationale_sentence(used_chunks[0].get("text") or "")
+        picked = _pick_rationale_sentence(
+            used_chunks[0].get("text") or "", sentence_offsets=used_chunks[0].get("sentence_offsets")
+        )
         if picked:
             extraction.rationale = picked
 
@@ -707,6 +713,9 @@ def extract_structured_json(
             chunk_index=it.get("chunk_index"),
             snippet=(it.get("text") or "")[:2000],
             similarity=it.get("similarity"),
+            char_start=it.get("char_start"),
+            end_page_number=it.get("end_page_number"),
+            char_end=it.get("char_end"),
         )
         for it in used_chunks
     ]
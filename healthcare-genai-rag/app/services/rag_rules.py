@@ -40,6 +40,41 @@ _MEMBER_ID_RE = re.compile(r"\bmember id\b\s*[:\-]\s*([A-Z0-9\-_]+)\b", re.IGNOR
 _SUBSCRIBER_ID_RE = re.compile(r"\bsubscriber id\b\s*[:\-]\s*([A-Z0-9\-_]+)\b", re.IGNORECASE)
 _MEMBER_GROUP_RE = re.compile(r"\b(?:member group|group id|group number|member group id)\b\s*[:\-]\s*([A-Z0-9\-_]+)\b", re.IGNORECASE)
 
+_DOCUMENT_DATE_LABEL_RE = re.compile(rf"\bdate\b\s*[:\-]\s*({_DATE_TOKEN})\b", re.IGNORECASE)
+_PATIENT_NAME_LABEL_RE = re.compile(r"\bpatient name\b\s*[:\-]\s*\S", re.IGNORECASE)
+
+# Field labels a chunk carries (stored as DocumentChunk.fields at index time), each detected by the
+# same rules the rule-based extractors use.
+_FIELD_PATTERNS: dict[str, tuple[re.Pattern[str], ...]] = {
+    "patient_name": (_PATIENT_NAME_LABEL_RE,),
+    "patient_id": (_PATIENT_ID_RE,),
+    "member_id": (_MEMBER_ID_RE, _SUBSCRIBER_ID_RE),
+    "member_group": (_MEMBER_GROUP_RE,),
+    "dob": (_DOB_LABEL_RE,),
+    "service_date": (_SERVICE_DATE_LABEL_RE,),
+    "admission_date": (_ADMISSION_DATE_LABEL_RE,),
+    "authorization_period": (_AUTH_PERIOD_RE,),
+    "document_date": (_DOCUMENT_DATE_LABEL_RE,),
+    "decision": (_DECISION_LABEL_RE,),
+    "rationale": (_RATIONALE_LABEL_RE,),
+}
+
+# Retrieval facets (plan step names) -> the field labels that answer them.
+FACET_FIELDS: dict[str, tuple[str, ...]] = {
+    "dates": ("service_date", "admission_date", "authorization_period", "document_date"),
+    "ids": ("patient_name", "patient_id", "member_id", "member_group", "dob"),
+    "decision": ("decision", "rationale"),
+}
+
+
+def detect_fields(text: str) -> list[str]:
+    """
+    Field labels present in `text` ("Member ID: M-1" -> ["member_id"]), in _FIELD_PATTERNS order.
+    """
+    if not text:
+        return []
+    return [name for name, patterns in _FIELD_PATTERNS.items() if any(p.search(text) for p in patterns)]
+
 
 def _to_iso_date(y: int, m: int, d: int) -> str:
     return date(y, m, d).isoformat()
@@ -159,4 +194,25 @@ def extract_structured_from_context(context: str) -> PriorAuthExtraction:
             out.rationale = " ".join(m.group(1).split()).strip()
             break
 
-    return out
\ No newline at end of file
+    return out
+
+
+def document_fields(text: str) -> dict[str, str | None]:
+    """
+    Document-level fields stored on every chunk at index time, for cross-document search:
+    member_id, patient_id, decision and document_date (ISO; the service date, else the letter's
+    "Date:" line). None when not found.
+    """
+    extraction = extract_structured_from_context(text)
+    document_date = extraction.service_date
+    if not document_date:
+        m = _DOCUMENT_DATE_LABEL_RE.search(text or "")
+        document_date = normalize_date_to_iso(m.group(1)) if m else ""
+    if not re.fullmatch(r"\d{4}-\d{2}-\d{2}", document_date or ""):
+        document_date = ""
+    return {
+        "member_id": extraction.member_id if extraction.member_id != "unknown" else None,
+        "patient_id": extraction.patient_id if extraction.patient_id != "unknown" else None,
+        "decision": extraction.decision,
+        "document_date": document_date or None,
+    }
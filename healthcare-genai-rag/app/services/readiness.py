@@ -0,0 +1,138 @@
+"""
+Dependency readiness for GET /ready.
+
+Probes (Postgres, vector store, LLM configuration) run in a background task; the endpoint only
+reads the last results, so a k8s probe is O(1) and never waits on, or piles load onto, a slow
+dependency. A probe still running from a previous round is not started again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+from app.core.config import env_float
+from app.db.session import get_engine
+from app.services.weaviate_client import weaviate_is_ready
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    ok: bool
+    checked_at: float  # time.monotonic()
+    latency_ms: float
+    error: str | None = None
+
+
+def probe_postgres() -> None:
+    with get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def probe_vector_store() -> None:
+    if not weaviate_is_ready():
+        raise RuntimeError("vector store is not ready")
+
+
+def probe_llm_config() -> None:
+    # Configuration only: a completion call per probe would cost tokens.
+    for name in ("OPENAI_API_KEY", "OPENAI_MODEL"):
+        if not os.getenv(name):
+            raise RuntimeError(f"{name} is not set")
+
+
+DEFAULT_PROBES: dict[str, Callable[[], None]] = {
+    "postgres": probe_postgres,
+    "vector_store": probe_vector_store,
+    "llm_config": probe_llm_config,
+}
+
+
+class ReadinessMonitor:
+    def __init__(
+        self,
+        probes: dict[str, Callable[[], None]] | None = None,
+        *,
+        ttl_s: float | None = None,
+        probe_timeout_s: float | None = None,
+    ) -> None:
+        self.probes = probes if probes is not None else dict(DEFAULT_PROBES)
+        # Results older than ttl_s count as failed (the refresher is stuck or stopped).
+        self.ttl_s = ttl_s if ttl_s is not None else env_float("READINESS_TTL_S", 30.0)
+        self.probe_timeout_s = (
+            probe_timeout_s if probe_timeout_s is not None else env_float("READINESS_PROBE_TIMEOUT_S", 3.0)
+        )
+        self.results: dict[str, ProbeResult] = {}
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    async def _run_probe(self, name: str, probe: Callable[[], None]) -> None:
+        pending = self._in_flight.get(name)
+        if pending is not None and not pending.done():
+            self.results[name] = ProbeResult(
+                ok=False, checked_at=time.monotonic(), latency_ms=0.0, error="previous probe still running"
+            )
+            return
+
+        start = time.monotonic()
+        future = asyncio.ensure_future(asyncio.to_thread(probe))
+        self._in_flight[name] = future
+        error: str | None = None
+        try:
+            # shield: on timeout the thread keeps running, tracked in _in_flight, and is not restarted.
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.probe_timeout_s)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.probe_timeout_s:g}s"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        now = time.monotonic()
+        self.results[name] = ProbeResult(
+            ok=error is None,
+            checked_at=now,
+            latency_ms=round((now - start) * 1000.0, 3),
+            error=error,
+        )
+
+    async def refresh(self) -> None:
+        await asyncio.gather(*(self._run_probe(name, probe) for name, probe in self.probes.items()))
+
+    async def run_forever(self, interval_s: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Readiness refresh failed")
+            await asyncio.sleep(interval_s)
+
+    def snapshot(self) -> tuple[bool, dict[str, dict]]:
+        now = time.monotonic()
+        checks: dict[str, dict] = {}
+        ready = True
+        for name in self.probes:
+            result = self.results.get(name)
+            if result is None:
+                checks[name] = {"ok": False, "error": "not probed yet"}
+                ready = False
+                continue
+
+            age_s = now - result.checked_at
+            ok = result.ok and age_s <= self.ttl_s
+            checks[name] = {
+                "ok": ok,
+                "age_s": round(age_s, 3),
+                "latency_ms": result.latency_ms,
+                "error": result.error or (None if ok else "stale result"),
+            }
+            ready = ready and ok
+        return ready, checks
+
+
+readiness_monitor = ReadinessMonitor()
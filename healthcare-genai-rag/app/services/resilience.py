@@ -0,0 +1,283 @@
+"""
+Resilience for provider calls (OpenAI embeddings/LLM, vector store):
+  - retries with full-jitter exponential backoff, on transient errors only,
+  - one circuit breaker per dependency (fail fast while a provider is down),
+  - hedged calls for idempotent, cheap requests (embed_query),
+  - the request's deadline budget (RequestTrace.deadline): no attempt or backoff past it.
+
+The SDK clients are created with max_retries=0 so retries are not stacked on top of these.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TypeVar
+
+from app.core.config import env_float, env_int
+from app.core.metrics import REGISTRY
+from app.core.tracing import current_trace
+
+T = TypeVar("T")
+
+RETRIES = REGISTRY.counter(
+    "medirag_dependency_retries_total",
+    "Retries after a transient provider error.",
+    ("dependency",),
+)
+HEDGES = REGISTRY.counter(
+    "medirag_dependency_hedged_calls_total",
+    "Hedged (duplicate) calls fired because the first one was slow; won=hedge|primary.",
+    ("dependency", "won"),
+)
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "medirag_circuit_open_rejections_total",
+    "Calls failed fast because the dependency's circuit was open.",
+    ("dependency",),
+)
+
+_MAX_ATTEMPTS = max(1, env_int("RETRY_MAX_ATTEMPTS", 3))
+_BASE_DELAY_S = env_float("RETRY_BASE_DELAY_S", 0.2)
+_MAX_DELAY_S = env_float("RETRY_MAX_DELAY_S", 2.0)
+# Fire a duplicate embed_query when the first has not answered after this long (0 disables).
+EMBED_HEDGE_DELAY_S = env_float("EMBED_HEDGE_DELAY_S", 0.75)
+
+_TRANSIENT_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+# Matched by name so the SDKs (openai, httpx, weaviate) are never imported here.
+_TRANSIENT_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "RateLimitError",
+    "InternalServerError",
+    "ConnectError",
+    "ReadTimeout",
+    "ConnectTimeout",
+    "RemoteProtocolError",
+    "WeaviateConnectionError",
+    "WeaviateTimeoutError",
+    "WeaviateQueryError",
+}
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, dependency: str, retry_after_s: float) -> None:
+        super().__init__(f"{dependency} is unavailable (circuit open); retry after {retry_after_s:.1f}s")
+        self.dependency = dependency
+        self.retry_after_s = retry_after_s
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def is_transient(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError)) and not isinstance(exc, DeadlineExceeded):
+        return True
+    for cls in type(exc).__mro__:
+        if cls.__name__ in _TRANSIENT_NAMES:
+            return True
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return isinstance(status, int) and status in _TRANSIENT_STATUS
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive transient failures;
+    open -> half_open after `reset_timeout_s` (one trial call); trial success closes, failure reopens.
+    """
+
+    def __init__(self, dependency: str, *, failure_threshold: int, reset_timeout_s: float) -> None:
+        self.dependency = dependency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == "open" and elapsed >= self.reset_timeout_s:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_after = max(self.reset_timeout_s - elapsed, 1.0)
+        CIRCUIT_REJECTIONS.inc(dependency=self.dependency)
+        raise CircuitOpenError(self.dependency, retry_after)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def on_failure(self, exc: BaseException) -> None:
+        with self._lock:
+            if not is_transient(exc):
+                # The provider answered (bad request, auth, parsing): it is up.
+                if self.state == "half_open":
+                    self.state = "closed"
+                self._trial_in_flight = False
+                return
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(dependency: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(dependency)
+        if breaker is None:
+            breaker = _breakers[dependency] = CircuitBreaker(
+                dependency,
+                failure_threshold=env_int("CIRCUIT_FAILURE_THRESHOLD", 5),
+                reset_timeout_s=env_float("CIRCUIT_RESET_TIMEOUT_S", 30.0),
+            )
+        return breaker
+
+
+def reset_breakers() -> None:
+    with _breakers_lock:
+        _breakers.clear()
+
+
+REGISTRY.gauge(
+    "medirag_circuit_state",
+    "Circuit breaker state per dependency (0=closed, 1=half_open, 2=open).",
+    lambda: {
+        (name,): {"closed": 0, "half_open": 1, "open": 2}[b.state] for name, b in list(_breakers.items())
+    },
+    ("dependency",),
+)
+
+
+def default_deadline(deadline_ms: int | None = None) -> float | None:
+    """
+    Absolute deadline (time.monotonic()) for a new request: the request's own `deadline_ms`,
+    capped by REQUEST_DEADLINE_S (0 = no server-side cap).
+    """
+    now = time.monotonic()
+    budget_s = env_float("REQUEST_DEADLINE_S", 120.0)
+    deadlines = [now + budget_s] if budget_s > 0 else []
+    if deadline_ms is not None:
+        deadlines.append(now + deadline_ms / 1000.0)
+    return min(deadlines) if deadlines else None
+
+
+def remaining_budget_s() -> float | None:
+    trace = current_trace()
+    return trace.remaining_s() if trace is not None else None
+
+
+def call_timeout_s() -> float | None:
+    """
+    Per-call client timeout: whatever is left of the active request's budget.
+    """
+    remaining = remaining_budget_s()
+    if remaining is None:
+        return None
+    return max(remaining, 0.001)
+
+
+def is_deadline_error(exc: BaseException, remaining_s: float | None) -> bool:
+    """
+    True when `exc` means the request ran out of budget: DeadlineExceeded, or a client
+    timeout/transient error raised with (almost) nothing left of the budget.
+    """
+    if isinstance(exc, DeadlineExceeded):
+        return True
+    return remaining_s is not None and remaining_s <= 0.05 and is_transient(exc)
+
+
+def check_deadline(dependency: str) -> None:
+    remaining = remaining_budget_s()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Request deadline exceeded before calling {dependency}")
+
+
+def backoff_delay_s(attempt: int, *, base_s: float, max_s: float) -> float:
+    # "Full jitter": uniform in [0, min(max, base * 2^attempt)].
+    return random.uniform(0.0, min(max_s, base_s * (2**attempt)))
+
+
+_hedge_pool: ThreadPoolExecutor | None = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=env_int("HEDGE_MAX_WORKERS", 64), thread_name_prefix="hedge")
+        return _hedge_pool
+
+
+def _hedged(dependency: str, fn: Callable[[], T], delay_s: float) -> T:
+    """
+    Runs `fn`; if it has not finished after `delay_s`, fires a second identical call and
+    returns whichever finishes first (the loser's result is discarded).
+    """
+    pool = _get_hedge_pool()
+    primary = pool.submit(fn)
+    try:
+        return primary.result(timeout=delay_s)
+    except FutureTimeoutError:
+        if primary.done():
+            raise  # fn itself raised a TimeoutError
+
+    hedge = pool.submit(fn)
+    pending: set[Future] = {primary, hedge}
+    first_error: BaseException | None = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            if fut.exception() is None:
+                HEDGES.inc(dependency=dependency, won="hedge" if fut is hedge else "primary")
+                return fut.result()
+            first_error = first_error or fut.exception()
+    raise first_error  # both failed
+
+
+def call_with_resilience(dependency: str, fn: Callable[[], T], *, hedge_delay_s: float = 0.0) -> T:
+    """
+    Calls `fn` under the dependency's circuit breaker, retrying transient errors with jittered
+    backoff while the request's deadline allows another attempt.
+    """
+    breaker = get_breaker(dependency)
+    attempt = 0
+    while True:
+        check_deadline(dependency)
+        breaker.before_call()
+        try:
+            result = _hedged(dependency, fn, hedge_delay_s) if hedge_delay_s > 0 else fn()
+        except Exception as e:
+            breaker.on_failure(e)
+            attempt += 1
+            if not is_transient(e) or attempt >= _MAX_ATTEMPTS:
+                raise
+            delay = backoff_delay_s(attempt - 1, base_s=_BASE_DELAY_S, max_s=_MAX_DELAY_S)
+            remaining = remaining_budget_s()
+            if remaining is not None and remaining <= delay:
+                # Another attempt cannot finish in time; surface the real error.
+                raise
+            RETRIES.inc(dependency=dependency)
+            time.sleep(delay)
+            continue
+        breaker.on_success()
+        return result
@@ -2,13 +2,22 @@ from __future__ import annotations
 
 from typing import Any
 
-from weaviate.classes.query import Filter
-
+from app.core.config import env_str
+from app.schemas.agentic_qa import PlanStep
+from app.services.chunk_text import CHUNK_REF_PROPERTIES
+from app.services.document_chunks import document_chunks
 from app.services.embeddings import get_embeddings
+from app.services.providers import embed_query, fetch_objects, near_vector
+from app.services.rag_rules import FACET_FIELDS
+from app.services.resilience import call_timeout_s
 from app.services.weaviate_client import get_weaviate_client
 
+# "filter": facet plan steps (dates, ids, decision) read the chunks labelled with their fields
+# (DocumentChunk.fields) with a property filter; no embedding, no ANN. "ann" embeds the facet query.
+FACET_RETRIEVAL = env_str("FACET_RETRIEVAL", "filter")
+
 
-def _distance_to_similarity(distance: float | None) -> float | None:
+def distance_to_similarity(distance: float | None) -> float | None:
     if distance is None:
         return None
     d = float(distance)
@@ -20,37 +29,94 @@ def _distance_to_similarity(distance: float | None) -> float | None:
 def retrieve_document_chunks(*, document_id: str, query: str, top_k: int) -> list[dict[str, Any]]:
     """
     Returns list of dicts:
-      {document_id, page_number, chunk_index, text, similarity}
+      {document_id, page_number, chunk_index, char_start, end_page_number, char_end, sentence_offsets, similarity}
+
+    No text: the vector store returns references and scores only; fill `text` with
+    app.services.chunk_text.hydrate_chunk_texts (one page query per document).
     """
-    embeddings = get_embeddings()
-    client = get_weaviate_client()
+    from weaviate.classes.query import Filter
+
+    timeout_s = call_timeout_s()
+    embeddings = get_embeddings(timeout_s=timeout_s)
+    client = get_weaviate_client(timeout_s=timeout_s)
     try:
-        collection = client.collections.get("DocumentChunk")
-        query_vector = embeddings.embed_query(query)
+        collection = document_chunks(client, document_id)
+        query_vector = embed_query(embeddings, query)
 
-        result = collection.query.near_vector(
+        result = near_vector(
+            collection,
             near_vector=query_vector,
             limit=top_k,
             filters=Filter.by_property("document_id").equal(document_id),
             return_metadata=["distance"],
-            return_properties=["document_id", "page_number", "chunk_index", "text"],
+            return_properties=CHUNK_REF_PROPERTIES,
         )
 
-        items: list[dict[str, Any]] = []
-        for obj in result.objects:
-            props = obj.properties or {}
-            distance = getattr(obj.metadata, "distance", None)
-            items.append(
-                {
-                    "document_id": props.get("document_id"),
-                    "page_number": props.get("page_number"),
-                    "chunk_index": props.get("chunk_index"),
-                    "text": (props.get("text") or "").strip(),
-                    "similarity": _distance_to_similarity(distance),
-                }
-            )
-
-        # Remove empties
-        return [it for it in items if it.get("text")]
+        return [
+            _chunk_ref(obj.properties or {}, distance_to_similarity(getattr(obj.metadata, "distance", None)))
+            for obj in result.objects
+        ]
     finally:
-        client.close()
\ No newline at end of file
+        client.close()
+
+
+def _chunk_ref(props: dict[str, Any], similarity: float | None) -> dict[str, Any]:
+    return {
+        "document_id": props.get("document_id"),
+        "page_number": props.get("page_number"),
+        "chunk_index": props.get("chunk_index"),
+        "char_start": props.get("char_start"),
+        "end_page_number": props.get("end_page_number"),
+        "char_end": props.get("char_end"),
+        "sentence_offsets": props.get("sentence_offsets"),
+        "similarity": similarity,
+    }
+
+
+def facet_filter_fields(step_name: str) -> tuple[str, ...] | None:
+    """
+    Field labels a plan step is answered by when facets are served by property filter, else None.
+    """
+    if FACET_RETRIEVAL != "filter":
+        return None
+    return FACET_FIELDS.get(step_name)
+
+
+def fetch_chunks_by_fields(*, document_id: str, fields: tuple[str, ...], limit: int) -> list[dict[str, Any]]:
+    """
+    Chunks of `document_id` labelled with any of `fields`, in page order, as references (no text,
+    similarity None, field_match True). Empty for chunks indexed before field labels were stored.
+    """
+    from weaviate.classes.query import Filter
+
+    client = get_weaviate_client(timeout_s=call_timeout_s())
+    try:
+        collection = document_chunks(client, document_id)
+        result = fetch_objects(
+            collection,
+            limit=limit,
+            filters=Filter.by_property("document_id").equal(document_id)
+            & Filter.by_property("fields").contains_any(list(fields)),
+            return_properties=CHUNK_REF_PROPERTIES,
+        )
+        # Exact label matches: ranked ahead of ANN hits when the prompt context is built.
+        items = [{**_chunk_ref(obj.properties or {}, None), "field_match": True} for obj in result.objects]
+        items.sort(key=lambda it: (it.get("page_number") or 0, it.get("chunk_index") or 0))
+        return items
+    finally:
+        client.close()
+
+
+def retrieve_plan_step(*, document_id: str, step: PlanStep, top_k: int) -> list[dict[str, Any]]:
+    """
+    One plan step's chunks: facet steps read the chunks labelled with their fields; the question
+    itself (and facets over chunks indexed without labels) goes through ANN.
+    """
+    if not step.query:
+        return []
+    fields = facet_filter_fields(step.name)
+    if fields:
+        hits = fetch_chunks_by_fields(document_id=document_id, fields=fields, limit=top_k)
+        if hits:
+            return hits
+    return retrieve_document_chunks(document_id=document_id, query=step.query, top_k=top_k)
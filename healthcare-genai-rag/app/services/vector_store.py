@@ -3,20 +3,18 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Iterable
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
+from app.core.config import env_int
+from app.services.chunker import get_chunker
+from app.services.document_chunks import activate_document_tenant, document_chunks, document_tenant_exists
 from app.services.embeddings import get_embeddings
+from app.services.evidence_index import sentence_offsets
+from app.services.providers import embed_documents
+from app.services.rag_rules import detect_fields, document_fields
 from app.services.weaviate_client import get_weaviate_client
 
 
-def _split_page_text(text: str) -> list[str]:
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=150,
-        separators=["\n\n", "\n", " ", ""],
-    )
-    chunks = splitter.split_text(text or "")
-    return [c.strip() for c in chunks if c and c.strip()]
+# Chunks per embed_documents call.
+EMBED_BATCH_SIZE = env_int("EMBED_BATCH_SIZE", 64)
 
 
 def index_document_pages_to_weaviate(
@@ -32,36 +30,51 @@ def index_document_pages_to_weaviate(
       - page.page_number (int)
       - page.text (str)
 
+    Chunks come from the form-aware chunker (app/services/chunker.py) and may span pages.
+
     Returns: number of chunks indexed.
     """
     embeddings = get_embeddings()
     client = get_weaviate_client()
 
     try:
-        collection = client.collections.get("DocumentChunk")
+        # Multi-tenant collection: create/reactivate the document's tenant first.
+        activate_document_tenant(client, document_id)
+        collection = document_chunks(client, document_id)
 
         total_chunks = 0
         created_at = datetime.now(timezone.utc).isoformat()
 
-        with collection.batch.dynamic() as batch:
-            for page in pages:
-                page_number = int(getattr(page, "page_number"))
-                page_text = getattr(page, "text") or ""
-
-                chunks = _split_page_text(page_text)
+        page_texts = [(int(getattr(page, "page_number")), getattr(page, "text") or "") for page in pages]
+        chunks = get_chunker().chunk_pages(page_texts)
+        # Document-level fields on every chunk: cross-document search filters on them.
+        fields = document_fields("\n".join(text for _, text in page_texts))
+        document_date = f"{fields['document_date']}T00:00:00Z" if fields["document_date"] else None
 
-                if not chunks:
-                    continue
-
-                vectors = embeddings.embed_documents(chunks)
+        with collection.batch.dynamic() as batch:
+            for offset in range(0, len(chunks), EMBED_BATCH_SIZE):
+                window = chunks[offset : offset + EMBED_BATCH_SIZE]
+                vectors = embed_documents(embeddings, [c.text for c in window])
 
-                for chunk_index, (chunk_text, vector) in enumerate(zip(chunks, vectors), start=1):
+                for ordinal, (chunk, vector) in enumerate(zip(window, vectors), start=offset):
                     batch.add_object(
                         properties={
                             "document_id": document_id,
-                            "page_number": page_number,
-                            "chunk_index": chunk_index,
-                            "text": chunk_text,
+                            "page_number": chunk.page_number,
+                            "chunk_index": chunk.chunk_index,
+                            "chunk_ordinal": ordinal,
+                            # Range in DocumentPage.text: retrieval slices the text from Postgres.
+                            "char_start": chunk.char_start,
+                            "end_page_number": chunk.end_page_number,
+                            "char_end": chunk.char_end,
+                            "text": chunk.text,
+                            "sentence_offsets": sentence_offsets(chunk.text),
+                            # Field labels for facet retrieval (a property filter instead of an ANN query).
+                            "fields": detect_fields(chunk.text),
+                            "member_id": fields["member_id"],
+                            "patient_id": fields["patient_id"],
+                            "decision": fields["decision"],
+                            "document_date": document_date,
                             "filename": filename or "",
                             "content_type": content_type or "",
                             "created_at": created_at,
@@ -72,4 +85,23 @@ def index_document_pages_to_weaviate(
 
         return total_chunks
     finally:
-        client.close()
\ No newline at end of file
+        client.close()
+
+
+def delete_document_chunks(document_id: str) -> int:
+    """
+    Removes every DocumentChunk of `document_id`. Returns number of objects deleted.
+    """
+    from weaviate.classes.query import Filter
+
+    client = get_weaviate_client()
+    try:
+        if not document_tenant_exists(client, document_id):
+            return 0
+        # Writes check the tenant status themselves (it may have been offloaded).
+        activate_document_tenant(client, document_id)
+        collection = document_chunks(client, document_id)
+        res = collection.data.delete_many(where=Filter.by_property("document_id").equal(document_id))
+        return int(getattr(res, "successful", 0) or 0)
+    finally:
+        client.close()
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
+import math
 import os
 
-import weaviate
 from dotenv import load_dotenv
 
 
-def get_weaviate_client():
+def get_weaviate_client(timeout_s: float | None = None):
     """
     Creates a Weaviate Cloud client.
     Caller must close it (client.close()).
+
+    VECTOR_STORE_BACKEND=memory returns the in-process store instead (local dev, tests, benchmarks).
+    `timeout_s` caps query calls (the caller's remaining deadline budget).
     """
     load_dotenv()
 
+    if (os.getenv("VECTOR_STORE_BACKEND") or "weaviate").strip().lower() == "memory":
+        from app.services.memory_vector_store import MemoryVectorStoreClient
+
+        return MemoryVectorStoreClient()
+
+    import weaviate
+
     weaviate_url = os.getenv("WEAVIATE_URL")
     weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
 
@@ -21,9 +31,17 @@ def get_weaviate_client():
     if not weaviate_api_key:
         raise RuntimeError("WEAVIATE_API_KEY is not set")
 
+    additional_config = None
+    if timeout_s is not None:
+        from weaviate.classes.init import AdditionalConfig, Timeout
+
+        # Weaviate timeouts are whole seconds.
+        additional_config = AdditionalConfig(timeout=Timeout(query=max(1, math.ceil(timeout_s))))
+
     return weaviate.connect_to_weaviate_cloud(
         cluster_url=weaviate_url,
         auth_credentials=weaviate.auth.AuthApiKey(weaviate_api_key),
+        additional_config=additional_config,
     )
 
 
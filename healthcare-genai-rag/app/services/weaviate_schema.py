@@ -6,7 +6,58 @@ import weaviate
 from dotenv import load_dotenv
 
 # Weaviate v4 collections API
-from weaviate.classes.config import Configure, DataType, Property
+from weaviate.classes.config import Configure, DataType, Property, Reconfigure, Tokenization
+
+from app.core.config import env_int, env_str
+from app.services.document_chunks import tenancy_enabled
+
+# Properties added after the collection was first created; ensure_document_chunk_collection adds
+# them to an existing collection (chunks indexed earlier keep them unset).
+_ADDED_PROPERTIES = [
+    # Flat [start, end, ...] sentence character offsets into `text`.
+    Property(name="sentence_offsets", data_type=DataType.INT_ARRAY),
+    # Position of the chunk in DocumentPage.text: (page_number, char_start) .. (end_page_number, char_end).
+    Property(name="char_start", data_type=DataType.INT),
+    Property(name="char_end", data_type=DataType.INT),
+    Property(name="end_page_number", data_type=DataType.INT),
+    # Field labels found in the chunk ("dob", "member_id", "decision", ...): facet retrieval filters on
+    # them. FIELD tokenization keeps "member_id" one token.
+    Property(name="fields", data_type=DataType.TEXT_ARRAY, tokenization=Tokenization.FIELD),
+    # Document-level extracted fields, repeated on each chunk, for cross-document search.
+    Property(name="member_id", data_type=DataType.TEXT, tokenization=Tokenization.FIELD),
+    Property(name="patient_id", data_type=DataType.TEXT, tokenization=Tokenization.FIELD),
+    Property(name="decision", data_type=DataType.TEXT, tokenization=Tokenization.FIELD),
+    Property(name="document_date", data_type=DataType.DATE),
+    # 0-based position of the chunk in its document (chunk_index counts per page): cross-document
+    # listing fetches each document's first chunks with it.
+    Property(name="chunk_ordinal", data_type=DataType.INT),
+]
+
+
+# Vector compression for the HNSW index: "none" (float32), "pq" (product quantization), "bq" (binary)
+# or "sq" (int8 scalar). BQ/SQ rescore VECTOR_RESCORE_LIMIT candidates with the original vectors.
+VECTOR_COMPRESSION = env_str("VECTOR_COMPRESSION", "none").lower()
+
+
+def _quantizer(update: bool = False):
+    """
+    Quantizer config for VECTOR_COMPRESSION (None for "none"); `update` builds the Reconfigure
+    variant used to enable it on an existing collection.
+    """
+    rescore_limit = env_int("VECTOR_RESCORE_LIMIT", 0) or None
+    quantizer = (Reconfigure if update else Configure).VectorIndex.Quantizer
+    if VECTOR_COMPRESSION == "pq":
+        return quantizer.pq(
+            segments=env_int("PQ_SEGMENTS", 0) or None,
+            training_limit=env_int("PQ_TRAINING_LIMIT", 0) or None,
+        )
+    if VECTOR_COMPRESSION == "bq":
+        return quantizer.bq(rescore_limit=rescore_limit)
+    if VECTOR_COMPRESSION == "sq":
+        return quantizer.sq(rescore_limit=rescore_limit)
+    if VECTOR_COMPRESSION != "none":
+        raise RuntimeError(f"VECTOR_COMPRESSION must be none, pq, bq or sq, got {VECTOR_COMPRESSION!r}")
+    return None
 
 
 def get_client():
@@ -29,16 +80,44 @@ def ensure_document_chunk_collection() -> None:
         collections = client.collections
 
         if collections.exists("DocumentChunk"):
+            collection = collections.get("DocumentChunk")
+            config = collection.config.get()
+            if tenancy_enabled() and not getattr(config.multi_tenancy_config, "enabled", False):
+                raise RuntimeError(
+                    "VECTOR_TENANCY=document_bucket needs a multi-tenant DocumentChunk collection; "
+                    "delete the existing collection and re-index the documents"
+                )
+            existing = {p.name for p in config.properties}
+            for prop in _ADDED_PROPERTIES:
+                if prop.name not in existing:
+                    collection.config.add_property(prop)
+            quantizer = _quantizer(update=True)
+            if quantizer is not None and getattr(config.vector_index_config, "quantizer", None) is None:
+                # Compresses the vectors already stored (PQ trains on them first).
+                collection.config.update(vector_index_config=Reconfigure.VectorIndex.hnsw(quantizer=quantizer))
             return
 
         collections.create(
             name="DocumentChunk",
             vectorizer_config=Configure.Vectorizer.none(),
+            vector_index_config=Configure.VectorIndex.hnsw(quantizer=_quantizer()),
+            # Tenant per document bucket (app/services/document_chunks.py), else optional sharding.
+            multi_tenancy_config=(
+                Configure.multi_tenancy(enabled=True, auto_tenant_creation=True, auto_tenant_activation=True)
+                if tenancy_enabled()
+                else None
+            ),
+            sharding_config=(
+                Configure.sharding(desired_count=env_int("VECTOR_SHARDS", 0))
+                if not tenancy_enabled() and env_int("VECTOR_SHARDS", 0) > 0
+                else None
+            ),
             properties=[
                 Property(name="document_id", data_type=DataType.TEXT),
                 Property(name="page_number", data_type=DataType.INT),
                 Property(name="chunk_index", data_type=DataType.INT),
                 Property(name="text", data_type=DataType.TEXT),
+                *_ADDED_PROPERTIES,
 
                 Property(name="filename", data_type=DataType.TEXT),
                 Property(name="content_type", data_type=DataType.TEXT),
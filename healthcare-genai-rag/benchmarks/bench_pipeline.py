@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from app.schemas.agentic_qa import AgenticQARequest
+from app.schemas.rag import CorpusSearchRequest
+from app.services import memory_vector_store, plan_executor, retriever
+from app.services.agentic_qa import AgenticQAService
+from app.services.corpus_search import search_corpus
+from app.services.document_loader import extract_pdf_pages_text
+from app.services.rag_pipeline import extract_structured_json
+from app.services.retriever import retrieve_document_chunks
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.corpus import build_corpus
+from benchmarks.fakes import benchmark_sessionmaker, offline_providers, seed_document
+from benchmarks.harness import BenchResult, run_benchmark
+
+EXTRACT_QUERY = "Extract patient id, member group, dates, decision and rationale."
+QA_QUESTION = "What was the decision and the rationale?"
+# Needs every facet (ids, dates, decision): exercises a four-step plan.
+BROAD_QA_QUESTION = "What are the patient id, the service date and the decision?"
+# Simulated embed_query round-trip for the serial vs concurrent plan-step comparison.
+PROVIDER_LATENCY_S = 0.01
+
+
+def _pages(texts: list[str]) -> list[SimpleNamespace]:
+    return [SimpleNamespace(page_number=i, text=t) for i, t in enumerate(texts, start=1)]
+
+
+def run(iterations: int = 20) -> list[BenchResult]:
+    results: list[BenchResult] = []
+
+    with tempfile.TemporaryDirectory(prefix="medirag-bench-") as tmp, offline_providers() as (embeddings, llm):
+        pdfs = build_corpus(Path(tmp) / "corpus")
+
+        def counters() -> dict[str, int]:
+            return {**embeddings.calls, **llm.calls, **memory_vector_store.operation_counts}
+
+        results.append(
+            run_benchmark(
+                "extract_pdf_pages_text",
+                lambda i: extract_pdf_pages_text(pdfs[i % len(pdfs)]),
+                iterations=iterations,
+                counters=counters,
+            )
+        )
+
+        corpus_pages = [_pages(extract_pdf_pages_text(p)) for p in pdfs]
+
+        results.append(
+            run_benchmark(
+                "index_document_pages_to_weaviate",
+                lambda i: index_document_pages_to_weaviate(
+                    document_id=f"bench-index-{i}",
+                    filename="bench.pdf",
+                    content_type="application/pdf",
+                    pages=corpus_pages[i % len(corpus_pages)],
+                ),
+                iterations=iterations,
+                counters=counters,
+            )
+        )
+
+        # Index the corpus once and register it as indexed, so the request paths take the hot path.
+        SessionLocal = benchmark_sessionmaker()
+        db = SessionLocal()
+        doc_ids: list[str] = []
+        for n, pages in enumerate(corpus_pages):
+            # Page rows too: retrieval slices chunk text from them.
+            doc = seed_document(db, f"prior_auth_{n:03d}", pages)
+            index_document_pages_to_weaviate(
+                document_id=doc.id, filename=doc.filename, content_type=doc.content_type, pages=pages
+            )
+            doc_ids.append(doc.id)
+
+        results.append(
+            run_benchmark(
+                "extract_structured_json",
+                lambda i: extract_structured_json(document_id=doc_ids[i % len(doc_ids)], query=EXTRACT_QUERY, db=db),
+                iterations=iterations,
+                counters=counters,
+            )
+        )
+
+        results.append(
+            run_benchmark(
+                "agentic_qa_answer",
+                lambda i: AgenticQAService(llm=llm, db=db).answer(
+                    AgenticQARequest(document_id=doc_ids[i % len(doc_ids)], question=QA_QUESTION)
+                ),
+                iterations=iterations,
+                counters=counters,
+            )
+        )
+
+        # Cross-document search: one filtered ANN query vs one query per document.
+        corpus_query = CorpusSearchRequest(query="denied rationale", decision="denied", page_size=5)
+        corpus = run_benchmark(
+            "search_corpus",
+            lambda i: search_corpus(corpus_query, db=db),
+            iterations=iterations,
+            counters=counters,
+        )
+        per_document = run_benchmark(
+            "search_corpus_per_document_baseline",
+            lambda i: [
+                retrieve_document_chunks(document_id=doc_id, query=corpus_query.query, top_k=3) for doc_id in doc_ids
+            ],
+            iterations=iterations,
+            counters=counters,
+            alloc_iterations=0,
+        )
+        corpus.extra["corpus_over_per_document_p50"] = (
+            corpus.p50_ms / per_document.p50_ms if per_document.p50_ms else 0.0
+        )
+        results.extend([corpus, per_document])
+
+        # Plan steps under a simulated provider round-trip: serial (one step at a time) vs concurrent,
+        # with every facet as an ANN query; then facets served by the field-label filter.
+        embeddings.latency_s = PROVIDER_LATENCY_S
+        default_parallel = plan_executor.MAX_PARALLEL_STEPS
+        default_facets = retriever.FACET_RETRIEVAL
+        try:
+            retriever.FACET_RETRIEVAL = "ann"
+            plan_executor.MAX_PARALLEL_STEPS = 1
+            serial = run_benchmark(
+                "agentic_qa_answer_latency_serial",
+                lambda i: AgenticQAService(llm=llm, db=db).answer(
+                    AgenticQARequest(document_id=doc_ids[i % len(doc_ids)], question=BROAD_QA_QUESTION)
+                ),
+                iterations=iterations,
+                counters=counters,
+                alloc_iterations=0,
+            )
+            plan_executor.MAX_PARALLEL_STEPS = max(default_parallel, 4)
+            parallel = run_benchmark(
+                "agentic_qa_answer_latency_parallel",
+                lambda i: AgenticQAService(llm=llm, db=db).answer(
+                    AgenticQARequest(document_id=doc_ids[i % len(doc_ids)], question=BROAD_QA_QUESTION)
+                ),
+                iterations=iterations,
+                counters=counters,
+                alloc_iterations=0,
+            )
+            retriever.FACET_RETRIEVAL = "filter"
+            plan_executor.MAX_PARALLEL_STEPS = 1
+            facet_filter = run_benchmark(
+                "agentic_qa_answer_latency_facet_filter",
+                lambda i: AgenticQAService(llm=llm, db=db).answer(
+                    AgenticQARequest(document_id=doc_ids[i % len(doc_ids)], question=BROAD_QA_QUESTION)
+                ),
+                iterations=iterations,
+                counters=counters,
+                alloc_iterations=0,
+            )
+        finally:
+            retriever.FACET_RETRIEVAL = default_facets
+            plan_executor.MAX_PARALLEL_STEPS = default_parallel
+            embeddings.latency_s = 0.0
+        parallel.extra["parallel_over_serial_p50"] = parallel.p50_ms / serial.p50_ms if serial.p50_ms else 0.0
+        facet_filter.extra["facet_filter_over_ann_serial_p50"] = (
+            facet_filter.p50_ms / serial.p50_ms if serial.p50_ms else 0.0
+        )
+        results.extend([serial, parallel, facet_filter])
+
+        db.close()
+
+    return results
@@ -0,0 +1,80 @@
+"""
+Response size by verbosity: /rag/answer end to end (service + the router's single JSON serialization)
+at minimal / standard / debug, with the serialization time and payload size of each.
+
+The document is long (many clinical-notes chunks) and the question broad, so retrieval returns
+plenty of chunks and the verifier scores a rationale.
+"""
+
+from __future__ import annotations
+
+import statistics
+import time
+from types import SimpleNamespace
+
+from app.schemas.agentic_qa import AgenticQARequest, AgenticQAResponse
+from app.services.agentic_qa import AgenticQAService
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.fakes import benchmark_sessionmaker, offline_providers, seed_document
+from benchmarks.harness import BenchResult, run_benchmark
+
+DOC_ID = "bench-response"
+QUESTION = "What are the patient id, the service date, the decision and the rationale?"
+VERBOSITIES = ("minimal", "standard", "debug")
+
+
+def _pages(n: int = 8) -> list[SimpleNamespace]:
+    def notes(page: int, visit: int) -> str:
+        return (
+            f"Visit {page}.{visit} clinical notes: the patient reports joint pain and morning stiffness "
+            f"lasting {visit + 1} hours. Prior therapies include methotrexate {10 + visit} mg weekly with "
+            f"inadequate response. Labs: CRP elevated, ESR {30 + page + visit} mm/h. Plan: biologic therapy.\n"
+        )
+
+    first = (
+        "Patient ID: PATIENT-0042\nMember Group: GRP-7\nService Date: 2024-03-01\n"
+        "Decision: Approved\nRationale: Inadequate response to methotrexate; adalimumab requested.\n"
+    )
+    return [
+        SimpleNamespace(page_number=i, text=(first if i == 1 else "") + "".join(notes(i, v) for v in range(12)))
+        for i in range(1, n + 1)
+    ]
+
+
+def _serialize(resp: AgenticQAResponse, verbosity: str) -> str:
+    # Same call as the /rag/answer route.
+    return resp.model_dump_json(exclude_defaults=verbosity == "minimal")
+
+
+def run(iterations: int = 20) -> list[BenchResult]:
+    results: list[BenchResult] = []
+    pages = _pages()
+
+    with offline_providers() as (_, llm):
+        db = benchmark_sessionmaker()()
+        seed_document(db, DOC_ID, pages)
+        index_document_pages_to_weaviate(DOC_ID, "bench.pdf", "application/pdf", pages)
+
+        for verbosity in VERBOSITIES:
+            req = AgenticQARequest(document_id=DOC_ID, question=QUESTION, top_k=12, verbosity=verbosity)
+
+            def request(_: int, req: AgenticQARequest = req) -> str:
+                return _serialize(AgenticQAService(llm=llm, db=db).answer(req), req.verbosity)
+
+            result = run_benchmark(f"agentic_qa_response_{verbosity}", request, iterations=iterations)
+
+            resp = AgenticQAService(llm=llm, db=db).answer(req)
+            serialize_ms = []
+            for _ in range(max(iterations, 5)):
+                start = time.perf_counter()
+                payload = _serialize(resp, verbosity)
+                serialize_ms.append((time.perf_counter() - start) * 1000.0)
+            result.extra["serialize_ms_p50"] = statistics.median(serialize_ms)
+            result.extra["payload_kib"] = len(payload.encode("utf-8")) / 1024.0
+            results.append(result)
+
+        db.close()
+
+    standard = results[1].extra["payload_kib"]
+    results[0].extra["payload_over_standard"] = results[0].extra["payload_kib"] / standard if standard else 0.0
+    return results
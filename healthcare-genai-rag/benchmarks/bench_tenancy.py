@@ -0,0 +1,85 @@
+"""
+Document-scoped search latency as the DocumentChunk collection grows: one global collection
+filtered by document_id vs VECTOR_TENANCY=document_bucket (tenant per document-hash bucket), on the
+memory vector store with random vectors (no OpenAI).
+
+Each size reports p50/p95 of a filtered near_vector for one document; the largest size also
+reports tenant_over_global_p50, and every tenant result its growth over the smallest size
+(p50_over_smallest): a bucket grows with corpus / VECTOR_TENANT_BUCKETS, not with the corpus.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.services import document_chunks as chunks_module
+from app.services import memory_vector_store
+from app.services.document_chunks import activate_document_tenant, document_chunks
+from benchmarks.harness import BenchResult, run_benchmark
+
+DOCUMENT_COUNTS = [100, 400, 1600]
+CHUNKS_PER_DOCUMENT = 20
+DIMENSIONS = 128
+BUCKETS = 64
+TOP_K = 8
+
+
+def _grow(client, rng: np.random.Generator, start: int, stop: int) -> None:
+    for n in range(start, stop):
+        document_id = f"bench-doc-{n:05d}"
+        activate_document_tenant(client, document_id)
+        collection = document_chunks(client, document_id)
+        vectors = rng.standard_normal((CHUNKS_PER_DOCUMENT, DIMENSIONS)).astype(np.float32)
+        for i, vector in enumerate(vectors, start=1):
+            collection.batch.add_object(properties={"document_id": document_id, "chunk_index": i}, vector=vector)
+
+
+def run(iterations: int = 20) -> list[BenchResult]:
+    from weaviate.classes.query import Filter
+
+    results: list[BenchResult] = []
+    defaults = (chunks_module.TENANCY, chunks_module.TENANT_BUCKETS)
+    queries = np.random.default_rng(1).standard_normal((64, DIMENSIONS)).astype(np.float32)
+    try:
+        for mode in ("none", "document_bucket"):
+            chunks_module.TENANCY, chunks_module.TENANT_BUCKETS = mode, BUCKETS
+            memory_vector_store.reset_memory_store()
+            client = memory_vector_store.MemoryVectorStoreClient()
+            rng = np.random.default_rng(0)
+            label = "global" if mode == "none" else "tenant"
+            indexed = 0
+            smallest: BenchResult | None = None
+
+            for n_docs in DOCUMENT_COUNTS:
+                _grow(client, rng, indexed, n_docs)
+                indexed = n_docs
+
+                def search(i: int, n_docs: int = n_docs) -> int:
+                    document_id = f"bench-doc-{(i * 7919) % n_docs:05d}"
+                    res = document_chunks(client, document_id).query.near_vector(
+                        near_vector=queries[i % len(queries)],
+                        limit=TOP_K,
+                        filters=Filter.by_property("document_id").equal(document_id),
+                        return_properties=["chunk_index"],
+                    )
+                    return len(res.objects)
+
+                result = run_benchmark(
+                    f"filtered_search_{label}_{n_docs * CHUNKS_PER_DOCUMENT}_chunks",
+                    search,
+                    iterations=iterations,
+                    alloc_iterations=0,
+                )
+                smallest = smallest or result
+                if mode != "none":
+                    result.extra["p50_over_smallest"] = result.p50_ms / smallest.p50_ms if smallest.p50_ms else 0.0
+                results.append(result)
+
+        global_largest, tenant_largest = results[len(DOCUMENT_COUNTS) - 1], results[-1]
+        tenant_largest.extra["tenant_over_global_p50"] = (
+            tenant_largest.p50_ms / global_largest.p50_ms if global_largest.p50_ms else 0.0
+        )
+    finally:
+        chunks_module.TENANCY, chunks_module.TENANT_BUCKETS = defaults
+        memory_vector_store.reset_memory_store()
+    return results
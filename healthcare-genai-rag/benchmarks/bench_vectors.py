@@ -0,0 +1,100 @@
+"""
+Recall / latency / index size of compressed and shortened chunk vectors, on a synthetic corpus
+searched through the memory vector store (no OpenAI): pick VECTOR_COMPRESSION /
+MEMORY_VECTOR_QUANTIZATION and OPENAI_EMBEDDINGS_DIMENSIONS from these numbers.
+
+The corpus has clustered vectors whose per-dimension variance decays with the dimension index,
+as with Matryoshka-trained embeddings (text-embedding-3-*), so truncating to the first dimensions
+keeps most of the signal. Queries are perturbed corpus vectors; the ground truth is the exact float
+top-k over full-size vectors. Each result reports recall_loss_at_10 (1 - recall@10),
+index_kib (vectors a search scans) and index_over_float.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.services import memory_vector_store
+from benchmarks.harness import BenchResult, run_benchmark
+
+N_CHUNKS = 20_000
+DIMENSIONS = 512
+N_CLUSTERS = 200
+N_QUERIES = 100
+TOP_K = 10
+
+# (benchmark name, dimensions kept, memory-store quantization, rescore factor)
+CONFIGS = [
+    ("vector_search_float", DIMENSIONS, "none", 1),
+    ("vector_search_int8_rescored", DIMENSIONS, "int8", 4),
+    ("vector_search_binary_rescored", DIMENSIONS, "binary", 4),
+    ("vector_search_binary_rescored_x16", DIMENSIONS, "binary", 16),
+    ("vector_search_float_dims_256", 256, "none", 1),
+    ("vector_search_int8_dims_256_rescored", 256, "int8", 4),
+]
+
+
+def _corpus(seed: int = 7) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    spectrum = (1.0 / np.sqrt(1.0 + np.arange(DIMENSIONS) / 32.0)).astype(np.float32)
+    centers = rng.standard_normal((N_CLUSTERS, DIMENSIONS)).astype(np.float32)
+    labels = rng.integers(0, N_CLUSTERS, N_CHUNKS)
+    vectors = (centers[labels] + 0.8 * rng.standard_normal((N_CHUNKS, DIMENSIONS)).astype(np.float32)) * spectrum
+    picks = rng.choice(N_CHUNKS, N_QUERIES, replace=False)
+    queries = vectors[picks] + 0.5 * rng.standard_normal((N_QUERIES, DIMENSIONS)).astype(np.float32) * spectrum
+    return vectors, queries
+
+
+def _top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> set[int]:
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    return set(np.argpartition(-scores, k - 1)[:k].tolist())
+
+
+def _shorten(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    # What the embeddings API returns for `dimensions`: the leading dimensions, re-normalized.
+    head = vectors[:, :dimensions]
+    return head / np.linalg.norm(head, axis=1, keepdims=True)
+
+
+def run(iterations: int = 20) -> list[BenchResult]:
+    vectors, queries = _corpus()
+    truth = [_top_k(vectors, q, TOP_K) for q in queries]
+
+    results: list[BenchResult] = []
+    default_quantization = memory_vector_store.QUANTIZATION
+    default_rescore = memory_vector_store.RESCORE_FACTOR
+    float_kib = 0.0
+    try:
+        for name, dimensions, quantization, rescore_factor in CONFIGS:
+            memory_vector_store.reset_memory_store()
+            memory_vector_store.QUANTIZATION = quantization
+            memory_vector_store.RESCORE_FACTOR = rescore_factor
+            collection = memory_vector_store.MemoryVectorStoreClient().collections.get(name)
+            stored = _shorten(vectors, dimensions)
+            for i, vector in enumerate(stored):
+                collection.batch.add_object(properties={"chunk": i}, vector=vector)
+            probes = _shorten(queries, dimensions)
+
+            def search(i: int) -> list[int]:
+                res = collection.query.near_vector(
+                    near_vector=probes[i % N_QUERIES], limit=TOP_K, return_properties=["chunk"]
+                )
+                return [int(o.properties["chunk"]) for o in res.objects]
+
+            # Builds the codes outside the timed loop (they are built once per write batch).
+            index_kib = memory_vector_store.vector_index_nbytes(name) / 1024.0
+            hits = sum(len(truth[i] & set(search(i))) for i in range(N_QUERIES))
+
+            result = run_benchmark(name, search, iterations=iterations, alloc_iterations=0)
+            if quantization == "none" and dimensions == DIMENSIONS:
+                float_kib = index_kib
+            result.extra["recall_loss_at_10"] = 1.0 - hits / (N_QUERIES * TOP_K)
+            result.extra["index_kib"] = index_kib
+            result.extra["index_over_float"] = index_kib / float_kib if float_kib else 1.0
+            results.append(result)
+    finally:
+        memory_vector_store.QUANTIZATION = default_quantization
+        memory_vector_store.RESCORE_FACTOR = default_rescore
+        memory_vector_store.reset_memory_store()
+    return results
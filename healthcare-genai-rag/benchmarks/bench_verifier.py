@@ -0,0 +1,110 @@
+"""
+Micro-benchmark of the groundedness verifier on a retry-sized workload: 30 retrieved chunks,
+3 cited, verified once per attempt (3 attempts per request, as with retries=2).
+
+The baseline is the original rationale check (join cited texts, lowercase, char-by-char tokenizer
+on every attempt, a single shared keyword is enough), kept here only for comparison; the indexed
+verifier also scores sentence-level support for every claim. verify_rationale_lookup_x50 runs the
+baseline's check on the evidence index alone (cached token sets, citation lookups), so the index
+speedup stays guarded separately from the cost of claim scoring.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from app.schemas.agentic_qa import Citation
+from app.services.agentic_qa import _verify_groundedness
+from app.services.claim_support import WEAK_STOP
+from app.services.evidence_index import ChunkKey, EvidenceIndex, IndexedChunk, sentence_offsets, tokenize
+from benchmarks.harness import BenchResult, run_benchmark
+
+ATTEMPTS = 3
+REQUESTS_PER_ITERATION = 50
+
+ANSWER = "Approved because the patient had an inadequate response to methotrexate and adalimumab."
+QUESTION = "What was the decision and the rationale?"
+
+
+def _chunks(n: int = 30) -> list[dict[str, Any]]:
+    filler = (
+        "Clinical notes: the patient reports joint pain and morning stiffness lasting over an hour. "
+        "Prior therapies include methotrexate 15 mg weekly for six months with inadequate response. "
+        "Labs: CRP elevated, ESR 42 mm/h. Plan: start biologic therapy pending authorization. "
+    )
+    out = []
+    for i in range(n):
+        text = filler * 3
+        if i == 7:
+            text = "Decision: Approved\nRationale: Inadequate response to methotrexate; adalimumab requested.\n" + text
+        out.append(
+            {
+                "document_id": "bench",
+                "page_number": 1 + i // 4,
+                "chunk_index": 1 + i % 4,
+                "text": text,
+                "similarity": 0.5,
+                # Stored at index time (vector_store).
+                "sentence_offsets": sentence_offsets(text),
+            }
+        )
+    return out
+
+
+def _baseline_tokenize(s: str) -> set[str]:
+    cleaned = "".join(ch.lower() if ch.isalnum() else " " for ch in (s or ""))
+    return {t for t in cleaned.split() if len(t) >= 3}
+
+
+def _baseline_rationale_supported(answer: str, citations: list[Citation], chunks: list[dict[str, Any]]) -> bool:
+    retrieved_map = {(int(c["page_number"]), int(c["chunk_index"])): c for c in chunks}
+    cited_blob = "\n".join(
+        retrieved_map[(c.page_number, c.chunk_index)]["text"]
+        for c in citations
+        if (c.page_number, c.chunk_index) in retrieved_map
+    ).lower()
+    answer_tokens = _baseline_tokenize(answer) - WEAK_STOP
+    return bool(answer_tokens & _baseline_tokenize(cited_blob))
+
+
+def run(iterations: int = 20) -> list[BenchResult]:
+    chunks = _chunks()
+    citations = [
+        Citation(document_id="bench", page_number=c["page_number"], chunk_index=c["chunk_index"])
+        for c in (chunks[7], chunks[8], chunks[20])
+    ]
+
+    def baseline(_: int) -> None:
+        for _ in range(REQUESTS_PER_ITERATION):
+            for _ in range(ATTEMPTS):
+                _baseline_rationale_supported(ANSWER, citations, chunks)
+
+    def indexed(_: int) -> None:
+        for _ in range(REQUESTS_PER_ITERATION):
+            cache: dict[ChunkKey, IndexedChunk] = {}
+            for _ in range(ATTEMPTS):
+                _verify_groundedness(
+                    answer=ANSWER,
+                    question=QUESTION,
+                    citations=citations,
+                    retrieved_chunks=chunks,
+                    allow_insufficient=True,
+                    evidence=EvidenceIndex(chunks, cache=cache),
+                )
+
+    def lookup(_: int) -> None:
+        for _ in range(REQUESTS_PER_ITERATION):
+            cache: dict[ChunkKey, IndexedChunk] = {}
+            for _ in range(ATTEMPTS):
+                evidence = EvidenceIndex(chunks, cache=cache)
+                answer_tokens = tokenize(ANSWER) - WEAK_STOP
+                cited = [evidence.get(c.page_number, c.chunk_index) for c in citations]
+                any(answer_tokens & hit.tokens for hit in cited if hit is not None)
+
+    base = run_benchmark("verify_groundedness_baseline_x50", baseline, iterations=iterations, alloc_iterations=0)
+    results = [base]
+    for name, fn in (("verify_rationale_lookup_x50", lookup), ("verify_groundedness_indexed_x50", indexed)):
+        result = run_benchmark(name, fn, iterations=iterations, alloc_iterations=1)
+        result.extra["indexed_over_baseline_p50"] = result.p50_ms / base.p50_ms if base.p50_ms else 0.0
+        results.append(result)
+    return results
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import importlib.util
+import shutil
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SAMPLES_DIR = PROJECT_ROOT / "data" / "samples"
+
+_DECISIONS = [
+    ("Approved", "Patient meets criteria after failure of Therapy A."),
+    ("Denied", "Documentation of inadequate response to standard therapy is missing."),
+    ("Pending", "Awaiting baseline labs from the prescribing provider."),
+]
+
+
+def _load_generator():
+    spec = importlib.util.spec_from_file_location("generate_sample_pdf", SAMPLES_DIR / "generate_sample_pdf.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.generate_prior_auth_pdf
+
+
+def build_corpus(out_dir: Path, n_docs: int = 6) -> list[Path]:
+    """
+    Synthetic prior-auth PDFs from data/samples/generate_sample_pdf.py:
+    varied patient IDs, groups, decisions and 0-3 extra clinical-notes pages.
+    Falls back to copies of the committed sample PDF when reportlab is not installed.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = [out_dir / f"prior_auth_{i:03d}.pdf" for i in range(n_docs)]
+
+    try:
+        generate = _load_generator()
+    except ImportError:
+        for path in paths:
+            shutil.copyfile(SAMPLES_DIR / "sample_prior_authorization.pdf", path)
+        return paths
+
+    for i, path in enumerate(paths):
+        decision, rationale = _DECISIONS[i % len(_DECISIONS)]
+        generate(
+            path,
+            patient_id=f"PATIENT-{1000 + i:04d}",
+            member_group=f"GRP-{100 + i % 4}",
+            decision=decision,
+            rationale=rationale,
+            extra_pages=i % 4,
+        )
+    return paths
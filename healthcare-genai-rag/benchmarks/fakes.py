@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import lru_cache
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models import Base, Document, DocumentPage
+from app.services.index_state import record_document_fields
+from app.services.memory_vector_store import reset_memory_store
+from app.services.rag_rules import extract_structured_from_context
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_CITATION_RE = re.compile(r"\[page=(\d+) chunk=(\d+)\]([^\n]*)")
+_DECISION_RE = re.compile(r"\bdecision\b\s*[:\-]\s*(approved|denied|pending)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=65536)
+def _token_slot(token: str, dim: int) -> tuple[int, float]:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest[:4], "big") % dim, (1.0 if digest[4] & 1 else -1.0)
+
+
+class HashEmbeddings:
+    """
+    Deterministic feature-hashing embeddings: same text -> same vector, shared tokens -> nearby vectors.
+    `latency_s` simulates the provider round-trip per call.
+    """
+
+    def __init__(self, dim: int = 256, latency_s: float = 0.0) -> None:
+        self.dim = dim
+        self.latency_s = latency_s
+        self.calls: Counter[str] = Counter()
+        # Plan steps embed their queries from worker threads.
+        self._calls_lock = threading.Lock()
+
+    def _embed(self, text: str) -> list[float]:
+        vec = [0.0] * self.dim
+        for token in _TOKEN_RE.findall((text or "").lower()):
+            idx, sign = _token_slot(token, self.dim)
+            vec[idx] += sign
+        norm = sum(v * v for v in vec) ** 0.5 or 1.0
+        return [v / norm for v in vec]
+
+    def embed_query(self, text: str) -> list[float]:
+        with self._calls_lock:
+            self.calls["embed_query"] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return self._embed(text)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        with self._calls_lock:
+            self.calls["embed_documents"] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return [self._embed(t) for t in texts]
+
+
+class ScriptedChatModel:
+    """
+    ChatOpenAI stand-in. Returns queued `script` responses first, then deterministic answers
+    derived from the prompt's context (QA prompts cite the chunk holding the decision line;
+    extraction prompts get the rule-based extraction as JSON).
+    """
+
+    def __init__(self, script: list[str] | None = None, latency_s: float = 0.0) -> None:
+        self.script: deque[str] = deque(script or [])
+        self.latency_s = latency_s
+        self.calls: Counter[str] = Counter()
+
+    def _respond(self, prompt: str) -> str:
+        if self.script:
+            return self.script.popleft()
+
+        context = prompt.split("Context", 1)[-1]
+        if '"answer"' in prompt:
+            cited = _CITATION_RE.findall(context)
+            for page, chunk, text in cited:
+                m = _DECISION_RE.search(text)
+                if m:
+                    return (
+                        f'{{"answer": "{m.group(1).capitalize()}", '
+                        f'"citations": [{{"page_number": {page}, "chunk_index": {chunk}}}]}}'
+                    )
+            return '{"answer": "Insufficient evidence.", "citations": []}'
+
+        return extract_structured_from_context(context).model_dump_json()
+
+    def _message(self, prompt: str, content: str, response_format: type[BaseModel] | None = None) -> SimpleNamespace:
+        # Structured output (response_format=<pydantic model>): the parsed object rides in additional_kwargs,
+        # None when the content does not validate (e.g. a scripted malformed answer).
+        parsed = None
+        if response_format is not None:
+            try:
+                parsed = response_format.model_validate_json(content)
+            except ValueError:
+                parsed = None
+        return SimpleNamespace(
+            content=content,
+            additional_kwargs={"parsed": parsed} if response_format is not None else {},
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4,
+            },
+        )
+
+    def invoke(
+        self, prompt: str, response_format: type[BaseModel] | None = None, **_: object
+    ) -> SimpleNamespace:
+        self.calls["llm_invoke"] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return self._message(prompt, self._respond(prompt), response_format)
+
+    def stream(self, prompt: str, **_: object) -> Iterator[SimpleNamespace]:
+        self.calls["llm_stream"] += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        content = self._respond(prompt)
+        for i in range(0, len(content), 16):
+            yield SimpleNamespace(content=content[i : i + 16])
+
+
+def benchmark_sessionmaker() -> sessionmaker:
+    """
+    In-memory SQLite with the app's schema (shared across threads).
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def seed_document(db, document_id: str, pages: list, *, status: str = "indexed") -> Document:
+    """
+    Document + DocumentPage rows for `pages` (objects with page_number and text): retrieval
+    slices chunk text from these rows; cross-document search reads the recorded document fields.
+    """
+    doc = Document(id=document_id, filename=f"{document_id}.pdf", content_type="application/pdf", status=status)
+    record_document_fields(doc, pages)
+    db.add(doc)
+    db.add_all(DocumentPage(document_id=document_id, page_number=p.page_number, text=p.text) for p in pages)
+    db.commit()
+    return doc
+
+
+@contextmanager
+def offline_providers(
+    embeddings: HashEmbeddings | None = None,
+    llm: ScriptedChatModel | None = None,
+) -> Iterator[tuple[HashEmbeddings, ScriptedChatModel]]:
+    """
+    Routes every provider call in the app to the fakes:
+    embeddings + LLM are patched into the modules that use them,
+    the vector store is the in-process backend (VECTOR_STORE_BACKEND=memory).
+    """
+    import app.services.agentic_qa as agentic_qa
+    import app.services.rag_pipeline as rag_pipeline
+    import app.services.retriever as retriever
+    import app.services.corpus_search as corpus_search
+    import app.services.vector_store as vector_store
+
+    embeddings = embeddings or HashEmbeddings()
+    llm = llm or ScriptedChatModel()
+
+    patches = [
+        (retriever, "get_embeddings", lambda **_: embeddings),
+        (vector_store, "get_embeddings", lambda **_: embeddings),
+        (corpus_search, "get_embeddings", lambda **_: embeddings),
+        (rag_pipeline, "_get_llm", lambda: llm),
+        (agentic_qa, "_get_llm", lambda: llm),
+    ]
+    originals = [(module, name, getattr(module, name)) for module, name, _ in patches]
+    previous_backend = os.environ.get("VECTOR_STORE_BACKEND")
+
+    os.environ["VECTOR_STORE_BACKEND"] = "memory"
+    reset_memory_store()
+    for module, name, value in patches:
+        setattr(module, name, value)
+    try:
+        yield embeddings, llm
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+        if previous_backend is None:
+            os.environ.pop("VECTOR_STORE_BACKEND", None)
+        else:
+            os.environ["VECTOR_STORE_BACKEND"] = previous_backend
+        reset_memory_store()
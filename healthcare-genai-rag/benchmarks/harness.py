@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import gc
+import math
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+
+@dataclass
+class BenchResult:
+    name: str
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+    calls_per_request: dict[str, float] = field(default_factory=dict)
+    peak_alloc_kib: float = 0.0
+    extra: dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "iterations": self.iterations,
+            "p50_ms": round(self.p50_ms, 3),
+            "p95_ms": round(self.p95_ms, 3),
+            "mean_ms": round(self.mean_ms, 3),
+            "calls_per_request": {k: round(v, 3) for k, v in sorted(self.calls_per_request.items())},
+            "peak_alloc_kib": round(self.peak_alloc_kib, 1),
+            **({"extra": {k: round(v, 3) for k, v in self.extra.items()}} if self.extra else {}),
+        }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile (pct in 0..100).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100.0 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def run_benchmark(
+    name: str,
+    fn: Callable[[int], object],
+    *,
+    iterations: int,
+    warmup: int = 1,
+    counters: Callable[[], dict[str, int]] | None = None,
+    alloc_iterations: int = 3,
+) -> BenchResult:
+    """
+    Times `fn(i)` for `iterations` runs (after `warmup`), reports p50/p95/mean latency,
+    provider calls per request (diff of `counters()` snapshots) and peak traced allocations
+    per request (separate, shorter pass: tracemalloc slows the code under test).
+    """
+    for i in range(warmup):
+        fn(i)
+
+    before = dict(counters()) if counters else {}
+    timings_ms: list[float] = []
+    gc.collect()
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        timings_ms.append((time.perf_counter() - start) * 1000.0)
+    after = dict(counters()) if counters else {}
+
+    calls = {
+        key: (after.get(key, 0) - before.get(key, 0)) / iterations
+        for key in set(before) | set(after)
+        if after.get(key, 0) - before.get(key, 0)
+    }
+
+    peak_kib = 0.0
+    if alloc_iterations > 0:
+        tracemalloc.start()
+        try:
+            for i in range(alloc_iterations):
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+                fn(i)
+                _, peak = tracemalloc.get_traced_memory()
+                peak_kib = max(peak_kib, (peak - base) / 1024.0)
+        finally:
+            tracemalloc.stop()
+
+    return BenchResult(
+        name=name,
+        iterations=iterations,
+        p50_ms=percentile(timings_ms, 50),
+        p95_ms=percentile(timings_ms, 95),
+        mean_ms=sum(timings_ms) / len(timings_ms),
+        calls_per_request=calls,
+        peak_alloc_kib=peak_kib,
+    )
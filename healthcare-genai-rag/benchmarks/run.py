@@ -0,0 +1,94 @@
+"""
+Offline benchmark suite (no OpenAI, no Weaviate):
+
+    cd healthcare-genai-rag
+    python -m benchmarks.run                      # all suites, checked against thresholds.json
+    python -m benchmarks.run --only pipeline -n 50
+    python -m benchmarks.run --json bench.json    # machine-readable results
+
+Exits with status 1 when a result exceeds its threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks import bench_pipeline, bench_response, bench_tenancy, bench_vectors, bench_verifier
+from benchmarks.harness import BenchResult
+
+SUITES = {
+    "pipeline": bench_pipeline.run,
+    "verifier": bench_verifier.run,
+    "response": bench_response.run,
+    "vectors": bench_vectors.run,
+    "tenancy": bench_tenancy.run,
+}
+
+THRESHOLDS_PATH = Path(__file__).with_name("thresholds.json")
+
+
+def check_thresholds(result: BenchResult, thresholds: dict) -> list[str]:
+    limits = thresholds.get(result.name)
+    if not limits:
+        return []
+
+    failures: list[str] = []
+    for metric in ("p50_ms", "p95_ms", "peak_alloc_kib"):
+        limit = limits.get(metric)
+        value = getattr(result, metric)
+        if limit is not None and value > limit:
+            failures.append(f"{result.name}: {metric}={value:.2f} > {limit}")
+
+    for call, limit in (limits.get("calls_per_request") or {}).items():
+        value = result.calls_per_request.get(call, 0.0)
+        if value > limit:
+            failures.append(f"{result.name}: calls_per_request[{call}]={value:.2f} > {limit}")
+
+    for metric, limit in (limits.get("extra") or {}).items():
+        value = result.extra.get(metric)
+        if value is not None and value > limit:
+            failures.append(f"{result.name}: {metric}={value:.3f} > {limit}")
+    return failures
+
+
+def _print_table(results: list[BenchResult]) -> None:
+    print(f"{'benchmark':<40} {'p50 ms':>9} {'p95 ms':>9} {'peak KiB':>9}  calls/request")
+    for r in results:
+        calls = ", ".join(f"{k}={v:g}" for k, v in sorted(r.calls_per_request.items()))
+        print(f"{r.name:<40} {r.p50_ms:>9.2f} {r.p95_ms:>9.2f} {r.peak_alloc_kib:>9.1f}  {calls}")
+        for k, v in r.extra.items():
+            print(f"{'':<40} {k} = {v:.3f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="MediRAG offline benchmarks")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--only", choices=sorted(SUITES), action="append")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--no-thresholds", action="store_true", help="report only, never fail")
+    args = parser.parse_args(argv)
+
+    results: list[BenchResult] = []
+    for name in args.only or list(SUITES):
+        results.extend(SUITES[name](iterations=args.iterations))
+
+    _print_table(results)
+
+    if args.json:
+        args.json.write_text(json.dumps([r.as_dict() for r in results], indent=2))
+
+    if args.no_thresholds:
+        return 0
+
+    thresholds = json.loads(THRESHOLDS_PATH.read_text())
+    failures = [msg for r in results for msg in check_thresholds(r, thresholds)]
+    for msg in failures:
+        print(f"REGRESSION {msg}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
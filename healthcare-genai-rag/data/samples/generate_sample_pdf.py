@@ -7,7 +7,19 @@ from reportlab.lib.pagesizes import LETTER
 from reportlab.pdfgen import canvas
 
 
-def generate_prior_auth_pdf(output_path: Path) -> None:
+def generate_prior_auth_pdf(
+    output_path: Path,
+    *,
+    patient_id: str = "PATIENT-0001",
+    member_group: str = "GRP-100",
+    decision: str | None = None,
+    rationale: str = "",
+    extra_pages: int = 0,
+) -> None:
+    """
+    Defaults reproduce sample_prior_authorization.pdf. The keyword arguments let
+    benchmarks build a synthetic corpus (varied IDs/decisions, longer documents).
+    """
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     c = canvas.Canvas(str(output_path), pagesize=LETTER)
@@ -32,9 +44,9 @@ def generate_prior_auth_pdf(output_path: Path) -> None:
     c.setFont("Helvetica-Bold", 11)
     write_line("Patient & Plan (DE-IDENTIFIED)")
     c.setFont("Helvetica", 10)
-    write_line("Patient ID: PATIENT-0001")
+    write_line(f"Patient ID: {patient_id}")
     write_line("Plan: Sample Health Plan PPO")
-    write_line("Member Group: GRP-100")
+    write_line(f"Member Group: {member_group}")
     write_line("")
 
     c.setFont("Helvetica-Bold", 11)
@@ -76,6 +88,15 @@ def generate_prior_auth_pdf(output_path: Path) -> None:
     write_line("- Specialty pharmacy only")
     write_line("")
 
+    if decision:
+        c.setFont("Helvetica-Bold", 11)
+        write_line("Determination")
+        c.setFont("Helvetica", 10)
+        write_line(f"Decision: {decision}")
+        if rationale:
+            write_line(f"Rationale: {rationale}")
+        write_line("")
+
     c.showPage()
 
     # Page 2
@@ -98,6 +119,18 @@ def generate_prior_auth_pdf(output_path: Path) -> None:
     write_line("Signature Date: ____________________")
     write_line("")
 
+    for extra in range(1, extra_pages + 1):
+        c.showPage()
+        y = height - 72
+        c.setFont("Helvetica-Bold", 12)
+        write_line(f"CLINICAL NOTES (SAMPLE) - PART {extra}")
+        c.setFont("Helvetica", 10)
+        for n in range(1, 41):
+            write_line(
+                f"Note {extra}.{n}: Follow-up visit documented; adherence reviewed; "
+                f"symptoms stable on current regimen (visit {n})."
+            )
+
     c.save()
 
 
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import anyio.to_thread
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.routers.rag as rag_router
+from app.api.deps import get_db
+from app.main import create_app
+from app.services.admission import (
+    ADMISSION_THREAD_HEADROOM,
+    AdmissionController,
+    AdmissionRejected,
+    reserve_worker_threads,
+)
+
+
+def _controller(**overrides) -> AdmissionController:
+    params = dict(
+        max_concurrent=2,
+        max_concurrent_per_client=2,
+        max_queue=4,
+        max_queue_wait_s=0.2,
+        rate_per_s=0,
+        burst=1,
+    )
+    params.update(overrides)
+    return AdmissionController(**params)
+
+
+def test_token_bucket_rejects_with_retry_after() -> None:
+    controller = _controller(rate_per_s=1.0, burst=2)
+
+    controller.admit("a").release()
+    controller.admit("a").release()
+    with pytest.raises(AdmissionRejected) as exc:
+        controller.admit("a")
+
+    assert exc.value.reason == "rate_limited"
+    assert exc.value.retry_after_header == "1"
+    # Buckets are per client.
+    controller.admit("b").release()
+
+
+def test_per_client_limit_queues_then_times_out() -> None:
+    controller = _controller(max_concurrent_per_client=1)
+
+    held = controller.admit("a")
+    with pytest.raises(AdmissionRejected) as exc:
+        controller.admit("a")
+    assert exc.value.reason == "queue_timeout"
+
+    # Another client still gets a global slot.
+    controller.admit("b").release()
+
+    held.release()
+    controller.admit("a").release()
+    assert controller.in_flight == 0 and controller.queued == 0
+
+
+def test_queued_request_is_admitted_when_a_slot_frees() -> None:
+    controller = _controller(max_concurrent=1, max_queue_wait_s=2.0)
+    held = controller.admit("a")
+
+    admitted = threading.Event()
+
+    def waiter() -> None:
+        with controller.admit("b"):
+            admitted.set()
+
+    t = threading.Thread(target=waiter)
+    t.start()
+    time.sleep(0.05)
+    assert controller.queued == 1
+    held.release()
+    t.join(2)
+
+    assert admitted.is_set()
+    assert controller.in_flight == 0
+
+
+def test_rejects_up_front_when_estimated_wait_exceeds_deadline() -> None:
+    controller = _controller(max_concurrent=1, max_queue_wait_s=5.0)
+    controller.service_time_s = 3.0
+    held = controller.admit("a")
+
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected) as exc:
+        controller.admit("b", deadline=time.monotonic() + 1.0)
+
+    assert exc.value.reason == "deadline"
+    assert time.monotonic() - start < 0.1
+    held.release()
+
+
+def test_route_returns_429_with_retry_after(monkeypatch) -> None:
+    controller = _controller(rate_per_s=0.001, burst=1)
+    controller.admit("tenant-1")
+    monkeypatch.setattr(rag_router, "admission_controller", controller)
+
+    app = create_app()
+    app.dependency_overrides[get_db] = lambda: None
+    client = TestClient(app)
+    res = client.post(
+        "/rag/answer",
+        json={"document_id": "doc", "question": "What was the decision?"},
+        headers={"X-Client-Id": "tenant-1"},
+    )
+
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) >= 1
+
+
+def test_worker_threads_fit_queued_and_admitted_requests() -> None:
+    controller = _controller(max_concurrent=16, max_queue=32)
+
+    async def main() -> tuple[int, int]:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        reserve_worker_threads(controller)
+        return reserve_worker_threads(_controller()), int(limiter.total_tokens)
+
+    # The second, smaller controller never lowers the pool.
+    assert anyio.run(main) == (16 + 32 + ADMISSION_THREAD_HEADROOM,) * 2
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import app.services.agentic_qa as qa
+import app.services.retriever as retriever
+from app.schemas.agentic_qa import AgenticQARequest
+
+
+DOC_ID = "<DOC_ID>"
+
+_ANSWER = '{"answer": "Approved", "citations": [{"page_number": 1, "chunk_index": 1}]}'
+
+
+class _FakeStreamingLLM:
+    def __init__(self) -> None:
+        self.invoke_calls = 0
+        self.stream_calls = 0
+
+    def invoke(self, prompt: str, **kwargs):
+        self.invoke_calls += 1
+        return SimpleNamespace(content=_ANSWER)
+
+    def stream(self, prompt: str, **kwargs):
+        self.stream_calls += 1
+        for i in range(0, len(_ANSWER), 8):
+            yield SimpleNamespace(content=_ANSWER[i : i + 8])
+
+
+class _FakeSession:
+    def commit(self) -> None:
+        pass
+
+
+def _fake_retrieve(*, document_id: str, query: str, top_k: int):
+    return [
+        {
+            "document_id": document_id,
+            "page_number": 1,
+            "chunk_index": 1,
+            "text": "Decision: Approved\nRationale: Patient meets criteria.",
+            "similarity": 0.7,
+        }
+    ]
+
+
+def _service(monkeypatch, llm):
+    monkeypatch.setattr(retriever, "retrieve_document_chunks", _fake_retrieve)
+    monkeypatch.setattr(qa.AgenticQAService, "_auto_index_if_missing", lambda self, db, document_id: 0)
+    return qa.AgenticQAService(llm=llm, db=_FakeSession())
+
+
+def test_stream_emits_steps_tokens_then_result(monkeypatch) -> None:
+    llm = _FakeStreamingLLM()
+    service = _service(monkeypatch, llm)
+
+    events = list(service.stream(AgenticQARequest(document_id=DOC_ID, question="What was the decision?")))
+    kinds = [ev.event for ev in events]
+
+    assert kinds[0] == "step"
+    assert kinds[-1] == "result"
+    assert kinds.index("token") < kinds.index("result")
+    assert "".join(ev.data["text"] for ev in events if ev.event == "token") == _ANSWER
+
+    result = events[-1].data
+    assert result.answer == "Approved"
+    assert result.verification.ok is True
+    streamed_steps = [ev.data.name for ev in events if ev.event == "step"]
+    assert streamed_steps[: len(result.steps)] == [s.name for s in result.steps]
+    assert llm.stream_calls == 1
+    assert llm.invoke_calls == 0
+
+
+def test_answer_matches_stream_result_without_streaming(monkeypatch) -> None:
+    llm = _FakeStreamingLLM()
+    service = _service(monkeypatch, llm)
+
+    resp = service.answer(AgenticQARequest(document_id=DOC_ID, question="What was the decision?"))
+
+    assert resp.answer == "Approved"
+    assert resp.verification.ok is True
+    assert llm.invoke_calls == 1
+    assert llm.stream_calls == 0
+
+
+def test_closing_stream_early_stops_workflow(monkeypatch) -> None:
+    calls: list[str] = []
+
+    def _counting_retrieve(**kwargs):
+        calls.append(kwargs["query"])
+        return _fake_retrieve(**kwargs)
+
+    llm = _FakeStreamingLLM()
+    service = _service(monkeypatch, llm)
+    monkeypatch.setattr(retriever, "retrieve_document_chunks", _counting_retrieve)
+
+    events = service.stream(AgenticQARequest(document_id=DOC_ID, question="What was the decision?"))
+    first = next(events)
+    events.close()
+
+    assert first.event == "step"
+    assert calls == []
+    assert llm.stream_calls == 0
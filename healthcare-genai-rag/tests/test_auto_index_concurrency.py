@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.services.auto_index as auto_index
+import app.services.index_state as index_state
+import app.services.vector_store as vector_store
+from app.db.models import Base, Document, DocumentPage
+from app.services.rag_pipeline import is_document_indexed
+from benchmarks.fakes import HashEmbeddings, benchmark_sessionmaker, offline_providers, seed_document
+
+
+def test_concurrent_auto_index_runs_indexing_once(tmp_path, monkeypatch) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'auto_index.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    setup = SessionLocal()
+    doc = Document(filename="a.pdf", content_type="application/pdf", status="parsed")
+    setup.add(doc)
+    setup.commit()
+    setup.add(DocumentPage(document_id=doc.id, page_number=1, text="Decision: Approved"))
+    setup.commit()
+    document_id = doc.id
+    setup.close()
+
+    index_state._indexed_cache.clear()
+    index_calls: list[str] = []
+
+    def _slow_index(*, document_id: str, filename: str, content_type: str, pages) -> int:
+        index_calls.append(document_id)
+        time.sleep(0.2)
+        return 5
+
+    monkeypatch.setattr(auto_index, "index_document_pages_to_weaviate", _slow_index)
+    monkeypatch.setattr(index_state, "is_document_indexed", lambda document_id: False)
+
+    workers = 8
+    start = threading.Barrier(workers)
+
+    def _request() -> int:
+        db = SessionLocal()
+        try:
+            start.wait()
+            return auto_index.ensure_document_indexed(db, document_id)
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda _: _request(), range(workers)))
+
+    assert index_calls == [document_id]
+    assert sorted(results) == [0] * (workers - 1) + [5]
+    assert auto_index._local_locks == {}
+
+    check = SessionLocal()
+    assert check.get(Document, document_id).chunks_indexed == 5
+    check.close()
+    index_state._indexed_cache.clear()
+
+
+def test_reindex_replaces_chunks_left_by_a_failed_run(monkeypatch) -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    doc = Document(filename="a.pdf", content_type="application/pdf", status="index_error")
+    db.add(doc)
+    db.commit()
+
+    calls: list[str] = []
+    monkeypatch.setattr(auto_index, "delete_document_chunks", lambda document_id: calls.append("delete") or 2)
+    monkeypatch.setattr(
+        auto_index, "index_document_pages_to_weaviate", lambda **kwargs: calls.append("index") or 3
+    )
+
+    assert auto_index.reindex_document(db, doc, pages=[]) == 3
+    assert calls == ["delete", "index"]
+    db.close()
+    index_state._indexed_cache.clear()
+
+
+class _FailingEmbeddings(HashEmbeddings):
+    """
+    Fails the second embedding batch: the first batch's chunks are already written.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fail = True
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.fail and self.calls["embed_documents"] == 1:
+            raise ValueError("embedding batch rejected")
+        return super().embed_documents(texts)
+
+
+def test_a_run_failing_partway_leaves_no_chunks_to_adopt(monkeypatch) -> None:
+    monkeypatch.setattr(vector_store, "EMBED_BATCH_SIZE", 1)
+    db = benchmark_sessionmaker()()
+    pages = [SimpleNamespace(page_number=n, text=f"Rationale {n}: step therapy. " * 80) for n in (1, 2, 3)]
+    doc = seed_document(db, "doc-partial", pages, status="parsed")
+    index_state._indexed_cache.clear()
+    embeddings = _FailingEmbeddings()
+    with offline_providers(embeddings):
+        with pytest.raises(ValueError):
+            auto_index.ensure_document_indexed(db, doc.id)
+        assert doc.status == index_state.INDEX_ERROR_STATUS
+        assert not is_document_indexed(doc.id)
+
+        embeddings.fail = False
+        chunks = auto_index.ensure_document_indexed(db, doc.id)
+        assert chunks > 1 and doc.status == index_state.INDEXED_STATUS
+    db.close()
+    index_state._indexed_cache.clear()
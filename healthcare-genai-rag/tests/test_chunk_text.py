@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from app.services import memory_vector_store
+from app.services.chunk_text import hydrate_chunk_texts
+from app.services.retriever import retrieve_document_chunks
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.fakes import benchmark_sessionmaker, offline_providers, seed_document
+
+DOC_ID = "doc-chunk-text"
+PAGES = [
+    SimpleNamespace(page_number=1, text="Member ID: M-1\nDecision: Approved"),
+    SimpleNamespace(page_number=2, text="  Rationale: Inadequate response to methotrexate.  "),
+]
+
+
+def test_retrieval_returns_references_and_text_comes_from_page_rows() -> None:
+    db = benchmark_sessionmaker()()
+    seed_document(db, DOC_ID, PAGES)
+    with offline_providers():
+        index_document_pages_to_weaviate(DOC_ID, "a.pdf", "application/pdf", PAGES)
+        hits = retrieve_document_chunks(document_id=DOC_ID, query="decision rationale", top_k=5)
+        assert hits and all("text" not in h for h in hits)
+
+        fetches = memory_vector_store.operation_counts["fetch_objects"]
+        hydrated = hydrate_chunk_texts(db, DOC_ID, hits)
+
+        # Both pages are short: one chunk spans them, sliced from both page rows.
+        assert [(h["page_number"], h["end_page_number"]) for h in hydrated] == [(1, 2)]
+        assert hydrated[0]["text"] == "Member ID: M-1\nDecision: Approved\nRationale: Inadequate response to methotrexate."
+        assert memory_vector_store.operation_counts["fetch_objects"] == fetches
+    db.close()
+
+
+def test_chunks_without_offsets_fall_back_to_one_vector_store_fetch() -> None:
+    with offline_providers():
+        index_document_pages_to_weaviate(DOC_ID, "a.pdf", "application/pdf", PAGES)
+        hits = retrieve_document_chunks(document_id=DOC_ID, query="decision rationale", top_k=5)
+        for h in hits:
+            h["char_start"] = h["char_end"] = None
+
+        fetches = memory_vector_store.operation_counts["fetch_objects"]
+        hydrated = hydrate_chunk_texts(None, DOC_ID, hits)
+
+        assert [h["text"].splitlines()[-1] for h in hydrated] == ["Rationale: Inadequate response to methotrexate."]
+        assert memory_vector_store.operation_counts["fetch_objects"] == fetches + 1
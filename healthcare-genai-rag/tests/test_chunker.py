@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from app.services.chunker import FormAwareChunker, slice_page_span
+
+FORM = (
+    "PRIOR AUTHORIZATION REQUEST\n"
+    "Patient ID: PATIENT-0001\n"
+    "Member Group: GRP-100\n"
+    "Clinical Information\n"
+    "Diagnosis: Condition X (ICD-10: X00.0)\n"
+    "Previous therapies tried: Therapy A (failed), Therapy B (intolerant)\n"
+    "Rationale:\n"
+    "Inadequate response to at least one standard therapy.\n"
+)
+
+
+def test_chunks_end_at_line_boundaries_and_keep_labels_with_values() -> None:
+    chunker = FormAwareChunker(max_tokens=24, min_tokens=8, overlap_tokens=0)
+
+    chunks = chunker.chunk_pages([(1, FORM)])
+
+    assert len(chunks) > 1
+    assert all(c.tokens <= 24 for c in chunks)
+    lines = set(FORM.splitlines())
+    for c in chunks:
+        assert set(c.text.splitlines()) <= lines
+        assert not c.text.endswith(":")
+    assert any(c.text.startswith("Rationale:\nInadequate response") for c in chunks)
+    assert [c.chunk_index for c in chunks] == list(range(1, len(chunks) + 1))
+
+
+def test_page_tail_joins_the_next_page_with_provenance() -> None:
+    pages = {1: "Member ID: M-1\nDecision: Approved", 2: "Rationale: Meets criteria.\n" + "Note: follow-up.\n" * 40}
+    chunker = FormAwareChunker(max_tokens=48, min_tokens=16, overlap_tokens=8)
+
+    chunks = chunker.chunk_pages(pages.items())
+
+    first = chunks[0]
+    assert (first.page_number, first.end_page_number) == (1, 2)
+    assert first.text.startswith("Member ID: M-1\nDecision: Approved\nRationale: Meets criteria.")
+    for c in chunks:
+        assert slice_page_span(pages, c.page_number, c.char_start, c.end_page_number, c.char_end) == c.text
+    # A block split mid-way repeats its trailing lines in the next chunk.
+    assert chunks[1].text.splitlines()[0] == "Note: follow-up."
+    assert sum(c.text.count("Note:") for c in chunks) > 40
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from app.schemas.agentic_qa import Citation
+from app.services.agentic_qa import verify_groundedness_for_test
+from app.services.claim_support import score_claims
+from app.services.evidence_index import IndexedChunk, sentence_offsets
+
+TEXT = (
+    "Decision: Approved\n"
+    "Rationale: Inadequate response to methotrexate after six months. "
+    "Adalimumab was requested by the rheumatologist."
+)
+
+
+def _chunks() -> list[dict]:
+    return [
+        {
+            "document_id": "doc",
+            "page_number": 1,
+            "chunk_index": 1,
+            "text": TEXT,
+            "similarity": 0.6,
+            "sentence_offsets": sentence_offsets(TEXT),
+        }
+    ]
+
+
+def test_claims_are_matched_to_the_sentences_that_support_them() -> None:
+    claims = score_claims(
+        "Approved after an inadequate response to methotrexate. The insurer cited cardiology records.",
+        [IndexedChunk((1, 1), TEXT, sentence_offsets(TEXT))],
+    )
+
+    supported, unsupported = claims
+    assert supported.supported and supported.coverage == 1.0
+    span = supported.spans[0]
+    assert TEXT[span.start : span.end] == span.text
+    assert span.text.startswith("Rationale: Inadequate response to methotrexate")
+    assert not unsupported.supported and unsupported.spans == []
+
+
+def test_stored_offsets_are_used_instead_of_resplitting() -> None:
+    # A single stored span covering the whole text wins over the sentence splitter.
+    chunk = IndexedChunk((1, 1), TEXT, [0, len(TEXT)])
+    assert chunk.sentences == [(0, len(TEXT))]
+
+    # Out-of-range offsets (stale index) fall back to splitting.
+    assert len(IndexedChunk((1, 1), TEXT, [0, len(TEXT) + 5]).sentences) == 3
+
+
+def test_unsupported_rationale_claim_is_reported_with_coverage() -> None:
+    res = verify_groundedness_for_test(
+        answer="Approved because of a documented allergy to infliximab.",
+        question="What was the decision and why?",
+        citations=[Citation(document_id="doc", page_number=1, chunk_index=1)],
+        retrieved_chunks=_chunks(),
+    )
+
+    assert not res.ok
+    assert [c.supported for c in res.claims] == [False]
+    assert any("not appear to be supported" in issue for issue in res.issues)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from datetime import date
+from types import SimpleNamespace
+
+from app.schemas.rag import CorpusSearchRequest
+from app.services import document_chunks, memory_vector_store
+from app.services.corpus_search import search_corpus
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.fakes import benchmark_sessionmaker, offline_providers, seed_document
+
+LETTERS = [
+    ("doc-m1-a", "M-1", "Denied", "2025-03-02"),
+    ("doc-m1-b", "M-1", "Approved", "2025-06-10"),
+    ("doc-m1-c", "M-1", "Denied", "2025-11-20"),
+    ("doc-m1-d", "M-1", "Denied", "2024-12-31"),
+    ("doc-m2-a", "M-2", "Denied", "2025-04-01"),
+]
+
+
+def _pages(member_id: str, decision: str, day: str) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(page_number=1, text=f"Date: {day}\nMember ID: {member_id}\nDecision: {decision}"),
+        SimpleNamespace(page_number=2, text="Rationale: Documentation of step therapy is missing."),
+    ]
+
+
+def test_member_denials_in_a_year_with_one_vector_query_and_pagination() -> None:
+    db = benchmark_sessionmaker()()
+    with offline_providers():
+        for doc_id, member_id, decision, day in LETTERS:
+            pages = _pages(member_id, decision, day)
+            seed_document(db, doc_id, pages)
+            index_document_pages_to_weaviate(doc_id, f"{doc_id}.pdf", "application/pdf", pages)
+
+        queries = memory_vector_store.operation_counts["near_vector"]
+        req = dict(member_id="M-1", date_from=date(2025, 1, 1), date_to=date(2025, 12, 31), page_size=1)
+        first = search_corpus(CorpusSearchRequest(query="why was it denied", decision="denied", **req), db=db)
+
+        assert memory_vector_store.operation_counts["near_vector"] == queries + 1
+        assert first.total_documents == 2 and first.decision_counts == {"denied": 2}
+        assert first.has_more and len(first.documents) == 1
+        hit = first.documents[0]
+        assert hit.document_id in {"doc-m1-a", "doc-m1-c"} and hit.chunks and hit.chunks[0].text is None
+
+        second = search_corpus(
+            CorpusSearchRequest(query="why was it denied", decision="denied", page=2, include_text=True, **req), db=db
+        )
+        assert not second.has_more
+        assert {first.documents[0].document_id, second.documents[0].document_id} == {"doc-m1-a", "doc-m1-c"}
+        assert "Decision: Denied" in second.documents[0].chunks[0].text
+
+        # Without query text: a filtered fetch, newest first, with counts per decision.
+        listing = search_corpus(CorpusSearchRequest(**{**req, "page_size": 10}), db=db)
+        assert [d.document_id for d in listing.documents] == ["doc-m1-c", "doc-m1-b", "doc-m1-a"]
+        assert listing.decision_counts == {"denied": 2, "approved": 1}
+        assert listing.documents[0].document_date == date(2025, 11, 20)
+    db.close()
+
+
+def test_long_documents_do_not_hide_others_from_totals_or_pages() -> None:
+    db = benchmark_sessionmaker()()
+    with offline_providers():
+        for n in range(12):
+            doc_id = f"doc-long-{n:02d}"
+            pages = _pages("M-1", "Denied", f"2025-01-{n + 1:02d}")
+            # Long pages: each is a chunk or more.
+            pages += [SimpleNamespace(page_number=p, text=f"Step therapy record {p} is missing. " * 60) for p in range(3, 21)]
+            seed_document(db, doc_id, pages)
+            index_document_pages_to_weaviate(doc_id, f"{doc_id}.pdf", "application/pdf", pages)
+
+        ranked = search_corpus(CorpusSearchRequest(query="step therapy", member_id="M-1", page_size=10), db=db)
+        assert ranked.total_documents == 12 and ranked.decision_counts == {"denied": 12}
+        assert len(ranked.documents) == 10 and ranked.has_more
+        assert all(len(d.chunks) == 3 for d in ranked.documents)
+
+        rest = search_corpus(CorpusSearchRequest(query="step therapy", member_id="M-1", page=2, page_size=10), db=db)
+        assert len(rest.documents) == 2 and not rest.has_more
+        assert {d.document_id for d in ranked.documents + rest.documents} == {f"doc-long-{n:02d}" for n in range(12)}
+
+        listing = search_corpus(CorpusSearchRequest(member_id="M-1", page=2, page_size=10), db=db)
+        assert listing.total_documents == 12
+        assert [d.document_id for d in listing.documents] == ["doc-long-01", "doc-long-00"]
+        opening = listing.documents[0].chunks
+        assert len(opening) == 3 and opening[0].page_number == 1
+    db.close()
+
+
+def test_with_tenancy_only_the_tenants_of_matching_documents_are_queried(monkeypatch) -> None:
+    monkeypatch.setattr(document_chunks, "TENANCY", "document_bucket")
+    monkeypatch.setattr(document_chunks, "TENANT_BUCKETS", 8)
+    monkeypatch.setattr(document_chunks, "TENANT_IDLE_STATUS", "offloaded")
+    monkeypatch.setattr(document_chunks, "_active", set())
+    monkeypatch.setattr(document_chunks, "_last_used", {})
+    db = benchmark_sessionmaker()()
+    with offline_providers():
+        for doc_id, member_id, decision, day in LETTERS:
+            pages = _pages(member_id, decision, day)
+            seed_document(db, doc_id, pages)
+            index_document_pages_to_weaviate(doc_id, f"{doc_id}.pdf", "application/pdf", pages)
+        document_chunks.offload_idle_tenants(idle_s=0)
+
+        queries = memory_vector_store.operation_counts["near_vector"]
+        res = search_corpus(CorpusSearchRequest(query="why was it denied", member_id="M-2"), db=db)
+
+        assert [d.document_id for d in res.documents] == ["doc-m2-a"]
+        assert memory_vector_store.operation_counts["near_vector"] == queries + 1
+        # Its tenant was onloaded (and is tracked for offloading); the others stay offloaded.
+        tenant = document_chunks.tenant_for_document("doc-m2-a")
+        assert set(document_chunks._last_used) == {tenant}
+        statuses = memory_vector_store.MemoryVectorStoreClient().collections.get("DocumentChunk").tenants.get()
+        assert {name for name, t in statuses.items() if t.activity_status == "ACTIVE"} == {tenant}
+    db.close()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import time
+from contextlib import ExitStack
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.agentic_qa as qa
+import app.services.resilience as resilience
+from app.core.tracing import RequestTrace, use_trace
+from app.schemas.agentic_qa import AgenticQARequest
+from app.services.rag_pipeline import extract_structured_json
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.fakes import HashEmbeddings, ScriptedChatModel, benchmark_sessionmaker, offline_providers, seed_document
+
+DOC_ID = "doc-deadline"
+
+_PAGES = [
+    SimpleNamespace(
+        page_number=1,
+        text="Patient ID: PATIENT-0001\nMember Group: GRP-100\nDecision: Approved\nRationale: Meets criteria.",
+    )
+]
+
+
+class _SlowChatModel(ScriptedChatModel):
+    """
+    Honours the per-call `timeout` like the OpenAI client: raises TimeoutError when the call would exceed it.
+    """
+
+    def invoke(self, prompt: str, timeout: float | None = None, **kwargs: object) -> SimpleNamespace:
+        if timeout is not None and timeout < self.latency_s:
+            time.sleep(timeout)
+            raise TimeoutError("Request timed out.")
+        return super().invoke(prompt, **kwargs)
+
+
+@pytest.fixture()
+def providers(monkeypatch):
+    resilience.reset_breakers()
+    monkeypatch.setattr(qa.AgenticQAService, "_auto_index_if_missing", lambda self, db, document_id: 0)
+
+    db = benchmark_sessionmaker()()
+    seed_document(db, DOC_ID, _PAGES)
+
+    # Warm the lazy weaviate import so it does not eat the small budgets below.
+    import weaviate.classes.query  # noqa: F401
+
+    with ExitStack() as stack:
+
+        def _run(llm: ScriptedChatModel):
+            stack.enter_context(offline_providers(HashEmbeddings(), llm))
+            index_document_pages_to_weaviate(DOC_ID, "a.pdf", "application/pdf", _PAGES)
+            return db
+
+        yield _run
+    db.close()
+    db.close()
+    resilience.reset_breakers()
+
+
+def test_retry_is_skipped_when_the_budget_cannot_fit_another_attempt(providers) -> None:
+    # Cites a chunk that was not retrieved -> verification fails -> the workflow wants to retry.
+    bad = '{"answer": "Approved", "citations": [{"page_number": 9, "chunk_index": 9}]}'
+    llm = _SlowChatModel(script=[bad, bad, bad], latency_s=0.25)
+    db = providers(llm)
+
+    resp = qa.AgenticQAService(llm=llm, db=db).answer(
+        AgenticQARequest(document_id=DOC_ID, question="What was the decision?", retries=2, deadline_ms=400)
+    )
+
+    assert llm.calls["llm_invoke"] == 1
+    assert resp.answer == "Approved"
+    assert any("cannot fit another attempt" in w for w in resp.warnings)
+    assert "retry:skipped" in [s.name for s in resp.steps]
+
+
+def test_deadline_during_first_attempt_returns_a_warning_response(providers) -> None:
+    llm = _SlowChatModel(latency_s=1.0)
+    db = providers(llm)
+
+    start = time.monotonic()
+    resp = qa.AgenticQAService(llm=llm, db=db).answer(
+        AgenticQARequest(document_id=DOC_ID, question="What was the decision?", deadline_ms=150)
+    )
+
+    assert time.monotonic() - start < 0.6
+    assert resp.verification.ok is False
+    assert resp.verification.issues == ["Deadline exceeded before an answer was produced"]
+    assert any("Deadline reached" in w for w in resp.warnings)
+
+
+def test_extraction_falls_back_to_rules_when_the_llm_misses_the_deadline(providers) -> None:
+    llm = _SlowChatModel(latency_s=1.0)
+    providers(llm)
+
+    with use_trace(RequestTrace(workflow="test", deadline=time.monotonic() + 0.15)):
+        resp = extract_structured_json(document_id=DOC_ID, query="Extract the decision")
+
+    assert resp.extracted.decision == "approved"
+    assert resp.extracted.patient_id == "PATIENT-0001"
+    assert any("rule-based extraction" in w for w in resp.warnings)
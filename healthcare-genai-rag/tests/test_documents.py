@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+import app.api.routers.documents as documents
+from app.api.deps import get_db
+from app.db.models import Document
+from app.main import create_app
+from app.services.index_state import INDEX_ERROR_STATUS
+from benchmarks.fakes import benchmark_sessionmaker, seed_document
+
+DOC_ID = "doc-pages"
+PAGES = [SimpleNamespace(page_number=n, text=f"Page {n} text.") for n in range(1, 6)]
+
+
+def _client(monkeypatch, tmp_path) -> TestClient:
+    SessionLocal = benchmark_sessionmaker()
+    db = SessionLocal()
+    seed_document(db, DOC_ID, PAGES)
+    pdf = tmp_path / "original.pdf"
+    pdf.write_bytes(b"%PDF-1.4 sample bytes")
+    db.get(Document, DOC_ID).storage_path = str(pdf)
+    db.commit()
+    db.close()
+
+    @contextmanager
+    def session_scope(db=None):
+        own = SessionLocal()
+        try:
+            yield own
+        finally:
+            own.close()
+
+    def override_get_db():
+        own = SessionLocal()
+        try:
+            yield own
+        finally:
+            own.close()
+
+    monkeypatch.setattr(documents, "session_scope", session_scope)
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def test_pages_are_listed_with_keyset_pagination(monkeypatch, tmp_path) -> None:
+    client = _client(monkeypatch, tmp_path)
+
+    first = client.get(f"/documents/{DOC_ID}/pages", params={"limit": 2}).json()
+    assert [p["page_number"] for p in first["pages"]] == [1, 2]
+    assert first["has_more"] and first["next_after_page"] == 2
+    assert first["pages"][0]["text"] == "Page 1 text." and first["total_chars"] == 24
+
+    last = client.get(
+        f"/documents/{DOC_ID}/pages", params={"after_page": 4, "limit": 2, "include_text": False}
+    ).json()
+    assert [(p["page_number"], p["text"], p["chars"]) for p in last["pages"]] == [(5, None, 12)]
+    assert not last["has_more"] and last["next_after_page"] is None
+
+    assert client.get(f"/documents/{DOC_ID}/pages/3").json()["text"] == "Page 3 text."
+    assert client.get(f"/documents/{DOC_ID}/pages/9").status_code == 404
+    assert client.get("/documents/missing/pages").status_code == 404
+
+
+def test_pages_stream_as_ndjson_in_batches(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(documents, "PAGE_STREAM_BATCH", 2)
+    client = _client(monkeypatch, tmp_path)
+
+    resp = client.get(f"/documents/{DOC_ID}/pages/stream", params={"after_page": 1, "include_text": False})
+
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["page_number"] for line in lines] == [2, 3, 4, 5]
+    assert all("text" not in line for line in lines)
+
+
+def test_original_file_supports_range_requests(monkeypatch, tmp_path) -> None:
+    client = _client(monkeypatch, tmp_path)
+
+    full = client.get(f"/documents/{DOC_ID}/file")
+    assert full.status_code == 200 and full.content == b"%PDF-1.4 sample bytes"
+    assert full.headers["accept-ranges"] == "bytes"
+
+    part = client.get(f"/documents/{DOC_ID}/file", headers={"Range": "bytes=0-7"})
+    assert part.status_code == 206 and part.content == b"%PDF-1.4"
+
+
+def test_reprocess_that_cannot_drop_old_chunks_is_not_left_adoptable(monkeypatch, tmp_path) -> None:
+    client = _client(monkeypatch, tmp_path)
+    monkeypatch.setattr(documents, "extract_pdf_pages_text", lambda path: ["New page one.", "New page two."])
+
+    def _unreachable(document_id: str) -> int:
+        raise ConnectionError("vector store down")
+
+    monkeypatch.setattr(documents, "delete_document_chunks", _unreachable)
+    res = client.post(f"/documents/{DOC_ID}/process").json()
+
+    # index_error: the old pages' chunks are never adopted as the new pages' index.
+    assert res["pages_processed"] == 2 and res["status"] == INDEX_ERROR_STATUS
+    assert client.get(f"/documents/{DOC_ID}").json()["status"] == INDEX_ERROR_STATUS
+    assert [p["text"] for p in client.get(f"/documents/{DOC_ID}/pages").json()["pages"]] == [
+        "New page one.",
+        "New page two.",
+    ]
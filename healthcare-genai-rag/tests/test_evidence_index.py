@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from app.services.evidence_index import ChunkKey, EvidenceIndex, IndexedChunk, tokenize
+
+
+def test_tokenize_keeps_alphanumeric_runs_of_three_or_more() -> None:
+    assert tokenize("Decision: APPROVED (ICD-10 M05.79); re-check in 6_mo") == {
+        "decision",
+        "approved",
+        "icd",
+        "m05",
+        "check",
+    }
+
+
+def test_retry_reuses_normalized_chunks_and_keeps_per_retrieval_similarity() -> None:
+    cache: dict[ChunkKey, IndexedChunk] = {}
+    first = EvidenceIndex([{"page_number": 1, "chunk_index": 2, "text": "Decision: Approved", "similarity": 0.4}], cache=cache)
+    tokens = first.get(1, 2).tokens
+
+    second = EvidenceIndex(
+        [
+            {"page_number": "1", "chunk_index": "2", "text": "Decision: Approved", "similarity": 0.7},
+            {"page_number": None, "chunk_index": 1, "text": "no key"},
+        ],
+        cache=cache,
+    )
+
+    assert second.get(1, 2) is first.get(1, 2)
+    assert second.get(1, 2).tokens is tokens
+    assert (first.similarity(1, 2), second.similarity(1, 2)) == (0.4, 0.7)
+    assert len(second) == 1 and second.get(9, 9) is None
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import app.services.agentic_qa as qa
+import app.services.rag_pipeline as rag_pipeline
+from app.schemas.agentic_qa import AgenticQARequest
+from app.services import memory_vector_store, retriever
+from app.services.rag_rules import detect_fields
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.fakes import HashEmbeddings, ScriptedChatModel, benchmark_sessionmaker, offline_providers, seed_document
+
+DOC_ID = "doc-facet-fields"
+PAGES = [
+    SimpleNamespace(page_number=1, text="Patient ID: PATIENT-0001\nService Date: 2026-02-04\n" + "Note: stable.\n" * 60),
+    SimpleNamespace(page_number=2, text="Decision: Approved\nRationale: Inadequate response to methotrexate."),
+]
+
+
+def test_detect_fields_uses_the_rule_patterns() -> None:
+    assert detect_fields("Member ID: M-1\nDecision: Approved\nRationale:\nMeets criteria.") == [
+        "member_id", "decision", "rationale"
+    ]
+    assert detect_fields("DOB: 1980-01-02") == ["dob"]
+    # A label without a value is not a field.
+    assert detect_fields("Decision: see attached") == []
+
+
+def _answer(question: str) -> tuple[qa.AgenticQAResponse, dict[str, int]]:
+    db = benchmark_sessionmaker()()
+    seed_document(db, DOC_ID, PAGES)
+    with offline_providers(HashEmbeddings(), ScriptedChatModel()) as (embeddings, llm):
+        index_document_pages_to_weaviate(DOC_ID, "a.pdf", "application/pdf", PAGES)
+        before = {**embeddings.calls, **memory_vector_store.operation_counts}
+        resp = qa.AgenticQAService(llm=llm, db=db).answer(AgenticQARequest(document_id=DOC_ID, question=question))
+        after = {**embeddings.calls, **memory_vector_store.operation_counts}
+    return resp, {k: after[k] - before.get(k, 0) for k in after}
+
+
+def test_facet_steps_filter_on_field_labels_without_embedding(monkeypatch) -> None:
+    monkeypatch.setattr(qa.AgenticQAService, "_auto_index_if_missing", lambda self, db, document_id: 0)
+    monkeypatch.setattr(retriever, "FACET_RETRIEVAL", "filter")
+
+    resp, calls = _answer("What are the patient id, the service date and the decision?")
+
+    assert [s.name for s in resp.plan.steps] == ["main", "dates", "ids", "decision"]
+    assert calls["embed_query"] == 1 and calls["near_vector"] == 1
+    assert calls["fetch_objects"] == 3
+    assert {(c.page_number, c.chunk_index) for c in resp.retrieved} >= {(1, 1), (2, 1)}
+
+    monkeypatch.setattr(retriever, "FACET_RETRIEVAL", "ann")
+    _, calls = _answer("What are the patient id, the service date and the decision?")
+    assert calls["embed_query"] == 4 and calls.get("fetch_objects", 0) == 0
+
+
+def test_filter_hits_reach_the_prompt_ahead_of_ann_hits() -> None:
+    ann = [
+        {"page_number": n, "chunk_index": 1, "text": "Clinical notes. " * 20, "similarity": 0.9} for n in range(1, 30)
+    ]
+    labelled = {"page_number": 30, "chunk_index": 1, "text": "Member ID: MEM-777", "similarity": None, "field_match": True}
+
+    assert qa._build_context([*ann, labelled], max_context_chars=400).startswith("[page=30 chunk=1] Member ID: MEM-777")
+    context, used = rag_pipeline._build_context([*ann, labelled], max_context_chars=400)
+    assert "MEM-777" in context and used[0] is labelled
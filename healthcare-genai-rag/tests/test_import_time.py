@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Provider SDKs must only load on first use (cold start of autoscaled containers).
+_LAZY_MODULES = ("langchain_openai", "tiktoken", "weaviate", "pdfplumber", "openai")
+
+# Generous default so CI noise does not flake; tighten locally with IMPORT_TIME_BUDGET_MS.
+_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2500"))
+
+
+def _importtime(module: str) -> dict[str, int]:
+    """
+    Runs `python -X importtime -c "import <module>"` in a clean interpreter.
+    Returns {module_name: cumulative_us}.
+    """
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum_us, name = (part.strip() for part in line[len("import time:") :].split("|"))
+        if cum_us.isdigit():
+            cumulative[name] = int(cum_us)
+    return cumulative
+
+
+def test_app_import_is_lazy_and_within_budget() -> None:
+    cumulative = _importtime("app.main")
+
+    loaded = sorted(m for m in _LAZY_MODULES if m in cumulative)
+    assert loaded == [], f"heavy modules imported at startup: {loaded}"
+
+    app_main_ms = cumulative["app.main"] / 1000.0
+    assert app_main_ms < _BUDGET_MS, f"import app.main took {app_main_ms:.0f} ms (budget {_BUDGET_MS:.0f} ms)"
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.services.index_state as index_state
+from app.db.models import Base, Document, DocumentPage
+
+
+@pytest.fixture()
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False, autocommit=False)()
+    index_state._indexed_cache.clear()
+    try:
+        yield session
+    finally:
+        session.close()
+        index_state._indexed_cache.clear()
+
+
+def _doc(db, status: str = "parsed") -> Document:
+    doc = Document(filename="a.pdf", content_type="application/pdf", status=status)
+    db.add(doc)
+    db.commit()
+    return doc
+
+
+class _NoDB:
+    def get(self, *args, **kwargs):
+        raise AssertionError("cache hit should not touch the database")
+
+
+def test_mark_indexed_records_state_and_serves_from_cache(db, monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_EMBEDDINGS_MODEL", "test-embeddings")
+    doc = _doc(db)
+
+    assert index_state.is_document_index_current(db, doc.id) is False
+
+    index_state.mark_document_indexed(db, doc, chunks_indexed=7)
+
+    db.refresh(doc)
+    assert doc.status == "indexed"
+    assert doc.chunks_indexed == 7
+    assert doc.embedding_model == "test-embeddings"
+    assert doc.indexed_at is not None
+    assert index_state.is_document_index_current(_NoDB(), doc.id) is True
+
+
+def test_mark_not_indexed_clears_state_and_cache(db) -> None:
+    doc = _doc(db)
+    index_state.mark_document_indexed(db, doc, chunks_indexed=3)
+
+    index_state.mark_document_not_indexed(db, doc, status="parsed")
+
+    assert doc.chunks_indexed is None
+    assert index_state.is_document_index_current(db, doc.id) is False
+
+
+def test_reprocess_in_another_worker_is_seen_once_the_cache_expires(db, monkeypatch) -> None:
+    doc = _doc(db)
+    index_state.mark_document_indexed(db, doc, chunks_indexed=3)
+    # Another worker reprocesses: the DB changes, this process's cache is not invalidated.
+    doc.status = "parsed"
+    db.commit()
+    assert index_state.is_document_index_current(db, doc.id) is True
+
+    now = index_state.time.monotonic()
+    monkeypatch.setattr(index_state.time, "monotonic", lambda: now + index_state._indexed_cache.ttl_s)
+    assert index_state.is_document_index_current(db, doc.id) is False
+
+
+def test_adopt_existing_index_uses_vector_store_probe(db, monkeypatch) -> None:
+    doc = _doc(db)
+    monkeypatch.setattr(index_state, "is_document_indexed", lambda document_id: True)
+
+    assert index_state.adopt_existing_index(db, doc.id) is True
+    assert index_state.is_document_index_current(db, doc.id) is True
+
+
+def test_chunks_of_a_failed_run_are_never_adopted(db, monkeypatch) -> None:
+    monkeypatch.setattr(index_state, "is_document_indexed", lambda document_id: True)
+    failed = _doc(db, status=index_state.INDEX_ERROR_STATUS)
+    # A parsed row that was indexed once already has a recorded index attempt.
+    attempted = _doc(db)
+    attempted.indexed_at = datetime.utcnow()
+    db.commit()
+
+    assert index_state.adopt_existing_index(db, failed.id) is False
+    assert index_state.adopt_existing_index(db, attempted.id) is False
+    assert index_state.reconcile_index_state(db)["adopted"] == 0
+    assert (failed.status, attempted.status) == ("index_error", "parsed")
+
+
+def test_reconcile_demotes_missing_and_adopts_present(db, monkeypatch) -> None:
+    stale = _doc(db, status="indexed")
+    legacy = _doc(db, status="parsed")
+    untouched = _doc(db, status="uploaded")
+    # Indexed before document fields were recorded in Postgres.
+    unrecorded = _doc(db, status="indexed")
+    db.add(DocumentPage(document_id=unrecorded.id, page_number=1, text="Member ID: M-9\nDecision: Denied"))
+    db.commit()
+    in_vector_store = {legacy.id, untouched.id, unrecorded.id}
+    monkeypatch.setattr(index_state, "is_document_indexed", lambda document_id: document_id in in_vector_store)
+
+    counts = index_state.reconcile_index_state(db)
+
+    assert counts == {"checked": 3, "demoted": 1, "adopted": 1, "fields_backfilled": 1}
+    assert stale.status == "parsed"
+    assert legacy.status == "indexed"
+    assert untouched.status == "uploaded"
+    assert (unrecorded.member_id, unrecorded.decision) == ("M-9", "denied")
+    assert legacy.decision == "unknown"
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.agentic_qa as qa
+from app.schemas.agentic_qa import AgenticQARequest
+from app.services.json_repair import PARSE_OUTCOMES, parse_json_tolerant
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.fakes import HashEmbeddings, ScriptedChatModel, benchmark_sessionmaker, offline_providers, seed_document
+
+DOC_ID = "doc-json-repair"
+
+
+@pytest.mark.parametrize(
+    ("raw", "payload", "repaired"),
+    [
+        ('{"answer": "Approved"}', {"answer": "Approved"}, False),
+        ('Here you go:\n```json\n{"answer": "x}", "citations": []}\n```', {"answer": "x}", "citations": []}, False),
+        ('{"answer": "Approved", "citations": [{"page_number": 1, "chunk_index": 2,},],}', None, True),
+        ('{"answer": "Approved", "citations": [{"page_number": 1', None, True),
+    ],
+)
+def test_local_repair_recovers_common_malformations(raw: str, payload: dict | None, repaired: bool) -> None:
+    parsed, was_repaired = parse_json_tolerant(raw)
+
+    assert was_repaired is repaired
+    if payload is not None:
+        assert parsed == payload
+    else:
+        assert parsed["answer"] == "Approved" and parsed["citations"][0]["page_number"] == 1
+
+
+def test_unrecoverable_output_raises() -> None:
+    with pytest.raises(ValueError):
+        parse_json_tolerant("I cannot answer that.")
+
+
+def _answer(llm: ScriptedChatModel, monkeypatch, *, structured: bool) -> qa.AgenticQAResponse:
+    monkeypatch.setenv("LLM_STRUCTURED_OUTPUT", "true" if structured else "false")
+    monkeypatch.setattr(qa.AgenticQAService, "_auto_index_if_missing", lambda self, db, document_id: 0)
+    pages = [SimpleNamespace(page_number=1, text="Decision: Approved\nRationale: Meets criteria.")]
+    db = benchmark_sessionmaker()()
+    seed_document(db, DOC_ID, pages)
+    with offline_providers(HashEmbeddings(), llm):
+        index_document_pages_to_weaviate(DOC_ID, "a.pdf", "application/pdf", pages)
+        return qa.AgenticQAService(llm=llm, db=db).answer(
+            AgenticQARequest(document_id=DOC_ID, question="What was the decision?", retries=0)
+        )
+
+
+def test_structured_output_skips_local_parsing(monkeypatch) -> None:
+    before = PARSE_OUTCOMES.value(schema="LLMStructuredAnswer", outcome="structured")
+
+    resp = _answer(ScriptedChatModel(), monkeypatch, structured=True)
+
+    assert resp.verification.ok
+    assert PARSE_OUTCOMES.value(schema="LLMStructuredAnswer", outcome="structured") == before + 1
+    assert [s.meta["structured"] for s in resp.steps if s.name == "llm:parse"] == [True]
+
+
+def test_malformed_answer_is_repaired_without_a_second_llm_call(monkeypatch) -> None:
+    malformed = '```json\n{"answer": "Approved", "citations": [{"page_number": 1, "chunk_index": 1},],\n```'
+    llm = ScriptedChatModel(script=[malformed])
+    before = PARSE_OUTCOMES.value(schema="LLMStructuredAnswer", outcome="local_repair")
+
+    resp = _answer(llm, monkeypatch, structured=False)
+
+    assert resp.answer == "Approved"
+    assert llm.calls["llm_invoke"] == 1
+    assert any("repaired locally" in w for w in resp.warnings)
+    assert PARSE_OUTCOMES.value(schema="LLMStructuredAnswer", outcome="local_repair") == before + 1
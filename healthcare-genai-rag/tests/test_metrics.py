@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+import app.services.agentic_qa as qa
+from app.core.metrics import MetricsRegistry
+from app.main import create_app
+from app.schemas.agentic_qa import AgenticQARequest
+from app.services.document_loader import extract_pdf_pages_text
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.corpus import SAMPLES_DIR
+from benchmarks.fakes import HashEmbeddings, ScriptedChatModel, benchmark_sessionmaker, offline_providers, seed_document
+
+DOC_ID = "doc-metrics"
+
+
+def test_registry_renders_counters_and_histograms() -> None:
+    registry = MetricsRegistry()
+    calls = registry.counter("demo_calls_total", "Calls.", ("kind",))
+    latency = registry.histogram("demo_latency_seconds", "Latency.", ("op",), buckets=(0.1, 1.0))
+
+    calls.inc(kind="a")
+    calls.inc(2, kind="a")
+    latency.observe(0.05, op="x")
+    latency.observe(0.5, op="x")
+    latency.observe(5.0, op="x")
+
+    text = registry.render()
+    assert '# TYPE demo_calls_total counter' in text
+    assert 'demo_calls_total{kind="a"} 3' in text
+    assert 'demo_latency_seconds_bucket{op="x",le="0.1"} 1' in text
+    assert 'demo_latency_seconds_bucket{op="x",le="1"} 2' in text
+    assert 'demo_latency_seconds_bucket{op="x",le="+Inf"} 3' in text
+    assert 'demo_latency_seconds_count{op="x"} 3' in text
+
+
+def test_agentic_qa_steps_carry_timings_and_usage(monkeypatch) -> None:
+    pages = [SimpleNamespace(page_number=1, text="Member ID: M-1\nDecision: Approved\nRationale: Meets criteria.")]
+    db = benchmark_sessionmaker()()
+    seed_document(db, DOC_ID, pages)
+    with offline_providers(HashEmbeddings(), ScriptedChatModel()) as (_, llm):
+        index_document_pages_to_weaviate(DOC_ID, "a.pdf", "application/pdf", pages)
+        monkeypatch.setattr(qa.AgenticQAService, "_auto_index_if_missing", lambda self, db, document_id: 0)
+        resp = qa.AgenticQAService(llm=llm, db=db).answer(
+            AgenticQARequest(document_id=DOC_ID, question="What was the decision?", retries=0)
+        )
+
+    steps = {s.name: s for s in resp.steps}
+    assert all(s.duration_ms is not None and s.duration_ms >= 0 for s in resp.steps)
+    assert resp.steps[-1].name == "done"
+    assert resp.steps[-1].elapsed_ms >= max(s.elapsed_ms for s in resp.steps)
+
+    retrieval = steps["retrieve:done"].usage
+    assert retrieval["embedding_calls"] == len(resp.plan.steps)
+    assert retrieval["vector_queries"] == len(resp.plan.steps)
+
+    llm_usage = steps["llm:parse"].usage
+    assert llm_usage["llm_calls"] == 1
+    assert llm_usage["prompt_tokens"] > 0
+
+
+def test_metrics_endpoint_exposes_usage_counters() -> None:
+    client = TestClient(create_app())
+    res = client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert "# TYPE medirag_workflow_step_duration_seconds histogram" in res.text
+    assert "# TYPE medirag_usage_total counter" in res.text
+
+
+def test_counter_shards_sum_across_threads() -> None:
+    registry = MetricsRegistry()
+    calls = registry.counter("demo_threaded_total", "Calls.", ("kind",))
+
+    def work() -> None:
+        for _ in range(1000):
+            calls.inc(kind="x")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls.value(kind="x") == 8000
+
+
+def test_local_scrape_reports_route_templates_and_dependencies() -> None:
+    extract_pdf_pages_text(SAMPLES_DIR / "sample_prior_authorization.pdf")
+
+    client = TestClient(create_app())
+    client.get("/health")
+    client.get("/nope")
+    text = client.get("/metrics").text
+
+    assert 'medirag_http_requests_total{method="GET",route="/health",status="200"}' in text
+    assert 'medirag_http_requests_total{method="GET",route="unmatched",status="404"}' in text
+    assert 'medirag_http_request_duration_seconds_count{method="GET",route="/health"}' in text
+    assert 'medirag_dependency_duration_seconds_count{dependency="pdf_parse"}' in text
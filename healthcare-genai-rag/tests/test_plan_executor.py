@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.core.tracing import RequestTrace, record, use_trace
+from app.schemas.agentic_qa import PlanStep
+from app.services.plan_executor import run_plan_steps
+
+
+def _steps(*specs: tuple[str, list[str]]) -> list[PlanStep]:
+    return [PlanStep(name=name, query=name, depends_on=deps) for name, deps in specs]
+
+
+def test_independent_steps_run_concurrently_and_keep_plan_order() -> None:
+    delays = {"main": 0.15, "dates": 0.05, "ids": 0.1, "decision": 0.0}
+
+    def fn(step: PlanStep) -> list[str]:
+        time.sleep(delays[step.name])
+        return [step.name]
+
+    start = time.perf_counter()
+    outcomes = run_plan_steps(_steps(*((n, []) for n in delays)), fn, max_parallel=4)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.27  # serial would take 0.30s
+    assert [o.result[0] for o in outcomes] == list(delays)
+    assert outcomes[0].duration_ms >= 140
+
+
+def test_dependencies_run_after_their_prerequisites() -> None:
+    finished: list[str] = []
+    lock = threading.Lock()
+
+    def fn(step: PlanStep) -> None:
+        time.sleep(0.02 if step.name == "a" else 0.0)
+        with lock:
+            finished.append(step.name)
+
+    run_plan_steps(_steps(("c", ["b"]), ("a", []), ("b", ["a"]), ("d", [])), fn, max_parallel=4)
+
+    assert finished.index("a") < finished.index("b") < finished.index("c")
+
+
+def test_failed_step_skips_dependents_and_cycles_are_rejected() -> None:
+    def fn(step: PlanStep) -> str:
+        if step.name == "a":
+            raise ConnectionError("down")
+        return step.name
+
+    outcomes = run_plan_steps(_steps(("a", []), ("b", ["a"]), ("c", [])), fn)
+
+    assert isinstance(outcomes[0].error, ConnectionError)
+    assert outcomes[1].skipped and outcomes[1].error is outcomes[0].error
+    assert outcomes[2].result == "c"
+
+    with pytest.raises(ValueError, match="cycle"):
+        run_plan_steps(_steps(("a", ["b"]), ("b", ["a"])), fn)
+
+
+def test_steps_record_into_the_callers_trace() -> None:
+    trace = RequestTrace(workflow="test")
+
+    with use_trace(trace):
+        run_plan_steps(_steps(("a", []), ("b", []), ("c", [])), lambda step: record("vector_queries"), max_parallel=3)
+
+    assert trace.totals() == {"vector_queries": 3}
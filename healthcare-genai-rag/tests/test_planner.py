@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.agentic_qa import Planner
+
+
+@pytest.mark.parametrize(
+    ("question", "strategy", "steps"),
+    [
+        ("What was the decision?", "single_query", ["main"]),
+        ("Why was the request denied?", "single_query", ["main"]),
+        ("What is the member ID and the service date?", "multi_query", ["main", "dates", "ids"]),
+        ("What was the decision and when was the patient admitted?", "multi_query", ["main", "dates", "decision"]),
+        ("Summarize this document.", "multi_query", ["main", "dates", "ids", "decision"]),
+    ],
+)
+def test_planner_emits_only_the_facets_the_question_needs(question: str, strategy: str, steps: list[str]) -> None:
+    plan = Planner().plan(question)
+
+    assert plan.strategy == strategy
+    assert [s.name for s in plan.steps] == steps
+    assert plan.steps[0].query == question
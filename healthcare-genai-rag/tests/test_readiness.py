@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.services.readiness import ReadinessMonitor
+
+
+def _ok() -> None:
+    pass
+
+
+def _fail() -> None:
+    raise RuntimeError("down")
+
+
+def test_snapshot_reports_each_probe_and_overall_status() -> None:
+    monitor = ReadinessMonitor({"postgres": _ok, "vector_store": _fail}, ttl_s=30, probe_timeout_s=1)
+
+    ready, checks = monitor.snapshot()
+    assert not ready
+    assert checks["postgres"]["error"] == "not probed yet"
+
+    asyncio.run(monitor.refresh())
+    ready, checks = monitor.snapshot()
+    assert not ready
+    assert checks["postgres"]["ok"] is True
+    assert checks["vector_store"] == {**checks["vector_store"], "ok": False, "error": "RuntimeError: down"}
+
+
+def test_stale_results_are_not_ready() -> None:
+    monitor = ReadinessMonitor({"postgres": _ok}, ttl_s=0, probe_timeout_s=1)
+    asyncio.run(monitor.refresh())
+
+    ready, checks = monitor.snapshot()
+    assert not ready
+    assert checks["postgres"]["error"] == "stale result"
+
+
+def test_slow_probe_times_out_and_is_not_stacked() -> None:
+    release = threading.Event()
+    started: list[int] = []
+
+    def slow() -> None:
+        started.append(1)
+        release.wait(5)
+
+    monitor = ReadinessMonitor({"vector_store": slow}, ttl_s=30, probe_timeout_s=0.05)
+
+    async def two_rounds() -> None:
+        try:
+            await monitor.refresh()
+            await monitor.refresh()
+        finally:
+            # asyncio.run() waits for the executor thread on exit.
+            release.set()
+
+    asyncio.run(two_rounds())
+
+    ready, checks = monitor.snapshot()
+    assert not ready
+    assert checks["vector_store"]["error"] == "previous probe still running"
+    assert len(started) == 1
+
+
+def test_ready_endpoint_serves_cached_results(monkeypatch) -> None:
+    monitor = ReadinessMonitor({"postgres": _ok, "llm_config": _ok}, ttl_s=30, probe_timeout_s=1)
+    monkeypatch.setattr(main, "readiness_monitor", monitor)
+    client = TestClient(main.create_app())
+
+    assert client.get("/ready").status_code == 503
+
+    asyncio.run(monitor.refresh())
+    res = client.get("/ready")
+    assert res.status_code == 200
+    assert res.json()["status"] == "ready"
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+import app.services.resilience as resilience
+from app.core.tracing import RequestTrace, use_trace
+from app.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceeded,
+    call_with_resilience,
+    is_transient,
+)
+
+
+class RateLimitError(Exception):
+    """Same name as the OpenAI SDK error (matched by name)."""
+
+
+@pytest.fixture(autouse=True)
+def _fast_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "_BASE_DELAY_S", 0.0)
+    resilience.reset_breakers()
+    yield
+    resilience.reset_breakers()
+
+
+def _flaky(failures: int, exc: Exception):
+    calls = {"n": 0}
+
+    def fn() -> str:
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise exc
+        return "ok"
+
+    return fn, calls
+
+
+def test_transient_errors_are_retried_with_backoff() -> None:
+    fn, calls = _flaky(2, RateLimitError("slow down"))
+
+    assert call_with_resilience("test-dep", fn) == "ok"
+    assert calls["n"] == 3
+
+
+def test_non_transient_errors_are_not_retried() -> None:
+    fn, calls = _flaky(1, ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        call_with_resilience("test-dep", fn)
+    assert calls["n"] == 1
+    assert not is_transient(ValueError())
+    assert is_transient(ConnectionError())
+
+
+def test_no_retry_when_backoff_does_not_fit_the_deadline(monkeypatch) -> None:
+    monkeypatch.setattr(resilience, "_BASE_DELAY_S", 5.0)
+    monkeypatch.setattr(resilience, "backoff_delay_s", lambda attempt, base_s, max_s: 5.0)
+    fn, calls = _flaky(1, ConnectionError("reset"))
+
+    with use_trace(RequestTrace(workflow="test", deadline=time.monotonic() + 1.0)):
+        with pytest.raises(ConnectionError):
+            call_with_resilience("test-dep", fn)
+    assert calls["n"] == 1
+
+    with use_trace(RequestTrace(workflow="test", deadline=time.monotonic() - 1.0)):
+        with pytest.raises(DeadlineExceeded):
+            call_with_resilience("test-dep", fn)
+    assert calls["n"] == 1
+
+
+def test_circuit_opens_fails_fast_and_recovers_after_trial() -> None:
+    breaker = CircuitBreaker("dep", failure_threshold=2, reset_timeout_s=0.05)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.on_failure(TimeoutError())
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # half-open trial
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one trial at a time
+
+    breaker.on_success()
+    assert breaker.state == "closed"
+
+
+def test_open_circuit_short_circuits_calls(monkeypatch) -> None:
+    monkeypatch.setattr(resilience, "_MAX_ATTEMPTS", 1)
+    fn, calls = _flaky(100, ConnectionError("down"))
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            call_with_resilience("flaky-dep", fn)
+
+    with pytest.raises(CircuitOpenError):
+        call_with_resilience("flaky-dep", fn)
+    assert calls["n"] == 5
+
+
+def test_hedged_call_returns_the_faster_duplicate() -> None:
+    release = threading.Event()
+    calls = {"n": 0}
+    lock = threading.Lock()
+
+    def fn() -> str:
+        with lock:
+            calls["n"] += 1
+            n = calls["n"]
+        if n == 1:
+            release.wait(2)  # slow primary
+            return "primary"
+        return "hedge"
+
+    try:
+        assert call_with_resilience("hedge-dep", fn, hedge_delay_s=0.02) == "hedge"
+    finally:
+        release.set()
+    assert calls["n"] == 2
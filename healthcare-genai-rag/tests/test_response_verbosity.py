@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import app.services.agentic_qa as qa
+from app.schemas.agentic_qa import AgenticQARequest
+from app.services.vector_store import index_document_pages_to_weaviate
+from benchmarks.fakes import HashEmbeddings, ScriptedChatModel, benchmark_sessionmaker, offline_providers, seed_document
+
+DOC_ID = "doc-verbosity"
+PAGES = [SimpleNamespace(page_number=1, text="Decision: Approved\nRationale: Inadequate response to methotrexate.")]
+
+
+def _answer(monkeypatch, **options) -> qa.AgenticQAResponse:
+    monkeypatch.setattr(qa.AgenticQAService, "_auto_index_if_missing", lambda self, db, document_id: 0)
+    db = benchmark_sessionmaker()()
+    seed_document(db, DOC_ID, PAGES)
+    with offline_providers(HashEmbeddings(), ScriptedChatModel()) as (_, llm):
+        index_document_pages_to_weaviate(DOC_ID, "a.pdf", "application/pdf", PAGES)
+        return qa.AgenticQAService(llm=llm, db=db).answer(
+            AgenticQARequest(document_id=DOC_ID, question="What was the decision?", **options)
+        )
+
+
+def test_minimal_response_builds_no_retrieved_chunks_steps_or_plan(monkeypatch) -> None:
+    resp = _answer(monkeypatch, verbosity="minimal")
+
+    assert resp.answer == "Approved" and resp.verification.ok
+    assert resp.citations and resp.retrieved == [] and resp.steps == [] and resp.plan is None
+    assert resp.verification.claims == []
+    assert set(resp.model_dump(exclude_defaults=True)) <= {
+        "document_id", "question", "answer", "citations", "verification", "created_at"
+    }
+
+
+def test_id_only_citations(monkeypatch) -> None:
+    resp = _answer(monkeypatch, citation_mode="ids")
+
+    assert resp.citations == []
+    assert resp.citation_ids == [(1, 1)]
+    assert resp.retrieved and resp.steps
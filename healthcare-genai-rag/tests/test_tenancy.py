@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from app.services import document_chunks, memory_vector_store
+from app.services.rag_pipeline import is_document_indexed
+from app.services.retriever import retrieve_document_chunks
+from app.services.vector_store import delete_document_chunks, index_document_pages_to_weaviate
+from benchmarks.fakes import offline_providers
+
+PAGES = [SimpleNamespace(page_number=1, text="Member ID: M-1\nDecision: Approved")]
+
+
+def test_documents_are_indexed_into_bucket_tenants(monkeypatch) -> None:
+    monkeypatch.setattr(document_chunks, "TENANCY", "document_bucket")
+    monkeypatch.setattr(document_chunks, "TENANT_BUCKETS", 4)
+    monkeypatch.setattr(document_chunks, "_active", set())
+    monkeypatch.setattr(document_chunks, "_last_used", {})
+    doc_ids = [f"doc-tenant-{n}" for n in range(8)]
+    with offline_providers():
+        assert not is_document_indexed(doc_ids[0])
+        for doc_id in doc_ids:
+            index_document_pages_to_weaviate(doc_id, "a.pdf", "application/pdf", PAGES)
+
+        tenants = memory_vector_store.MemoryVectorStoreClient().collections.get("DocumentChunk").tenants.get()
+        assert set(tenants) == {document_chunks.tenant_for_document(d) for d in doc_ids}
+        # Tenants are created once per process, not on every indexing call.
+        assert memory_vector_store.operation_counts["tenant_create"] == len(tenants)
+
+        hits = retrieve_document_chunks(document_id=doc_ids[0], query="decision", top_k=5)
+        assert [h["document_id"] for h in hits] == [doc_ids[0]]
+
+        assert document_chunks.offload_idle_tenants(idle_s=0) == len(tenants)
+        statuses = memory_vector_store.MemoryVectorStoreClient().collections.get("DocumentChunk").tenants.get()
+        assert {t.activity_status for t in statuses.values()} == {"INACTIVE"}
+
+        # A read reactivates the cold tenant; the chunks are still there.
+        assert is_document_indexed(doc_ids[1])
+        assert delete_document_chunks(doc_ids[1]) == 1
+        assert not is_document_indexed(doc_ids[1])
+
+
+def test_offloaded_tenants_are_onloaded_on_read_even_behind_a_stale_cache(monkeypatch) -> None:
+    monkeypatch.setattr(document_chunks, "TENANCY", "document_bucket")
+    monkeypatch.setattr(document_chunks, "TENANT_IDLE_STATUS", "offloaded")
+    monkeypatch.setattr(document_chunks, "_active", set())
+    monkeypatch.setattr(document_chunks, "_last_used", {})
+    with offline_providers():
+        index_document_pages_to_weaviate("doc-cold", "a.pdf", "application/pdf", PAGES)
+        tenant = document_chunks.tenant_for_document("doc-cold")
+        tenants = memory_vector_store.MemoryVectorStoreClient().collections.get("DocumentChunk").tenants
+
+        # Offloaded by this process: the next read onloads it (auto activation does not).
+        assert document_chunks.offload_idle_tenants(idle_s=0) == 1
+        assert tenants.get()[tenant].activity_status == "OFFLOADED"
+        assert [h["document_id"] for h in retrieve_document_chunks(document_id="doc-cold", query="x", top_k=5)] == [
+            "doc-cold"
+        ]
+
+        # Offloaded by another worker while this one still believes it active: the failed query
+        # reactivates the tenant and is retried once.
+        tenants.offload(tenant)
+        assert tenant in document_chunks._active
+        assert len(retrieve_document_chunks(document_id="doc-cold", query="x", top_k=5)) == 1
+        assert tenants.get()[tenant].activity_status == "ACTIVE"
+        assert memory_vector_store.operation_counts["tenant_activate"] == 2
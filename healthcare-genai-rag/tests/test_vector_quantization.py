@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.services import memory_vector_store
+from app.services.memory_vector_store import MemoryVectorStoreClient, vector_index_nbytes
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+def test_quantized_search_rescores_to_exact_float_results(monkeypatch, mode: str) -> None:
+    memory_vector_store.reset_memory_store()
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((10, 64)).astype(np.float32)
+    vectors = centers[np.arange(500) % 10] + 0.5 * rng.standard_normal((500, 64)).astype(np.float32)
+    query = vectors[3] + 0.1 * rng.standard_normal(64).astype(np.float32)
+    collection = MemoryVectorStoreClient().collections.get("QuantizedChunks")
+    for i, vector in enumerate(vectors):
+        collection.batch.add_object(properties={"chunk": i, "even": i % 2 == 0}, vector=vector)
+
+    def search(**kwargs) -> list[tuple[int, float]]:
+        res = collection.query.near_vector(near_vector=query, limit=5, return_properties=["chunk"], **kwargs)
+        return [(o.properties["chunk"], o.metadata.distance) for o in res.objects]
+
+    exact = search()
+    float_bytes = vector_index_nbytes("QuantizedChunks")
+    monkeypatch.setattr(memory_vector_store, "QUANTIZATION", mode)
+    monkeypatch.setattr(memory_vector_store, "RESCORE_FACTOR", 20)
+
+    approx = search()
+
+    assert [c for c, _ in approx] == [c for c, _ in exact]
+    assert [d for _, d in approx] == pytest.approx([d for _, d in exact])
+    assert vector_index_nbytes("QuantizedChunks") < float_bytes / 3
+
+    from weaviate.classes.query import Filter
+
+    filtered = search(filters=Filter.by_property("even").equal(True))
+    assert filtered and all(c % 2 == 0 for c, _ in filtered)